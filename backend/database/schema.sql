@@ -25,18 +25,36 @@ CREATE TABLE IF NOT EXISTS artwork (
     dominant_palette JSONB DEFAULT '{}',
     image_url TEXT NOT NULL,
     dimensions JSONB DEFAULT '{}',
+    width_cm REAL, -- normalised from dimensions for wall-fit range queries
+    height_cm REAL,
     description TEXT,
+    canonical_id UUID, -- representative of a near-duplicate cluster (NULL if unique)
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    change_xid BIGINT NOT NULL DEFAULT 0 -- last writing transaction (txid_current()), the change feed's order
+);
+ALTER TABLE artwork ADD COLUMN IF NOT EXISTS canonical_id UUID;
+ALTER TABLE artwork ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE artwork ADD COLUMN IF NOT EXISTS width_cm REAL;
+ALTER TABLE artwork ADD COLUMN IF NOT EXISTS height_cm REAL;
+
+-- Deleted artworks, so the change feed can report deletes
+CREATE TABLE IF NOT EXISTS artwork_tombstone (
+    artwork_id UUID PRIMARY KEY,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    change_xid BIGINT NOT NULL DEFAULT txid_current()
 );
+ALTER TABLE artwork_tombstone ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT txid_current();
 
 -- Artwork embeddings for vector search
 CREATE TABLE IF NOT EXISTS artwork_embedding (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     vector VECTOR(512), -- DINOv2/CLIP embedding dimension
     artwork_id UUID REFERENCES artwork(id) ON DELETE CASCADE,
+    model_version VARCHAR(100), -- encoder that produced the vector
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
+ALTER TABLE artwork_embedding ADD COLUMN IF NOT EXISTS model_version VARCHAR(100);
 
 -- Room uploads and analysis
 CREATE TABLE IF NOT EXISTS room_upload (
@@ -71,9 +89,24 @@ CREATE TABLE IF NOT EXISTS trend_analysis (
     trend_score DECIMAL(3,2) DEFAULT 0.0,
     seasonal_factor DECIMAL(3,2) DEFAULT 1.0,
     region VARCHAR(100),
+    season VARCHAR(20), -- spring, summer, autumn, winter, all
     analysis_data JSONB DEFAULT '{}',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
+ALTER TABLE trend_analysis ADD COLUMN IF NOT EXISTS season VARCHAR(20);
+
+-- Latest trend_analysis row per style and region (kept current by refresh_trend_latest)
+CREATE TABLE IF NOT EXISTS trend_latest (
+    style VARCHAR(100) NOT NULL,
+    region VARCHAR(100) NOT NULL, -- 'global' when the source row has no region
+    season VARCHAR(20),
+    trend_score DECIMAL(3,2),
+    seasonal_factor DECIMAL(3,2),
+    analysis_data JSONB DEFAULT '{}',
+    trend_id UUID,
+    as_of TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (style, region)
+);
 
 -- Local stores and availability
 CREATE TABLE IF NOT EXISTS local_stores (
@@ -101,10 +134,21 @@ CREATE TABLE IF NOT EXISTS store_inventory (
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_artwork_style_tags ON artwork USING GIN(style_tags);
 CREATE INDEX IF NOT EXISTS idx_artwork_price ON artwork(price);
+CREATE INDEX IF NOT EXISTS idx_artwork_width_height ON artwork(width_cm, height_cm);
+CREATE INDEX IF NOT EXISTS idx_artwork_change_xid_id ON artwork(change_xid, id);
+CREATE INDEX IF NOT EXISTS idx_artwork_tombstone_change_xid ON artwork_tombstone(change_xid, artwork_id);
+CREATE INDEX IF NOT EXISTS idx_artwork_canonical_id ON artwork(canonical_id) WHERE canonical_id IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_room_upload_user_id ON room_upload(user_id);
 CREATE INDEX IF NOT EXISTS idx_session_user_id ON session(user_id);
+CREATE INDEX IF NOT EXISTS idx_artwork_embedding_artwork_id ON artwork_embedding(artwork_id, model_version);
 CREATE INDEX IF NOT EXISTS idx_artwork_embedding_vector ON artwork_embedding USING ivfflat (vector vector_cosine_ops);
 CREATE INDEX IF NOT EXISTS idx_local_stores_location ON local_stores(latitude, longitude);
+CREATE INDEX IF NOT EXISTS idx_trend_analysis_style_region_created ON trend_analysis(style, region, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_trend_analysis_created_at ON trend_analysis USING BRIN(created_at);
+CREATE INDEX IF NOT EXISTS idx_trend_latest_region_season ON trend_latest(region, season);
+-- Superseded by the change_xid indexes
+DROP INDEX IF EXISTS idx_artwork_updated_at_id;
+DROP INDEX IF EXISTS idx_artwork_tombstone_deleted_at;
 
 -- Row Level Security (RLS) policies
 ALTER TABLE user_profiles ENABLE ROW LEVEL SECURITY;
@@ -139,3 +183,60 @@ CREATE TRIGGER update_user_profiles_updated_at BEFORE UPDATE ON user_profiles
 
 CREATE TRIGGER update_artwork_updated_at BEFORE UPDATE ON artwork
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Change feed: stamp every artwork write with its transaction id
+CREATE OR REPLACE FUNCTION stamp_artwork_change_xid()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.change_xid = txid_current();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER stamp_artwork_change_xid BEFORE INSERT OR UPDATE ON artwork
+    FOR EACH ROW EXECUTE FUNCTION stamp_artwork_change_xid();
+
+-- Change feed: record deleted artworks
+CREATE OR REPLACE FUNCTION record_artwork_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO artwork_tombstone (artwork_id, deleted_at, change_xid)
+    VALUES (OLD.id, NOW(), txid_current())
+    ON CONFLICT (artwork_id) DO UPDATE
+        SET deleted_at = EXCLUDED.deleted_at, change_xid = EXCLUDED.change_xid;
+    RETURN OLD;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER record_artwork_tombstone_on_delete AFTER DELETE ON artwork
+    FOR EACH ROW EXECUTE FUNCTION record_artwork_tombstone();
+
+-- Trend rollup: keep trend_latest at the newest row per (style, region)
+CREATE OR REPLACE FUNCTION refresh_trend_latest()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO trend_latest (style, region, season, trend_score, seasonal_factor, analysis_data, trend_id, as_of)
+    VALUES (
+        NEW.style,
+        COALESCE(NEW.region, 'global'),
+        COALESCE(NEW.season, NEW.analysis_data->>'season'),
+        NEW.trend_score,
+        NEW.seasonal_factor,
+        NEW.analysis_data,
+        NEW.id,
+        NEW.created_at
+    )
+    ON CONFLICT (style, region) DO UPDATE SET
+        season = EXCLUDED.season,
+        trend_score = EXCLUDED.trend_score,
+        seasonal_factor = EXCLUDED.seasonal_factor,
+        analysis_data = EXCLUDED.analysis_data,
+        trend_id = EXCLUDED.trend_id,
+        as_of = EXCLUDED.as_of
+    WHERE trend_latest.as_of <= EXCLUDED.as_of;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER refresh_trend_latest_on_insert AFTER INSERT ON trend_analysis
+    FOR EACH ROW EXECUTE FUNCTION refresh_trend_latest();
@@ -1,27 +1,129 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, load_only
+from pydantic import BaseModel, Field
+from functools import partial
+from typing import Optional
+import logging
+import uuid
 import uvicorn
 import os
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 # Import models and database
-from models.database import get_db
-from models.artwork import Artwork
+from models.database import get_db, get_read_db, check_database, reads_own_writes, router as db_router
+from models.artwork import Artwork, to_cm
 from models.user import UserProfile, RoomUpload, Session as UserSession
 from models.trend import TrendAnalysis, LocalStore
+from services.serialization import (
+    ARTWORK_DETAIL_FIELDS,
+    ARTWORK_SUMMARY_FIELDS,
+    PreEncodedJSONResponse,
+    artwork_serializer,
+    assemble_json,
+    dumps,
+    parse_fields,
+)
+from services.model_registry import registry, register_default_models, parse_names
+from services.vector_store import EMBEDDING_STORE_DIR, EmbeddingStore
+from services.encoders import load_encoder
+from services.batching import BatchedEncoder
+from services.recommendation_stream import RecommendationStream, fetch_artworks
+from services.voice import IncrementalTranscriber, load_transcriber
+from services.session_logger import session_log
+from services.wall_fit import filter_fitting, wall_size_from_detection
+from services.facets import FacetCache
+from services.color_harmony import HarmonyCache, harmony_colors
+from services.room_analysis import RoomAnalysisCache, analyze_with_cache
+from services.trends import latest_trends, trend_history
+from services.change_feed import changes_since, decode_token, encode_token
+from services.singleflight import single_flight
+from services.admission import AdmissionController, AdmissionControlMiddleware, RouteLimit
+from services.compression import CompressionMiddleware, CompressionStats
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Models load lazily; PRELOAD_MODELS are warmed in the background and gate /ready
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "")
+register_default_models(registry, preload=PRELOAD_MODELS)
+registry.register(
+    "artwork_index",
+    loader=lambda: EmbeddingStore(EMBEDDING_STORE_DIR).attach(),
+    kind="index",
+    preload="artwork_index" in parse_names(PRELOAD_MODELS),
+    check=lambda store: store.describe(),
+)
+registry.register(
+    "query_encoder",
+    loader=lambda: BatchedEncoder(
+        load_encoder(os.getenv("QUERY_ENCODER", "clip")),
+        max_batch_size=int(os.getenv("QUERY_BATCH_SIZE", "32")),
+        max_wait_ms=float(os.getenv("QUERY_BATCH_WAIT_MS", "5")),
+    ),
+    kind="model",
+    preload="query_encoder" in parse_names(PRELOAD_MODELS),
+)
+registry.register(
+    "transcriber",
+    loader=lambda: load_transcriber(os.getenv("VOICE_TRANSCRIBER", "whisper")),
+    kind="model",
+    preload="transcriber" in parse_names(PRELOAD_MODELS),
+)
+registry.register(
+    "database",
+    loader=check_database,
+    kind="db_pool",
+    preload=True,
+    check=lambda _: check_database(),
+)
+
 app = FastAPI(
     title="Art.Decor.AI API",
     description="AI-powered interior design and decoration API with multimodal input support",
     version="1.0.0"
 )
 
-# CORS middleware
+# Expensive routes get bounded concurrency and queues; everything else bypasses
+# admission so cheap catalog reads are never stuck behind uploads
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+recommendation_limit = RouteLimit(
+    max_concurrent=int(os.getenv("RECOMMENDATIONS_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("RECOMMENDATIONS_QUEUE", "32")),
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    retry_after=2,
+)
+admission = AdmissionController({
+    ("POST", "/rooms/analyze"): RouteLimit(
+        max_concurrent=int(os.getenv("ROOM_ANALYZE_CONCURRENCY", "4")),
+        max_queue=int(os.getenv("ROOM_ANALYZE_QUEUE", "16")),
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+        retry_after=5,
+    ),
+    # Streamed and buffered recommendations share one set of slots
+    ("POST", "/recommendations"): recommendation_limit,
+    ("POST", "/recommendations/stream"): recommendation_limit,
+})
+app.add_middleware(AdmissionControlMiddleware, controller=admission)
+
+# gzip/brotli for buffered responses; SSE and other streams pass through
+compression_stats = CompressionStats()
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5")),
+    stats=compression_stats,
+)
+
+# CORS middleware (added last so it also wraps shed responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  # Frontend URL
@@ -30,6 +132,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_model_warm_up():
+    registry.start_warm_up()
+
+@app.on_event("startup")
+async def start_session_log():
+    session_log.start()
+
+@app.on_event("shutdown")
+async def flush_session_log():
+    session_log.stop()
+
 # API Routes
 @app.get("/")
 async def root():
@@ -46,24 +160,116 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: preloaded models, indexes and DB pools are loaded"""
+    report = registry.status()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@app.get("/metrics")
+async def get_metrics():
+    """Internal counters for caches and background writers"""
+    return {
+        "artwork_serializer": artwork_serializer.stats(),
+        "session_log": session_log.stats(),
+        "admission": admission.stats(),
+        "color_harmony": harmony_cache.stats(),
+        "room_analysis_cache": room_analysis_cache.stats(),
+        "compression": compression_stats.snapshot(),
+        "single_flight": single_flight.stats(),
+        "database_replicas": db_router.status(),
+        "query_encoder": registry.get("query_encoder").stats() if registry.is_loaded("query_encoder") else None,
+    }
 
 # Artwork endpoints
-@app.get("/artworks")
-async def get_artworks(
+def is_canonical():
+    return or_(Artwork.canonical_id.is_(None), Artwork.canonical_id == Artwork.id)
+
+def canonical_only(query):
+    """Only list the canonical member of each near-duplicate cluster"""
+    return query.filter(is_canonical())
+
+def load_facet_rows(db: Session):
+    return db.query(
+        Artwork.id, Artwork.style_tags, Artwork.brand, Artwork.price, is_canonical()
+    ).yield_per(10000)
+
+# Facet bitmaps are rebuilt from the catalog at most once a minute per worker
+facet_cache = FacetCache(load_facet_rows, ttl=float(os.getenv("FACET_TTL_SECONDS", "60")))
+
+def load_palette_rows(db: Session):
+    return canonical_only(db.query(Artwork.id, Artwork.dominant_palette)).yield_per(10000)
+
+# Hue-wheel features of every artwork palette, rebuilt at most every HARMONY_TTL_SECONDS
+harmony_cache = HarmonyCache(load_palette_rows, ttl=float(os.getenv("HARMONY_TTL_SECONDS", "300")))
+
+def harmony_response(db: Session, colors, k: int, schemes: Optional[str]) -> PreEncodedJSONResponse:
+    """Artworks whose palettes harmonize with the given colours, best first"""
+    try:
+        result = harmony_cache.get(db).recommend(
+            colors, max(1, min(k, 100)), schemes.split(",") if schemes else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    ids = [artwork_id for artwork_id, _, _ in result["matches"]]
+    columns = [getattr(Artwork, name) for name in ARTWORK_SUMMARY_FIELDS + ("updated_at",) if name != "id"]
+    rows = db.query(Artwork).options(load_only(*columns)).filter(Artwork.id.in_(ids)).all() if ids else []
+    by_id = {artwork.id: artwork for artwork in rows}
+    matches = [
+        assemble_json({
+            "artwork": artwork_serializer.encode(by_id[artwork_id], ARTWORK_SUMMARY_FIELDS),
+            "score": score,
+            "scheme": scheme
+        })
+        for artwork_id, score, scheme in result["matches"]
+        if artwork_id in by_id
+    ]
+    return PreEncodedJSONResponse(assemble_json({
+        "palette": result["palette"],
+        "matches": b"[" + b",".join(matches) + b"]"
+    }))
+
+@app.get("/artworks", response_class=PreEncodedJSONResponse)
+def get_artworks(
     skip: int = 0,
     limit: int = 20,
     style: str = None,
     price_min: float = None,
     price_max: float = None,
-    db: Session = Depends(get_db)
+    brand: str = None,
+    collapse_duplicates: bool = True,
+    include_facets: bool = False,
+    fields: str = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get artworks with optional filtering"""
-    query = db.query(Artwork)
+    """Get artworks with optional filtering and facet counts
+
+    fields selects the returned columns ("summary" or e.g. "title,price");
+    columns outside it are not fetched from the database. A plain def, so the
+    queries and facet index rebuilds run in the threadpool, off the event loop.
+    """
+    try:
+        fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # updated_at is the serializer cache's version stamp, so it is always loaded
+    columns = [getattr(Artwork, name) for name in fields + ("updated_at",) if name != "id"]
+    query = db.query(Artwork).options(load_only(*columns))
+    
+    if collapse_duplicates:
+        query = canonical_only(query)
     
     if style:
         query = query.filter(Artwork.style_tags.contains([style]))
     
+    if brand:
+        query = query.filter(Artwork.brand == brand)
+    
     if price_min is not None:
         query = query.filter(Artwork.price >= price_min)
     
@@ -71,63 +277,148 @@ async def get_artworks(
         query = query.filter(Artwork.price <= price_max)
     
     artworks = query.offset(skip).limit(limit).all()
-    return {
-        "artworks": [
-            {
-                "id": str(artwork.id),
-                "title": artwork.title,
-                "brand": artwork.brand,
-                "price": artwork.price,
-                "style_tags": artwork.style_tags,
-                "dominant_palette": artwork.dominant_palette,
-                "image_url": artwork.image_url,
-                "dimensions": artwork.dimensions,
-                "description": artwork.description
-            }
-            for artwork in artworks
-        ],
+    payload = {
+        "artworks": artwork_serializer.encode_many(artworks, fields),
         "total": query.count(),
         "skip": skip,
         "limit": limit
     }
+    if include_facets:
+        payload["facets"] = facet_cache.get(db).counts(
+            style=style,
+            brand=brand,
+            price_min=price_min,
+            price_max=price_max,
+            collapse_duplicates=collapse_duplicates,
+        )
+    return PreEncodedJSONResponse(assemble_json(payload))
+
+@app.get("/artworks/fit", response_class=PreEncodedJSONResponse)
+def get_fitting_artworks(
+    wall_width: float = None,
+    wall_height: float = None,
+    unit: str = "cm",
+    room_id: str = None,
+    min_coverage: float = 0.5,
+    max_coverage: float = 0.75,
+    style: str = None,
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_read_db)
+):
+    """Get artworks sized to cover a share of a wall's width"""
+    if room_id:
+        room = db.query(RoomUpload).filter(RoomUpload.id == room_id).first()
+        if not room:
+            raise HTTPException(status_code=404, detail="Room upload not found")
+        wall_width_cm, wall_height_cm = wall_size_from_detection(room.wall_detection_json)
+    else:
+        wall_width_cm, wall_height_cm = to_cm(wall_width, unit), to_cm(wall_height, unit)
+    
+    if wall_width_cm is None:
+        raise HTTPException(status_code=400, detail="A wall width or a room with detected walls is required")
+    
+    query = canonical_only(db.query(Artwork))
+    if style:
+        query = query.filter(Artwork.style_tags.contains([style]))
+    try:
+        query = filter_fitting(query, wall_width_cm, wall_height_cm, min_coverage, max_coverage)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    artworks = query.offset(skip).limit(limit).all()
+    return PreEncodedJSONResponse(assemble_json({
+        "artworks": artwork_serializer.encode_many(artworks),
+        "wall": {"width_cm": wall_width_cm, "height_cm": wall_height_cm},
+        "coverage": {"min": min_coverage, "max": max_coverage},
+        "skip": skip,
+        "limit": limit
+    }))
+
+@app.get("/artworks/changes", response_class=PreEncodedJSONResponse)
+def get_artwork_changes(
+    since: str = None,
+    limit: int = 500,
+    db: Session = Depends(get_db)
+):
+    """Get artwork inserts, updates and deletes after a change token
+    
+    Tokens follow writing transaction ids and only cover transactions that
+    have finished, so no change lands behind a token already handed out. A
+    transaction that stays open holds the feed back until it ends.
+    Reads the primary: replica lag could otherwise skip rows behind the token.
+    """
+    try:
+        cursor = decode_token(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    changes, has_more = changes_since(db, cursor, max(1, min(limit, 1000)))
+    items = [
+        assemble_json({
+            "op": change.op,
+            "id": str(change.artwork_id),
+            "at": change.at.isoformat(),
+            "artwork": artwork_serializer.encode(change.artwork, ARTWORK_DETAIL_FIELDS) if change.artwork else None
+        })
+        for change in changes
+    ]
+    return PreEncodedJSONResponse(assemble_json({
+        "changes": b"[" + b",".join(items) + b"]",
+        "next": encode_token(changes[-1].cursor) if changes else since,
+        "has_more": has_more
+    }))
+
+@app.get("/artworks/harmony", response_class=PreEncodedJSONResponse)
+def get_harmonizing_artworks(
+    colors: str,
+    k: int = 20,
+    schemes: str = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get artworks that harmonize with a palette of comma-separated hex colours
+    
+    schemes limits the relationships considered (complementary, analogous,
+    triadic, split_complementary).
+    """
+    return harmony_response(db, [color.strip() for color in colors.split(",")], k, schemes)
 
-@app.get("/artworks/{artwork_id}")
-async def get_artwork(artwork_id: str, db: Session = Depends(get_db)):
+@app.get("/artworks/{artwork_id}", response_class=PreEncodedJSONResponse)
+async def get_artwork(artwork_id: str, db: Session = Depends(get_read_db)):
     """Get a specific artwork by ID"""
     artwork = db.query(Artwork).filter(Artwork.id == artwork_id).first()
     if not artwork:
         raise HTTPException(status_code=404, detail="Artwork not found")
     
-    return {
-        "id": str(artwork.id),
-        "title": artwork.title,
-        "brand": artwork.brand,
-        "price": artwork.price,
-        "style_tags": artwork.style_tags,
-        "dominant_palette": artwork.dominant_palette,
-        "image_url": artwork.image_url,
-        "dimensions": artwork.dimensions,
-        "description": artwork.description,
-        "created_at": artwork.created_at.isoformat()
-    }
+    return PreEncodedJSONResponse(artwork_serializer.encode(artwork, ARTWORK_DETAIL_FIELDS))
+
+# Identical concurrent catalog reads share one query on a session of their
+# own, except for users pinned to the primary, who must see their own writes
+coalesce_reads = single_flight.coalesce(
+    bypass=lambda kwargs: reads_own_writes(kwargs["db"]),
+    session_factory=db_router.read_session,
+)
 
 # Style and trend endpoints
 @app.get("/styles")
-async def get_available_styles(db: Session = Depends(get_db)):
+@coalesce_reads
+def get_available_styles(db: Session = Depends(get_read_db)):
     """Get all available artwork styles"""
-    # Get unique styles from artwork tags
-    artworks = db.query(Artwork).all()
-    all_tags = []
-    for artwork in artworks:
-        all_tags.extend(artwork.style_tags)
-    
-    unique_styles = list(set(all_tags))
-    return {"styles": unique_styles}
+    # Distinct tags are computed in the database instead of loading every artwork
+    tag = func.unnest(Artwork.style_tags).label("tag")
+    rows = db.query(tag).distinct().order_by(tag).all()
+    return {"styles": [row.tag for row in rows]}
 
 @app.get("/trends")
-async def get_trend_analysis(db: Session = Depends(get_db)):
-    """Get current trend analysis"""
-    trends = db.query(TrendAnalysis).all()
+@coalesce_reads
+def get_trend_analysis(
+    region: str = None,
+    style: str = None,
+    season: str = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get the latest trend score per style, optionally for one region, style or season"""
+    trends = latest_trends(db, region=region, style=style, season=season).all()
     return {
         "trends": [
             {
@@ -135,15 +426,49 @@ async def get_trend_analysis(db: Session = Depends(get_db)):
                 "trend_score": trend.trend_score,
                 "seasonal_factor": trend.seasonal_factor,
                 "region": trend.region,
-                "analysis_data": trend.analysis_data
+                "season": trend.season,
+                "analysis_data": trend.analysis_data,
+                "as_of": trend.as_of.isoformat() if trend.as_of else None
             }
             for trend in trends
         ]
     }
 
+@app.get("/trends/history")
+@coalesce_reads
+def get_trend_history(
+    style: str = None,
+    region: str = None,
+    bucket: str = "week",
+    since: datetime = None,
+    until: datetime = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get trend scores aggregated into hour, day, week or month buckets"""
+    try:
+        rows = trend_history(db, style=style, region=region, bucket=bucket, since=since, until=until).all()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    series = {}
+    for row in rows:
+        series.setdefault((row.style, row.region), []).append({
+            "bucket": row.bucket.isoformat(),
+            "avg_score": round(float(row.avg_score), 4),
+            "max_score": float(row.max_score),
+            "samples": row.samples
+        })
+    return {
+        "bucket": bucket,
+        "series": [
+            {"style": style_name, "region": region_name, "points": points}
+            for (style_name, region_name), points in series.items()
+        ]
+    }
+
 # User profile endpoints
 @app.get("/users/{user_id}/profile")
-async def get_user_profile(user_id: str, db: Session = Depends(get_db)):
+async def get_user_profile(user_id: str, db: Session = Depends(get_read_db)):
     """Get user profile and preferences"""
     profile = db.query(UserProfile).filter(UserProfile.id == user_id).first()
     if not profile:
@@ -159,9 +484,38 @@ async def get_user_profile(user_id: str, db: Session = Depends(get_db)):
     }
 
 # Room analysis endpoints (placeholder for Week 2)
+# Analyses of recent uploads keyed on a perceptual hash, so re-uploads of the same shot are free
+room_analysis_cache = RoomAnalysisCache(
+    max_bytes=int(os.getenv("ROOM_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    max_distance=int(os.getenv("ROOM_CACHE_MAX_DISTANCE", "6"))
+)
+ROOM_UPLOAD_MAX_BYTES = int(os.getenv("ROOM_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+
 @app.post("/rooms/analyze")
-async def analyze_room():
-    """Analyze uploaded room image - Week 2 implementation"""
+async def analyze_room(file: UploadFile = File(None)):
+    """Analyze uploaded room image - Week 2 implementation
+    
+    A near-identical earlier upload (within ROOM_CACHE_MAX_DISTANCE bits of
+    its perceptual hash) returns the cached analysis instead of re-running it.
+    """
+    if file is not None:
+        # Never hold more than the limit in memory, whatever the client sends
+        data = await file.read(ROOM_UPLOAD_MAX_BYTES + 1)
+        if len(data) > ROOM_UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Upload is larger than {ROOM_UPLOAD_MAX_BYTES} bytes")
+        try:
+            analysis, phash, distance = await run_in_threadpool(analyze_with_cache, data, room_analysis_cache)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ImportError:
+            raise HTTPException(status_code=503, detail="Image decoding is unavailable (Pillow is not installed)")
+        return PreEncodedJSONResponse(assemble_json({
+            "phash": f"{phash:016x}",
+            "cached": distance is not None,
+            "distance": distance,
+            "analysis": analysis
+        }))
+    
     return {
         "message": "Room analysis endpoint - to be implemented in Week 2",
         "features": [
@@ -172,6 +526,23 @@ async def analyze_room():
         ]
     }
 
+@app.get("/rooms/{room_id}/harmony", response_class=PreEncodedJSONResponse)
+def get_room_harmony(
+    room_id: str,
+    k: int = 20,
+    schemes: str = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get artworks that harmonize with an analyzed room's palette"""
+    room = db.query(RoomUpload).filter(RoomUpload.id == room_id).first()
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    
+    colors = harmony_colors(room.palette_json)
+    if not colors:
+        raise HTTPException(status_code=422, detail="Room has no extracted palette yet")
+    return harmony_response(db, colors, k, schemes)
+
 # Recommendation endpoints (placeholder for Week 3-4)
 @app.post("/recommendations")
 async def get_recommendations():
@@ -186,5 +557,128 @@ async def get_recommendations():
         ]
     }
 
+class RecommendationRequest(BaseModel):
+    query_text: str
+    user_id: Optional[str] = None
+    k: int = Field(10, ge=1, le=50)
+
+async def load_recommendation_pipeline(k: int, user_id: Optional[str] = None) -> RecommendationStream:
+    """Resolve the encoder and index (raises LookupError when they cannot load)"""
+    try:
+        encoder = await run_in_threadpool(registry.get, "query_encoder")
+        store = await run_in_threadpool(registry.get, "artwork_index")
+    except Exception as e:
+        raise LookupError("Recommendation models are not available") from e
+    
+    # The pipeline outlives request dependencies, so it opens its own read session
+    return RecommendationStream(
+        encoder,
+        store,
+        fetch=partial(fetch_artworks, partial(db_router.read_session, user_id)),
+        log=session_log,
+        k=k,
+    )
+
+def parse_user_id(user_id: Optional[str]) -> Optional[uuid.UUID]:
+    if not user_id:
+        return None
+    try:
+        return uuid.UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="user_id must be a UUID")
+
+@app.post("/recommendations/stream")
+async def stream_recommendations(request: RecommendationRequest):
+    """Stream recommendations over SSE: candidates, artworks, rationales, done"""
+    user_id = parse_user_id(request.user_id)
+    try:
+        pipeline = await load_recommendation_pipeline(request.k, request.user_id)
+    except LookupError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return StreamingResponse(
+        pipeline.events(request.query_text, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def send_voice_recommendations(websocket: WebSocket, transcript: str, k: int,
+                                     user_id: Optional[str], user_uuid: Optional[uuid.UUID]):
+    """Recommendation stages for a final transcript, under the recommendation slots
+    
+    Admission middleware only sees HTTP requests, so the socket takes its
+    slot here, for the pipeline stage only.
+    """
+    if not await recommendation_limit.acquire():
+        await websocket.send_json({
+            "type": "error",
+            "detail": "Server busy, retry later",
+            "retry_after": recommendation_limit.retry_after,
+        })
+        return
+    try:
+        try:
+            pipeline = await load_recommendation_pipeline(max(1, min(k, 50)), user_id)
+        except LookupError as e:
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            return
+        async for event, data in pipeline.stages(transcript, user_uuid, query_type="voice"):
+            if event == "error":
+                # Same shape as the socket's own error messages
+                await websocket.send_json({"type": "error", **data})
+                continue
+            encoded = data if isinstance(data, bytes) else dumps(data)
+            await websocket.send_text(
+                (b'{"type":' + dumps(event) + b',"data":' + encoded + b"}").decode("utf-8")
+            )
+    finally:
+        recommendation_limit.release()
+
+@app.websocket("/ws/voice")
+async def voice_query(websocket: WebSocket, sample_rate: int = 16000, k: int = 10, user_id: str = None):
+    """Voice query: PCM16 chunks in, partial transcripts then recommendation stages out
+    
+    Send binary PCM16 mono audio chunks, then the text message "end".
+    """
+    await websocket.accept()
+    if sample_rate <= 0:
+        await websocket.send_json({"type": "error", "detail": "sample_rate must be positive"})
+        await websocket.close(code=1008)
+        return
+    try:
+        user_uuid = parse_user_id(user_id)
+        transcriber = await run_in_threadpool(registry.get, "transcriber")
+    except Exception as e:
+        await websocket.send_json({"type": "error", "detail": getattr(e, "detail", "Transcriber is not available")})
+        await websocket.close(code=1011)
+        return
+    
+    utterance = IncrementalTranscriber(transcriber, sample_rate=sample_rate)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                partial_text = await run_in_threadpool(utterance.feed, message["bytes"])
+                if partial_text is not None:
+                    await websocket.send_json({"type": "partial", "text": partial_text})
+            elif message.get("text") == "end":
+                break
+        
+        transcript = await run_in_threadpool(utterance.finish)
+        await websocket.send_json({"type": "final", "text": transcript, **utterance.stats()})
+        
+        # Search starts on the final transcript straight away
+        if transcript:
+            await send_voice_recommendations(websocket, transcript, k, user_id, user_uuid)
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
+    except Exception:
+        logger.exception("Voice query failed")
+        await websocket.send_json({"type": "error", "detail": "Voice query failed, please retry"})
+        await websocket.close(code=1011)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
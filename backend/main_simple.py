@@ -5,6 +5,10 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import json
+import os
+
+from services.catalog_index import CatalogIndex, load_catalog
+from services.serialization import PreEncodedJSONResponse, assemble_json
 
 app = FastAPI(
     title="Art.Decor.AI API",
@@ -89,6 +93,13 @@ MOCK_TRENDS = [
     }
 ]
 
+# Optional JSON/NDJSON dataset (see scripts/seed_artwork_dataset.py --export);
+# falls back to the three mock artworks above
+MOCK_DATASET_PATH = os.getenv("MOCK_DATASET_PATH")
+catalog = load_catalog(MOCK_DATASET_PATH) if MOCK_DATASET_PATH else CatalogIndex(MOCK_ARTWORKS)
+# A loaded dataset lists the styles its artworks carry; the mock catalog keeps its curated list
+AVAILABLE_STYLES = catalog.style_names() if MOCK_DATASET_PATH else MOCK_STYLES
+
 # API Routes
 @app.get("/")
 async def root():
@@ -107,7 +118,7 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
 
-@app.get("/artworks")
+@app.get("/artworks", response_class=PreEncodedJSONResponse)
 async def get_artworks(
     skip: int = 0,
     limit: int = 20,
@@ -115,43 +126,29 @@ async def get_artworks(
     price_min: float = None,
     price_max: float = None
 ):
-    """Get artworks with optional filtering"""
-    artworks = MOCK_ARTWORKS.copy()
-    
-    # Apply filters
-    if style:
-        artworks = [art for art in artworks if style in art["style_tags"]]
-    
-    if price_min is not None:
-        artworks = [art for art in artworks if art["price"] >= price_min]
-        
-    if price_max is not None:
-        artworks = [art for art in artworks if art["price"] <= price_max]
+    """Get artworks with optional filtering (cheapest first when a price bound is given)"""
+    total, artworks = catalog.query(style, price_min, price_max, skip, limit)
     
-    # Apply pagination
-    total = len(artworks)
-    artworks = artworks[skip:skip + limit]
-    
-    return {
-        "artworks": artworks,
+    return PreEncodedJSONResponse(assemble_json({
+        "artworks": b"[" + b",".join(artworks) + b"]",
         "total": total,
         "skip": skip,
         "limit": limit
-    }
+    }))
 
-@app.get("/artworks/{artwork_id}")
+@app.get("/artworks/{artwork_id}", response_class=PreEncodedJSONResponse)
 async def get_artwork(artwork_id: str):
     """Get a specific artwork by ID"""
-    artwork = next((art for art in MOCK_ARTWORKS if art["id"] == artwork_id), None)
+    artwork = catalog.get(artwork_id)
     if not artwork:
         raise HTTPException(status_code=404, detail="Artwork not found")
     
-    return artwork
+    return PreEncodedJSONResponse(artwork)
 
 @app.get("/styles")
 async def get_available_styles():
     """Get all available artwork styles"""
-    return {"styles": MOCK_STYLES}
+    return {"styles": AVAILABLE_STYLES}
 
 @app.get("/trends")
 async def get_trend_analysis():
@@ -1,9 +1,38 @@
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, JSON, ARRAY
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Text, DateTime, JSON, ARRAY, DDL, event, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from .database import Base
 import uuid
 
+# Centimetres per unit accepted in dimension JSON blobs
+UNIT_TO_CM = {
+    "mm": 0.1,
+    "cm": 1.0,
+    "centimeters": 1.0,
+    "m": 100.0,
+    "meters": 100.0,
+    "in": 2.54,
+    "inch": 2.54,
+    "inches": 2.54,
+    "ft": 30.48,
+    "feet": 30.48,
+}
+
+def to_cm(value, unit="inches"):
+    """Convert a length to centimetres, None if it cannot be parsed"""
+    factor = UNIT_TO_CM.get(str(unit or "inches").strip().lower())
+    try:
+        return round(float(value) * factor, 2) if factor and value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def normalize_dimensions(dimensions):
+    """(width_cm, height_cm) from a {"width", "height", "unit"} blob"""
+    if not isinstance(dimensions, dict):
+        return None, None
+    unit = dimensions.get("unit")
+    return to_cm(dimensions.get("width"), unit), to_cm(dimensions.get("height"), unit)
+
 class Artwork(Base):
     __tablename__ = "artwork"
     
@@ -15,9 +44,64 @@ class Artwork(Base):
     dominant_palette = Column(JSON, default={})
     image_url = Column(Text, nullable=False)
     dimensions = Column(JSON, default={})
+    width_cm = Column(Float)  # Derived from dimensions for range queries
+    height_cm = Column(Float)
     description = Column(Text)
+    canonical_id = Column(UUID(as_uuid=True))  # Set by the dedup job for near-duplicate clusters
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    change_xid = Column(BigInteger, nullable=False, server_default=text("0"))  # Writing transaction, set by trigger
+
+@event.listens_for(Artwork, "before_insert")
+@event.listens_for(Artwork, "before_update")
+def sync_dimension_columns(mapper, connection, artwork):
+    artwork.width_cm, artwork.height_cm = normalize_dimensions(artwork.dimensions)
+
+class ArtworkTombstone(Base):
+    """Deleted artwork ids for the change feed, written by an AFTER DELETE trigger"""
+    __tablename__ = "artwork_tombstone"
+    
+    artwork_id = Column(UUID(as_uuid=True), primary_key=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    change_xid = Column(BigInteger, nullable=False, server_default=text("txid_current()"))
+
+# Change feed triggers, mirrored from database/schema.sql so that databases built
+# with Base.metadata.create_all (seed and workload scripts) get them too; without
+# them change_xid stays 0 and deletes leave no tombstone, so the feed is empty
+CHANGE_FEED_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION stamp_artwork_change_xid()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.change_xid = txid_current();
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql'
+    """,
+    """
+    CREATE TRIGGER stamp_artwork_change_xid BEFORE INSERT OR UPDATE ON artwork
+        FOR EACH ROW EXECUTE FUNCTION stamp_artwork_change_xid()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION record_artwork_tombstone()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO artwork_tombstone (artwork_id, deleted_at, change_xid)
+        VALUES (OLD.id, NOW(), txid_current())
+        ON CONFLICT (artwork_id) DO UPDATE
+            SET deleted_at = EXCLUDED.deleted_at, change_xid = EXCLUDED.change_xid;
+        RETURN OLD;
+    END;
+    $$ language 'plpgsql'
+    """,
+    """
+    CREATE TRIGGER record_artwork_tombstone_on_delete AFTER DELETE ON artwork
+        FOR EACH ROW EXECUTE FUNCTION record_artwork_tombstone()
+    """,
+)
+
+for statement in CHANGE_FEED_DDL:
+    event.listen(Artwork.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
 
 class ArtworkEmbedding(Base):
     __tablename__ = "artwork_embedding"
@@ -25,4 +109,5 @@ class ArtworkEmbedding(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vector = Column(JSON)  # Will store the embedding vector
     artwork_id = Column(UUID(as_uuid=True), nullable=False)
+    model_version = Column(String(100))  # Encoder that produced the vector
     created_at = Column(DateTime(timezone=True), server_default=func.now())
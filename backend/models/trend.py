@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, JSON, Boolean, Integer
+from sqlalchemy import Column, String, Float, DateTime, JSON, Boolean, Integer, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from .database import Base
@@ -12,9 +12,28 @@ class TrendAnalysis(Base):
     trend_score = Column(Float, default=0.0)
     seasonal_factor = Column(Float, default=1.0)
     region = Column(String(100))
+    season = Column(String(20))  # spring, summer, autumn, winter, all
     analysis_data = Column(JSON, default={})
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+@event.listens_for(TrendAnalysis, "before_insert")
+def sync_season_column(mapper, connection, trend):
+    if not trend.season and isinstance(trend.analysis_data, dict):
+        trend.season = trend.analysis_data.get("season")
+
+class TrendLatest(Base):
+    """Latest trend_analysis row per (style, region), maintained by an insert trigger"""
+    __tablename__ = "trend_latest"
+    
+    style = Column(String(100), primary_key=True)
+    region = Column(String(100), primary_key=True)  # 'global' when the source row has none
+    season = Column(String(20))
+    trend_score = Column(Float)
+    seasonal_factor = Column(Float)
+    analysis_data = Column(JSON, default={})
+    trend_id = Column(UUID(as_uuid=True))
+    as_of = Column(DateTime(timezone=True))
+
 class LocalStore(Base):
     __tablename__ = "local_stores"
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, JSON, ARRAY
+from sqlalchemy import Column, String, DateTime, JSON, ARRAY, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from .database import Base
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Embedding Backfill Script
+Computes embeddings for every artwork that has none for the current encoder
+model version, using a process pool and a checkpoint that lets an
+interrupted run resume (it is removed once a run completes)
+
+Usage (from backend/):
+    python -m scripts.backfill_embeddings --image-root ./data/images --encoder clip
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import List, Tuple
+from urllib.parse import urlparse
+
+from sqlalchemy import and_, exists, insert
+
+from models.database import SessionLocal
+from models.artwork import Artwork, ArtworkEmbedding
+from services.encoders import load_encoder
+
+CHECKPOINT_PATH = ".embedding_backfill.json"
+
+
+class Checkpoint:
+    """Progress persisted after every written batch"""
+
+    def __init__(self, path: str, model_version: str):
+        self.path = path
+        self.model_version = model_version
+        self.watermark = None  # every artwork id <= watermark has been handled
+        self.encoded = 0
+        self.missing = 0
+
+    @classmethod
+    def load(cls, path: str, model_version: str, restart: bool = False) -> "Checkpoint":
+        checkpoint = cls(path, model_version)
+        if restart or not os.path.exists(path):
+            return checkpoint
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("model_version") != model_version:
+            print(f"⚠️  Checkpoint is for {data.get('model_version')}, starting over for {model_version}")
+            return checkpoint
+        checkpoint.watermark = data.get("watermark")
+        checkpoint.encoded = data.get("encoded", 0)
+        checkpoint.missing = data.get("missing", 0)
+        return checkpoint
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "model_version": self.model_version,
+                "watermark": self.watermark,
+                "encoded": self.encoded,
+                "missing": self.missing,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget the watermark once a run completes
+
+        Artwork ids are random, so new artworks land anywhere in id order;
+        a watermark kept after a full run would make the next run skip every
+        new artwork sorting below it. Only interrupted runs resume.
+        """
+        self.watermark = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def pending_artworks(db, model_version: str, after_id, limit: int):
+    """Next page (by id) of artworks without an embedding for this model version"""
+    current = exists().where(and_(
+        ArtworkEmbedding.artwork_id == Artwork.id,
+        ArtworkEmbedding.model_version == model_version,
+    ))
+    query = db.query(Artwork.id, Artwork.image_url).filter(~current)
+    if after_id is not None:
+        query = query.filter(Artwork.id > uuid.UUID(str(after_id)))
+    return query.order_by(Artwork.id).limit(limit).all()
+
+
+def local_image_path(image_root: str, image_url: str) -> str:
+    """Map an image URL onto the local mirror, e.g. .../abstract/1.jpg -> <root>/abstract/1.jpg"""
+    parsed = urlparse(image_url)
+    path = parsed.path if parsed.scheme else image_url
+    return os.path.join(image_root, path.lstrip("/"))
+
+
+# Per-process encoder, created once by the pool initializer
+_encoder = None
+
+
+def _init_worker(encoder_spec: str, threads: int = 1):
+    global _encoder
+    _encoder = load_encoder(encoder_spec)
+    # Every worker would otherwise start a thread per core and oversubscribe the CPUs
+    _encoder.limit_threads(threads)
+
+
+def encode_batch(items: List[Tuple[str, str]]):
+    """Read, decode and encode one batch inside a worker process
+
+    Unreadable files and undecodable images are reported as missing, so one
+    bad image cannot fail its batch and stall every resume on it.
+    """
+    ids, decoded, missing = [], [], []
+    for artwork_id, path in items:
+        try:
+            with open(path, "rb") as f:
+                decoded.append(_encoder.decode_image(f.read()))
+            ids.append(artwork_id)
+        except (OSError, ValueError):
+            missing.append(artwork_id)
+    vectors = _encoder.encode_decoded(decoded) if decoded else []
+    return ids, vectors, missing
+
+
+def write_embeddings(db, model_version: str, ids, vectors):
+    """Replace outdated embeddings for a batch with one bulk insert"""
+    if not ids:
+        return
+    artwork_ids = [uuid.UUID(artwork_id) for artwork_id in ids]
+    db.query(ArtworkEmbedding).filter(
+        ArtworkEmbedding.artwork_id.in_(artwork_ids)
+    ).delete(synchronize_session=False)
+    db.execute(insert(ArtworkEmbedding), [
+        {
+            "id": uuid.uuid4(),
+            "artwork_id": artwork_id,
+            "vector": [float(x) for x in vector],
+            "model_version": model_version,
+        }
+        for artwork_id, vector in zip(artwork_ids, vectors)
+    ])
+    db.commit()
+
+
+def backfill_embeddings(encoder_spec: str, image_root: str, batch_size: int = 64, workers: int = None,
+                        checkpoint_path: str = CHECKPOINT_PATH, restart: bool = False):
+    workers = workers or os.cpu_count() or 1
+    model_version = load_encoder(encoder_spec).model_version
+    checkpoint = Checkpoint.load(checkpoint_path, model_version, restart)
+    if checkpoint.watermark:
+        print(f"↩️  Resuming after {checkpoint.watermark} ({checkpoint.encoded} already encoded)")
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    encoded_this_run = 0
+    try:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(encoder_spec, threads)) as pool:
+            in_flight = {}
+            order = deque()  # (sequence, last id) in submission order
+            completed = set()
+            cursor = checkpoint.watermark
+            sequence = 0
+            exhausted = False
+
+            while True:
+                # Keep every worker busy with one batch queued behind it
+                while not exhausted and len(in_flight) < workers * 2:
+                    rows = pending_artworks(db, model_version, cursor, batch_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    cursor = rows[-1].id
+                    items = [(str(row.id), local_image_path(image_root, row.image_url)) for row in rows]
+                    in_flight[pool.submit(encode_batch, items)] = sequence
+                    order.append((sequence, str(cursor)))
+                    sequence += 1
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                # In submission order, so the watermark advances as far as it can
+                for future in sorted(finished, key=in_flight.get):
+                    ids, vectors, missing = future.result()
+                    write_embeddings(db, model_version, ids, vectors)
+                    completed.add(in_flight.pop(future))
+                    checkpoint.encoded += len(ids)
+                    checkpoint.missing += len(missing)
+                    encoded_this_run += len(ids)
+
+                    # Batches finish out of order; only advance past a contiguous prefix
+                    while order and order[0][0] in completed:
+                        done_sequence, last_id = order.popleft()
+                        completed.discard(done_sequence)
+                        checkpoint.watermark = last_id
+                    # Saved per written batch, so a failure on the next one keeps this progress
+                    checkpoint.save()
+
+                rate = encoded_this_run / max(time.perf_counter() - started, 1e-9)
+                print(f"  {checkpoint.encoded} encoded, {checkpoint.missing} missing images, {rate:.1f}/s")
+    finally:
+        db.close()
+
+    checkpoint.clear()
+    print(f"✅ Backfill complete: {checkpoint.encoded} embeddings for {model_version}")
+    return checkpoint
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill artwork embeddings")
+    parser.add_argument("--encoder", default="clip", help="clip, stub or package.module:ClassName")
+    parser.add_argument("--image-root", required=True, help="Local mirror of artwork images")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None, help="Encoder processes (default: CPU count)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    print("🧠 Starting embedding backfill...")
+    backfill_embeddings(args.encoder, args.image_root, args.batch_size, args.workers,
+                        args.checkpoint, args.restart)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Vector Search Benchmark
+Measures build time, index size, QPS, latency percentiles and recall@k of
+every embedding search mode on a synthetic catalog shaped like the seed
+dataset. Peak RSS is reported as the cumulative process high-water mark.
+
+Usage (from backend/):
+    python -m scripts.benchmark_vector_search --count 100000 --threads 1 4 8
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+
+from scripts.seed_artwork_dataset import ARTWORK_STYLES
+from services.quantization import QUANTIZATION_MODES, exact_search, recall_at_k
+from services.vector_store import EMBEDDING_DIM, EmbeddingStore, GenerationWriter
+
+SEARCH_MODES = ("exact",) + QUANTIZATION_MODES
+CHUNK_ROWS = 100000
+
+
+def style_centroids(dim: int, seed: int) -> np.ndarray:
+    """One centroid per (style, palette) pair, mirroring the seed script's catalog"""
+    rng = np.random.default_rng(seed)
+    centroids = []
+    for style_data in ARTWORK_STYLES.values():
+        style_center = rng.normal(size=dim)
+        for _ in style_data["palettes"]:
+            centroids.append(style_center + 0.5 * rng.normal(size=dim))
+    return np.asarray(centroids, dtype=np.float32)
+
+
+def generate_style_embeddings(count: int, centroids: np.ndarray, noise: float, seed: int):
+    """Yield chunks of clustered embeddings so millions of rows never sit in RAM twice"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, CHUNK_ROWS):
+        rows = min(CHUNK_ROWS, count - start)
+        labels = rng.integers(0, len(centroids), rows)
+        noise_block = rng.normal(scale=noise, size=(rows, centroids.shape[1])).astype(np.float32)
+        yield start, centroids[labels] + noise_block
+
+
+def generate_queries(count: int, centroids: np.ndarray, noise: float, seed: int) -> np.ndarray:
+    return np.concatenate([block for _, block in generate_style_embeddings(count, centroids, noise, seed)])
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of the whole process so far, not of any one index"""
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+
+
+def build_store(root: str, count: int, dim: int, modes, centroids, noise: float, seed: int) -> Dict[str, float]:
+    """Write the synthetic catalog as a store generation; returns build seconds per stage"""
+    timings = {}
+    started = time.perf_counter()
+    writer = GenerationWriter(root, count, dim, id_width=len(str(count)))
+    for start, block in generate_style_embeddings(count, centroids, noise, seed):
+        writer.write(range(start, start + len(block)), block)
+    timings["exact"] = time.perf_counter() - started
+
+    for mode in modes:
+        if mode == "exact":
+            continue
+        started = time.perf_counter()
+        writer.add_quantized(mode)
+        timings[mode] = time.perf_counter() - started
+    writer.commit()
+    return timings
+
+
+def run_queries(snapshot, mode: str, queries: np.ndarray, k: int, shortlist: int, threads: int):
+    """Run every query once on a thread pool; returns (latencies, results, wall seconds)"""
+
+    def one(query):
+        started = time.perf_counter()
+        found = snapshot.search(query, k, mode, shortlist)
+        return time.perf_counter() - started, [int(artwork_id) for artwork_id, _ in found]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(one, queries))
+    wall = time.perf_counter() - started
+    return [o[0] for o in outcomes], [o[1] for o in outcomes], wall
+
+
+def benchmark(count: int, dim: int, query_count: int, k: int, modes, thread_counts: List[int],
+              shortlist: int, noise: float, seed: int, work_dir: str = None) -> dict:
+    centroids = style_centroids(dim, seed)
+    root = tempfile.mkdtemp(prefix="vector-bench-", dir=work_dir)
+    try:
+        build_seconds = build_store(root, count, dim, modes, centroids, noise, seed + 1)
+        snapshot = EmbeddingStore(root).attach().snapshot
+
+        queries = generate_queries(query_count, centroids, noise, seed + 2)
+        started = time.perf_counter()
+        ground_truth = exact_search(snapshot.vectors, queries, k)
+        ground_truth_seconds = time.perf_counter() - started
+
+        results = []
+        for mode in modes:
+            # Warm the mapping and lazily loaded codes before timing
+            snapshot.search(queries[0], k, mode, shortlist)
+            index_bytes = int(snapshot.vectors.nbytes)
+            if mode != "exact":
+                index_bytes = int(snapshot.quantized_index(mode).codes.nbytes)
+            for threads in thread_counts:
+                latencies, found, wall = run_queries(snapshot, mode, queries, k, shortlist, threads)
+                latencies_ms = np.asarray(latencies) * 1000.0
+                results.append({
+                    "mode": mode,
+                    "threads": threads,
+                    "build_seconds": round(build_seconds[mode], 3),
+                    "index_bytes": index_bytes,
+                    "bytes_per_vector": round(index_bytes / count, 1),
+                    "qps": round(len(queries) / wall, 1),
+                    "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+                    "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+                    f"recall_at_{k}": round(recall_at_k(found, ground_truth, k), 4),
+                    # Modes run in sequence, so later rows inherit earlier peaks
+                    "cumulative_peak_rss_mb": peak_rss_mb(),
+                })
+                print(f"  {mode:>5} x{threads:<3} qps={results[-1]['qps']:<9} "
+                      f"p99={results[-1]['p99_ms']}ms recall={results[-1][f'recall_at_{k}']}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "count": count,
+            "dim": dim,
+            "queries": query_count,
+            "k": k,
+            "shortlist": shortlist,
+            "noise": noise,
+            "seed": seed,
+            "clusters": len(centroids),
+            "cpu_count": os.cpu_count(),
+        },
+        "ground_truth_seconds": round(ground_truth_seconds, 3),
+        "results": results,
+    }
+
+
+def to_markdown(report: dict) -> str:
+    config = report["config"]
+    k = config["k"]
+    lines = [
+        "# Vector Search Benchmark",
+        "",
+        f"{config['count']:,} x {config['dim']}-dim vectors, {config['queries']} queries, "
+        f"k={k}, shortlist={config['shortlist']}, {config['cpu_count']} CPUs",
+        "",
+        f"| Mode | Threads | Build (s) | Bytes/vector | QPS | p50 (ms) | p99 (ms) | Recall@{k} | Peak RSS so far (MB) |",
+        "|------|---------|-----------|--------------|-----|----------|----------|-----------|----------------------|",
+    ]
+    for row in report["results"]:
+        lines.append(
+            f"| {row['mode']} | {row['threads']} | {row['build_seconds']} | {row['bytes_per_vector']} | "
+            f"{row['qps']} | {row['p50_ms']} | {row['p99_ms']} | {row[f'recall_at_{k}']} | {row['cumulative_peak_rss_mb']} |"
+        )
+    lines += ["", "Peak RSS is the process high-water mark when the row finished; it includes every earlier mode."]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark embedding search modes")
+    parser.add_argument("--count", type=int, default=10000, help="Catalog size (10k to 5M)")
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--modes", nargs="*", default=list(SEARCH_MODES), choices=SEARCH_MODES)
+    parser.add_argument("--threads", nargs="*", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--shortlist", type=int, default=100)
+    parser.add_argument("--noise", type=float, default=0.6, help="Spread around style centroids")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--work-dir", default=None, help="Where the temporary store is written")
+    parser.add_argument("--output", default="vector_benchmark", help="Report path prefix (.json and .md)")
+    args = parser.parse_args()
+
+    print(f"📊 Benchmarking {args.count:,} vectors...")
+    report = benchmark(args.count, args.dim, args.queries, args.k, args.modes, args.threads,
+                       args.shortlist, args.noise, args.seed, args.work_dir)
+    with open(f"{args.output}.json", "w") as f:
+        json.dump(report, f, indent=2)
+    with open(f"{args.output}.md", "w") as f:
+        f.write(to_markdown(report))
+    print(f"✅ Wrote {args.output}.json and {args.output}.md")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Embedding Store Build Script
+Exports ArtworkEmbedding vectors into a new memory-mapped store generation
+that running API workers pick up without a restart
+"""
+
+import argparse
+import os
+
+from models.database import SessionLocal
+from models.artwork import ArtworkEmbedding
+from services.encoders import load_encoder
+from services.quantization import QUANTIZATION_MODES
+from services.vector_store import EMBEDDING_DIM, EMBEDDING_STORE_DIR, GenerationWriter
+
+
+def build_embedding_store(root: str, model_version: str, batch_size: int = 10000, keep: int = 2,
+                          quantize=()) -> str:
+    """Stream one encoder's embeddings from the database into a new generation and publish it
+
+    Vectors from different encoders live in different spaces, so only rows
+    with the given model_version are exported.
+    """
+    db = SessionLocal()
+    try:
+        current = ArtworkEmbedding.model_version == model_version
+        count = db.query(ArtworkEmbedding).filter(current).count()
+        writer = GenerationWriter(root, count, EMBEDDING_DIM, model_version=model_version)
+        try:
+            ids, vectors = [], []
+            rows = (
+                db.query(ArtworkEmbedding.artwork_id, ArtworkEmbedding.vector)
+                .filter(current)
+                .order_by(ArtworkEmbedding.artwork_id)
+                .yield_per(batch_size)
+            )
+            for artwork_id, vector in rows:
+                if writer.written + len(ids) >= count:
+                    # Rows inserted while streaming are picked up by the next build
+                    break
+                ids.append(artwork_id)
+                vectors.append(vector)
+                if len(ids) >= batch_size:
+                    writer.write(ids, vectors)
+                    ids, vectors = [], []
+            if ids:
+                writer.write(ids, vectors)
+            for mode in quantize:
+                writer.add_quantized(mode)
+                print(f"✅ Built {mode} codes")
+            return writer.commit(keep=keep)
+        except Exception:
+            writer.abort()
+            raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the shared artwork embedding store")
+    parser.add_argument("--root", default=EMBEDDING_STORE_DIR, help="Store directory")
+    parser.add_argument("--model-version", default=None,
+                        help="Embeddings to export; defaults to the QUERY_ENCODER's model version")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--keep", type=int, default=2, help="Generations to keep on disk")
+    parser.add_argument("--quantize", nargs="*", default=[], choices=QUANTIZATION_MODES,
+                        help="Also store quantized codes for these modes")
+    args = parser.parse_args()
+
+    model_version = args.model_version or load_encoder(os.getenv("QUERY_ENCODER", "clip")).model_version
+    print(f"📦 Building embedding store from {model_version} embeddings...")
+    generation = build_embedding_store(args.root, model_version, args.batch_size, args.keep, args.quantize)
+    print(f"✅ Published {generation} to {args.root}")
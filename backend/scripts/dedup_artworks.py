@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Artwork Dedup Script
+Finds near-duplicate artworks (same print sold by several brands) and stores a
+canonical_id per cluster so listings and recommendations can collapse them
+
+Usage (from backend/):
+    python -m scripts.dedup_artworks --cosine 0.95 --palette 0.9
+"""
+
+import argparse
+import uuid
+
+from sqlalchemy import update
+
+from models.database import SessionLocal
+from models.artwork import Artwork
+from services.dedup import find_duplicate_clusters
+from services.vector_store import EMBEDDING_STORE_DIR, EmbeddingStore
+
+
+def load_catalog(db, batch_size: int = 10000):
+    """id -> (dominant_palette, created_at) for every artwork"""
+    rows = (
+        db.query(Artwork.id, Artwork.dominant_palette, Artwork.created_at)
+        .yield_per(batch_size)
+    )
+    return {str(artwork_id): (palette, created_at) for artwork_id, palette, created_at in rows}
+
+
+def canonical_changes(current, canonical):
+    """(ids to point at a new canonical id, ids to clear) going from current to canonical"""
+    changed = {
+        artwork_id: canonical_id for artwork_id, canonical_id in canonical.items()
+        if current.get(artwork_id) != canonical_id
+    }
+    cleared = [artwork_id for artwork_id in current if artwork_id not in canonical]
+    return changed, cleared
+
+
+def write_canonical_ids(db, canonical, batch_size: int = 5000):
+    """Apply canonical ids in one transaction, touching only rows whose value changes
+
+    Every UPDATE bumps updated_at, which feeds the change feed and invalidates
+    cached serializations, so unchanged rows are left alone.
+    """
+    current = {
+        str(artwork_id): str(canonical_id)
+        for artwork_id, canonical_id in db.query(Artwork.id, Artwork.canonical_id)
+        .filter(Artwork.canonical_id.isnot(None))
+        .yield_per(batch_size)
+    }
+    changed, cleared = canonical_changes(current, canonical)
+    for start in range(0, len(cleared), batch_size):
+        batch = [uuid.UUID(artwork_id) for artwork_id in cleared[start:start + batch_size]]
+        db.query(Artwork).filter(Artwork.id.in_(batch)).update(
+            {Artwork.canonical_id: None}, synchronize_session=False
+        )
+    items = list(changed.items())
+    for start in range(0, len(items), batch_size):
+        db.execute(update(Artwork), [
+            {"id": uuid.UUID(artwork_id), "canonical_id": uuid.UUID(canonical_id)}
+            for artwork_id, canonical_id in items[start:start + batch_size]
+        ])
+    db.commit()
+    return len(changed), len(cleared)
+
+
+def dedup_artworks(store_root: str, cosine_threshold: float, palette_threshold: float,
+                   bands: int, bits_per_band: int, dry_run: bool = False):
+    snapshot = EmbeddingStore(store_root).attach().snapshot
+    db = SessionLocal()
+    try:
+        catalog = load_catalog(db)
+        positions = [i for i, artwork_id in enumerate(snapshot.ids) if str(artwork_id) in catalog]
+        ids = [str(snapshot.ids[i]) for i in positions]
+        palettes = [catalog[artwork_id][0] for artwork_id in ids]
+        # Oldest listing becomes canonical
+        rank = [catalog[artwork_id][1].timestamp() if catalog[artwork_id][1] else float("inf")
+                for artwork_id in ids]
+
+        # The memmap is read in place; only the rows a pass needs are loaded
+        canonical = find_duplicate_clusters(
+            ids, snapshot.vectors, palettes, cosine_threshold, palette_threshold,
+            rank=rank, bands=bands, bits_per_band=bits_per_band, positions=positions,
+        )
+        clusters = len(set(canonical.values()))
+        print(f"🔎 {len(ids)} artworks scanned, {len(canonical)} in {clusters} duplicate clusters")
+        if not dry_run:
+            changed, cleared = write_canonical_ids(db, canonical)
+            print(f"✅ Canonical ids written ({changed} set, {cleared} cleared)")
+        return canonical
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detect near-duplicate artworks")
+    parser.add_argument("--root", default=EMBEDDING_STORE_DIR, help="Embedding store directory")
+    parser.add_argument("--cosine", type=float, default=0.95, help="Embedding similarity threshold")
+    parser.add_argument("--palette", type=float, default=0.9, help="Palette similarity threshold")
+    parser.add_argument("--bands", type=int, default=8)
+    parser.add_argument("--bits-per-band", type=int, default=16)
+    parser.add_argument("--dry-run", action="store_true", help="Report clusters without writing")
+    args = parser.parse_args()
+
+    dedup_artworks(args.root, args.cosine, args.palette, args.bands, args.bits_per_band, args.dry_run)
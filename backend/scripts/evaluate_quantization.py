@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Quantization Evaluation Script
+Reports recall@k against exact search and bytes per vector for each
+quantized embedding mode on the live embedding store
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from services.quantization import QUANTIZATION_MODES, QuantizedIndex, evaluate_recall, exact_search
+from services.vector_store import EMBEDDING_STORE_DIR, EmbeddingStore
+
+
+def sample_queries(vectors: np.ndarray, count: int, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    """Perturbed catalog vectors stand in for query embeddings"""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(vectors), min(count, len(vectors)), replace=False))
+    queries = np.asarray(vectors[rows], dtype=np.float32)
+    return queries + rng.normal(scale=noise, size=queries.shape).astype(np.float32)
+
+
+def evaluate_store(root: str, modes, queries: int = 200, k: int = 10, shortlist: int = 100):
+    snapshot = EmbeddingStore(root).attach().snapshot
+    query_vectors = sample_queries(snapshot.vectors, queries)
+    ground_truth = exact_search(snapshot.vectors, query_vectors, k)
+
+    reports = []
+    for mode in modes:
+        if mode in snapshot.quantized_modes:
+            index = snapshot.quantized_index(mode)
+        else:
+            print(f"⚠️  {snapshot.generation} has no stored {mode} codes, building in memory")
+            index = QuantizedIndex.build(mode, snapshot.vectors, snapshot.ids)
+        reports.append(evaluate_recall(index, query_vectors, k, shortlist, ground_truth))
+    return {"generation": snapshot.generation, "count": len(snapshot), "results": reports}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate quantized embedding recall")
+    parser.add_argument("--root", default=EMBEDDING_STORE_DIR, help="Store directory")
+    parser.add_argument("--modes", nargs="*", default=list(QUANTIZATION_MODES), choices=QUANTIZATION_MODES)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--shortlist", type=int, default=100, help="Candidates re-ranked with float vectors")
+    args = parser.parse_args()
+
+    report = evaluate_store(args.root, args.modes, args.queries, args.k, args.shortlist)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Synthetic Workload Generator
+Produces deterministic, scalable data for every table in models/ so capacity
+tests exercise the same joins as production: users with style preferences,
+room uploads, sessions whose topk_ids/chosen_id follow Zipfian artwork
+popularity, trend history, and stores clustered around cities with inventory
+skewed towards popular artworks.
+
+Every table draws from its own generator seeded from (seed, table name), so
+the same arguments always produce the same rows and regenerating one table
+does not shift the others.
+
+Usage (from backend/):
+    python -m scripts.generate_workload --users 10000 --output ./data/workload
+    python -m scripts.generate_workload --users 10000 --database --reset
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from models.artwork import Artwork, ArtworkEmbedding, normalize_dimensions
+from models.trend import LocalStore, StoreInventory, TrendAnalysis
+from models.user import RoomUpload, Session as UserSession, UserProfile
+from scripts.seed_artwork_dataset import ARTWORK_STYLES, BRANDS, PRICE_RANGES
+
+STYLES = list(ARTWORK_STYLES)
+EMBEDDING_DIM = 512
+TOP_K = 10
+
+# City centres stores cluster around: (latitude, longitude, relative weight)
+CITIES = {
+    "new_york": (40.7128, -74.0060, 8.0),
+    "los_angeles": (34.0522, -118.2437, 5.0),
+    "chicago": (41.8781, -87.6298, 3.0),
+    "san_francisco": (37.7749, -122.4194, 3.0),
+    "seattle": (47.6062, -122.3321, 2.0),
+    "austin": (30.2672, -97.7431, 1.5),
+    "miami": (25.7617, -80.1918, 1.5),
+    "denver": (39.7392, -104.9903, 1.0),
+}
+STORE_TYPES = ("gallery", "furniture_store", "art_supply")
+ROOM_TYPES = ("living_room", "bedroom", "office", "dining_room", "kitchen", "hallway")
+QUERY_TYPES = ("text", "photo", "voice")
+QUERY_TYPE_WEIGHTS = (0.6, 0.3, 0.1)
+QUERY_TEMPLATES = (
+    "{tag} {style} art for my {room}",
+    "{style} wall art",
+    "something {tag} for the {room}",
+    "{style} print under ${budget}",
+)
+SEASONS = ("winter", "spring", "summer", "autumn")  # indexed by (month % 12) // 3
+
+# Relative share of activity per hour of day (evening peak)
+HOURLY_WEIGHTS = np.array([1, 1, 1, 1, 1, 1, 2, 3, 4, 5, 5, 5, 6, 6, 5, 5, 6, 7, 9, 10, 10, 9, 6, 3], dtype=float)
+HOURLY_CDF = np.cumsum(HOURLY_WEIGHTS) / HOURLY_WEIGHTS.sum()
+
+
+class ZipfSampler:
+    """Draws from `items` with P(rank r) proportional to 1 / r**s
+
+    Ranks are assigned by a random permutation, so popularity is unrelated
+    to insertion order.
+    """
+
+    def __init__(self, items: np.ndarray, s: float, rng: np.random.Generator):
+        weights = 1.0 / np.arange(1, len(items) + 1) ** s
+        self.cdf = np.cumsum(weights) / weights.sum()
+        self.items = np.asarray(items)[rng.permutation(len(items))]
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        ranks = np.searchsorted(self.cdf, rng.random(size), side="right")
+        return self.items[np.minimum(ranks, len(self.items) - 1)]
+
+
+def random_uuid(rng: np.random.Generator) -> uuid.UUID:
+    return uuid.UUID(bytes=rng.bytes(16), version=4)
+
+
+class Workload:
+    """Row generators for every table; volumes scale with the user count"""
+
+    def __init__(self, users: int = 1000, artworks: int = None, stores: int = None,
+                 sessions_per_user: float = 8.0, days: int = 90, zipf: float = 1.1,
+                 embeddings: bool = True, start: datetime = None, seed: int = 42):
+        self.users = users
+        self.artworks = artworks if artworks is not None else users * 5
+        self.stores = stores if stores is not None else max(len(CITIES), users // 20)
+        self.sessions_per_user = sessions_per_user
+        self.days = days
+        self.zipf = zipf
+        self.embeddings = embeddings
+        self.start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.seed = seed
+        self._catalog = None
+        self._people = None
+
+    def rng(self, table: str) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(table.encode("utf-8"))])
+
+    def timestamp(self, rng: np.random.Generator) -> datetime:
+        day = int(rng.integers(0, self.days))
+        hour = min(int(np.searchsorted(HOURLY_CDF, rng.random(), side="right")), 23)
+        return self.start + timedelta(days=day, hours=hour, seconds=int(rng.integers(0, 3600)))
+
+    @property
+    def catalog(self) -> Dict:
+        """Artwork ids, their styles and popularity samplers (global and per style)"""
+        if self._catalog is None:
+            rng = self.rng("catalog")
+            ids = np.array([random_uuid(rng) for _ in range(self.artworks)], dtype=object)
+            # Styles themselves are unevenly popular
+            styles = ZipfSampler(np.arange(len(STYLES)), 0.8, rng).sample(rng, self.artworks)
+            by_style = {
+                style: ZipfSampler(ids[styles == i], self.zipf, rng)
+                for i, style in enumerate(STYLES) if np.any(styles == i)
+            }
+            self._catalog = {
+                "ids": ids,
+                "styles": styles,
+                "popular": ZipfSampler(ids, self.zipf, rng),
+                "by_style": by_style,
+            }
+        return self._catalog
+
+    @property
+    def people(self) -> List:
+        """(user id, preferred styles) for every user"""
+        if self._people is None:
+            rng = self.rng("people")
+            style_picker = ZipfSampler(np.array(STYLES, dtype=object), 0.8, rng)
+            self._people = []
+            for _ in range(self.users):
+                count = int(rng.integers(1, 4))
+                preferred = list(dict.fromkeys(style_picker.sample(rng, count)))
+                self._people.append((random_uuid(rng), preferred))
+        return self._people
+
+    def artwork_rows(self) -> Iterator[dict]:
+        rng = self.rng("artwork")
+        catalog = self.catalog
+        for i, (artwork_id, style_index) in enumerate(zip(catalog["ids"], catalog["styles"])):
+            style = STYLES[style_index]
+            style_data = ARTWORK_STYLES[style]
+            palette = style_data["palettes"][int(rng.integers(len(style_data["palettes"])))]
+            low, high = PRICE_RANGES[style]
+            dimensions = {
+                "width": int(rng.choice([24, 30, 36, 48, 60])),
+                "height": int(rng.choice([24, 30, 36, 48, 60])),
+                "unit": "inches",
+            }
+            # Core inserts skip the ORM hook that fills the normalised columns
+            width_cm, height_cm = normalize_dimensions(dimensions)
+            created_at = self.timestamp(rng)
+            yield {
+                "id": artwork_id,
+                "title": f"{style.title()} {rng.choice(['Composition', 'Study', 'Expression', 'Piece', 'Work'])} #{i + 1}",
+                "brand": str(rng.choice(BRANDS[style])),
+                "price": round(float(rng.uniform(low, high)), 2),
+                "style_tags": style_data["tags"] + [style],
+                "dominant_palette": {
+                    "colors": palette,
+                    "primary": palette[0],
+                    "secondary": palette[1],
+                    "accent": palette[2],
+                },
+                "image_url": f"https://example-artwork-images.com/{style}/{artwork_id}.jpg",
+                "dimensions": dimensions,
+                "width_cm": width_cm,
+                "height_cm": height_cm,
+                "description": f"A {style} artwork featuring {', '.join(palette[:2])} tones.",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def embedding_rows(self) -> Iterator[dict]:
+        """Unit vectors clustered around one centroid per style"""
+        if not self.embeddings:
+            return
+        rng = self.rng("artwork_embedding")
+        centroids = rng.normal(size=(len(STYLES), EMBEDDING_DIM))
+        catalog = self.catalog
+        for artwork_id, style_index in zip(catalog["ids"], catalog["styles"]):
+            vector = centroids[style_index] + 0.6 * rng.normal(size=EMBEDDING_DIM)
+            vector /= np.linalg.norm(vector)
+            yield {
+                "id": random_uuid(rng),
+                "vector": np.round(vector, 6).tolist(),
+                "artwork_id": artwork_id,
+                "model_version": "synthetic",
+            }
+
+    def user_rows(self) -> Iterator[dict]:
+        rng = self.rng("user_profiles")
+        for user_id, preferred in self.people:
+            palette = ARTWORK_STYLES[preferred[0]]["palettes"][0]
+            low = float(rng.choice([0, 25, 50, 100]))
+            created_at = self.timestamp(rng)
+            yield {
+                "id": user_id,
+                "preferred_styles": preferred,
+                "color_profile": {"favorite_colors": palette[:2], "warmth": round(float(rng.random()), 2)},
+                "budget_range": {"min": low, "max": low + round(float(rng.lognormal(5.5, 0.5)), -1)},
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def room_upload_rows(self) -> Iterator[dict]:
+        rng = self.rng("room_upload")
+        for user_id, preferred in self.people:
+            for _ in range(int(rng.poisson(1.2))):
+                upload_id = random_uuid(rng)
+                style = preferred[int(rng.integers(len(preferred)))]
+                palette = ARTWORK_STYLES[style]["palettes"][int(rng.integers(3))]
+                yield {
+                    "id": upload_id,
+                    "user_id": user_id,
+                    "room_type": str(rng.choice(ROOM_TYPES)),
+                    "s3_url": f"s3://art-decor-rooms/{user_id}/{upload_id}.jpg",
+                    "palette_json": {"colors": palette},
+                    "lighting_json": {
+                        "brightness": round(float(rng.uniform(0.2, 1.0)), 2),
+                        "temperature_k": int(rng.choice([2700, 3000, 4000, 5000, 6500])),
+                    },
+                    "wall_detection_json": {"walls": [{
+                        "width": int(rng.integers(180, 600)),
+                        "height": int(rng.integers(230, 300)),
+                        "unit": "cm",
+                    }]},
+                    "style_analysis": {"style": style, "confidence": round(float(rng.uniform(0.5, 0.99)), 2)},
+                    "created_at": self.timestamp(rng),
+                }
+
+    def session_rows(self) -> Iterator[dict]:
+        rng = self.rng("session")
+        catalog = self.catalog
+        for user_id, preferred in self.people:
+            for _ in range(int(rng.geometric(1.0 / self.sessions_per_user))):
+                style = preferred[int(rng.integers(len(preferred)))]
+                topk = self._topk(rng, catalog, style)
+                chosen_id, satisfaction = None, None
+                if rng.random() < 0.65:
+                    # Clicks favour the top of the list
+                    position = min(int(rng.geometric(0.35)) - 1, len(topk) - 1)
+                    chosen_id = topk[position]
+                    satisfaction = int(np.clip(round(rng.normal(4.2 - 0.2 * position, 0.8)), 1, 5))
+                query_type = str(rng.choice(QUERY_TYPES, p=QUERY_TYPE_WEIGHTS))
+                yield {
+                    "id": random_uuid(rng),
+                    "user_id": user_id,
+                    "query_text": str(rng.choice(QUERY_TEMPLATES)).format(
+                        tag=rng.choice(ARTWORK_STYLES[style]["tags"]),
+                        style=style,
+                        room=str(rng.choice(ROOM_TYPES)).replace("_", " "),
+                        budget=int(rng.choice([100, 200, 300, 500])),
+                    ),
+                    "query_type": query_type,
+                    "topk_ids": topk,
+                    "chosen_id": chosen_id,
+                    "rationale": f"Matches your preference for {style} pieces" if chosen_id else None,
+                    "satisfaction_score": satisfaction,
+                    "created_at": self.timestamp(rng),
+                }
+
+    def _topk(self, rng: np.random.Generator, catalog: Dict, style: str) -> List[uuid.UUID]:
+        """Mostly popular artworks of the session's style, some popular overall"""
+        sampler = catalog["by_style"].get(style, catalog["popular"])
+        picks = list(sampler.sample(rng, TOP_K * 2)) + list(catalog["popular"].sample(rng, TOP_K))
+        topk = list(dict.fromkeys(picks))[:TOP_K]
+        while len(topk) < min(TOP_K, self.artworks):
+            candidate = catalog["popular"].sample(rng, 1)[0]
+            if candidate not in topk:
+                topk.append(candidate)
+        return topk
+
+    def trend_rows(self) -> Iterator[dict]:
+        """Weekly scores per style and city over the generated period"""
+        rng = self.rng("trend_analysis")
+        for style in STYLES:
+            for region in ("global",) + tuple(CITIES):
+                level = float(rng.uniform(0.3, 0.8))
+                for week in range(max(1, self.days // 7)):
+                    at = self.start + timedelta(weeks=week)
+                    season = SEASONS[(at.month % 12) // 3]
+                    level = float(np.clip(level + rng.normal(0, 0.05), 0.0, 0.99))
+                    yield {
+                        "id": random_uuid(rng),
+                        "style": style,
+                        "trend_score": round(level, 2),
+                        "seasonal_factor": round(float(rng.uniform(0.8, 1.5)), 2),
+                        "region": region,
+                        "season": season,
+                        "analysis_data": {"season": season, "samples": int(rng.integers(50, 5000))},
+                        "created_at": at,
+                    }
+
+    def store_rows(self) -> Iterator[dict]:
+        rng = self.rng("local_stores")
+        names = list(CITIES)
+        weights = np.array([CITIES[name][2] for name in names])
+        for i in range(self.stores):
+            city = names[int(rng.choice(len(names), p=weights / weights.sum()))]
+            lat, lon, _ = CITIES[city]
+            yield {
+                "id": self._store_id(i),
+                "name": f"{city.replace('_', ' ').title()} {rng.choice(['Gallery', 'Art House', 'Home Studio', 'Frames'])} {i + 1}",
+                "address": f"{int(rng.integers(1, 9999))} Main St, {city.replace('_', ' ').title()}",
+                # Roughly a 5 km spread around the city centre
+                "latitude": round(lat + float(rng.normal(0, 0.045)), 6),
+                "longitude": round(lon + float(rng.normal(0, 0.06)), 6),
+                "phone": f"555-{int(rng.integers(0, 10000)):04d}",
+                "website": f"https://store-{i + 1}.example.com",
+                "store_type": str(rng.choice(STORE_TYPES, p=(0.5, 0.3, 0.2))),
+                "created_at": self.timestamp(rng),
+            }
+
+    def _store_id(self, index: int) -> uuid.UUID:
+        return uuid.UUID(int=(self.seed << 64) + index, version=4)
+
+    def inventory_rows(self) -> Iterator[dict]:
+        rng = self.rng("store_inventory")
+        popular = self.catalog["popular"]
+        for i in range(self.stores):
+            size = min(int(rng.integers(20, 200)), self.artworks)
+            carried = list(dict.fromkeys(popular.sample(rng, size * 2)))[:size]
+            for artwork_id in carried:
+                stock = int(rng.poisson(3))
+                yield {
+                    "id": random_uuid(rng),
+                    "store_id": self._store_id(i),
+                    "artwork_id": artwork_id,
+                    "available": stock > 0,
+                    "stock_quantity": stock,
+                    "last_updated": self.timestamp(rng),
+                }
+
+    def tables(self):
+        """(model, rows) in foreign-key order"""
+        return [
+            (Artwork, self.artwork_rows()),
+            (ArtworkEmbedding, self.embedding_rows()),
+            (UserProfile, self.user_rows()),
+            (RoomUpload, self.room_upload_rows()),
+            (UserSession, self.session_rows()),
+            (TrendAnalysis, self.trend_rows()),
+            (LocalStore, self.store_rows()),
+            (StoreInventory, self.inventory_rows()),
+        ]
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[List]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def write_files(workload: Workload, directory: str) -> Dict[str, int]:
+    """One NDJSON file per table, named after the table"""
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for model, rows in workload.tables():
+        table = model.__tablename__
+        count = 0
+        with open(os.path.join(directory, f"{table}.ndjson"), "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=encode_value) + "\n")
+                count += 1
+        counts[table] = count
+    return counts
+
+
+def write_database(workload: Workload, engine, batch_size: int = 5000, reset: bool = False) -> Dict[str, int]:
+    """Bulk executemany inserts through Core, one transaction per table
+
+    trend_latest is rebuilt afterwards, since create_all databases have no
+    trigger to maintain it. With reset, the rollup and the tombstones the
+    artwork deletes leave behind are cleared too.
+    """
+    from sqlalchemy import delete, insert
+
+    from models.artwork import ArtworkTombstone
+    from models.database import Base
+    from models.trend import TrendLatest
+    from services.trends import rebuild_latest
+
+    Base.metadata.create_all(bind=engine)
+    tables = workload.tables()
+    if reset:
+        with engine.begin() as conn:
+            for model, _ in reversed(tables):
+                conn.execute(delete(model.__table__))
+            conn.execute(delete(TrendLatest.__table__))
+            conn.execute(delete(ArtworkTombstone.__table__))
+
+    counts = {}
+    for model, rows in tables:
+        count = 0
+        with engine.begin() as conn:
+            for batch in chunked(rows, batch_size):
+                conn.execute(insert(model.__table__), batch)
+                count += len(batch)
+        counts[model.__tablename__] = count
+    with engine.connect() as conn:
+        rebuild_latest(conn)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic multi-table workload")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--artworks", type=int, default=None, help="Defaults to 5 per user")
+    parser.add_argument("--stores", type=int, default=None, help="Defaults to 1 per 20 users")
+    parser.add_argument("--sessions-per-user", type=float, default=8.0, help="Mean of a geometric distribution")
+    parser.add_argument("--days", type=int, default=90, help="Period the timestamps span")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Artwork popularity exponent")
+    parser.add_argument("--no-embeddings", action="store_true", help="Skip artwork_embedding rows")
+    parser.add_argument("--seed", type=int, default=42)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", metavar="DIR", help="Write <table>.ndjson files")
+    target.add_argument("--database", action="store_true", help="Insert into DATABASE_URL")
+    parser.add_argument("--reset", action="store_true", help="Delete existing rows first (--database only)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    workload = Workload(
+        users=args.users,
+        artworks=args.artworks,
+        stores=args.stores,
+        sessions_per_user=args.sessions_per_user,
+        days=args.days,
+        zipf=args.zipf,
+        embeddings=not args.no_embeddings,
+        seed=args.seed,
+    )
+    started = time.perf_counter()
+    if args.database:
+        from models.database import engine
+
+        counts = write_database(workload, engine, args.batch_size, args.reset)
+    else:
+        counts = write_files(workload, args.output)
+    for table, count in counts.items():
+        print(f"  {table}: {count} rows")
+    print(f"🎉 Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Artwork Dimension Backfill Script
+Fills width_cm/height_cm for rows written before the typed columns existed
+"""
+
+import argparse
+
+from sqlalchemy import update
+
+from models.database import SessionLocal
+from models.artwork import Artwork, normalize_dimensions
+
+
+def normalize_artwork_dimensions(batch_size: int = 5000) -> int:
+    """Populate the typed dimension columns in keyset-paginated batches"""
+    db = SessionLocal()
+    updated = 0
+    last_id = None
+    try:
+        while True:
+            query = db.query(Artwork.id, Artwork.dimensions).filter(Artwork.width_cm.is_(None))
+            if last_id is not None:
+                query = query.filter(Artwork.id > last_id)
+            rows = query.order_by(Artwork.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            changes = []
+            for artwork_id, dimensions in rows:
+                width_cm, height_cm = normalize_dimensions(dimensions)
+                if width_cm is not None:
+                    changes.append({"id": artwork_id, "width_cm": width_cm, "height_cm": height_cm})
+            if changes:
+                db.execute(update(Artwork), changes)
+                db.commit()
+                updated += len(changes)
+            print(f"  {updated} artworks normalised")
+    finally:
+        db.close()
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill typed artwork dimensions")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    print("📐 Normalising artwork dimensions...")
+    count = normalize_artwork_dimensions(args.batch_size)
+    print(f"✅ Normalised {count} artworks")
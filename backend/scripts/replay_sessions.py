@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Session Replay Load Tester
+Replays recorded Session rows against a running API with their original
+arrival pattern, compressed by --speed. Arrivals are open-loop: every request
+starts at its scheduled time whether or not earlier ones have finished, and
+latency is measured from that scheduled time, so a slow server shows up as
+latency instead of quietly lowering the offered load.
+
+Sessions map to requests by query_type (photo → POST /rooms/analyze, text and
+voice → POST /recommendations/stream; voice audio is not recorded, so its
+transcript is replayed through the same pipeline). A session with a chosen_id
+is followed by GET /artworks/{chosen_id}, as the client opens the detail page.
+
+Photos are not recorded either. Photo sessions upload images from --photo (a
+file or a directory, cycled), or otherwise a pool of generated JPEGs (one per
+session, up to --photo-pool, then cycled), so that the analysis cache sees
+distinct rooms as it would in production.
+
+Usage (from backend/):
+    python -m scripts.replay_sessions --file ./data/workload/session.ndjson --speed 10
+    python -m scripts.replay_sessions --database --busiest 3600 --url http://localhost:8000
+    python -m scripts.replay_sessions --file sessions.ndjson --photo ./data/room_photos
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+DETAIL_DELAY_SECONDS = 2.0
+DETAIL_ENDPOINT = "GET /artworks/{artwork_id}"
+PHOTO_SIZE = (640, 480)
+PHOTO_POOL_SIZE = 256  # generated photos are cycled, so memory stays flat on long replays
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# query_type -> (method, path); unknown types fall back to text
+QUERY_TYPE_ROUTES = {
+    "text": ("POST", "/recommendations/stream"),
+    "voice": ("POST", "/recommendations/stream"),
+    "photo": ("POST", "/rooms/analyze"),
+}
+
+
+class ReplayRequest:
+    __slots__ = ("offset", "endpoint", "method", "path", "body", "photo")
+
+    def __init__(self, offset: float, endpoint: str, method: str, path: str, body: dict = None,
+                 photo: bytes = None):
+        self.offset = offset
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.body = body
+        self.photo = photo
+
+
+def parse_timestamp(value) -> datetime:
+    """datetime from an ISO string; naive values are taken as UTC"""
+    parsed = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def load_sessions_from_file(path: str) -> Iterator[dict]:
+    """Session rows from an NDJSON export (scripts.generate_workload --output)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                row["created_at"] = parse_timestamp(row["created_at"])
+                yield row
+
+
+def load_sessions_from_db(db, since: datetime = None, until: datetime = None) -> Iterator[dict]:
+    from models.user import Session as UserSession
+
+    query = db.query(
+        UserSession.user_id, UserSession.query_text, UserSession.query_type,
+        UserSession.chosen_id, UserSession.created_at,
+    )
+    if since is not None:
+        query = query.filter(UserSession.created_at >= since)
+    if until is not None:
+        query = query.filter(UserSession.created_at < until)
+    for row in query.order_by(UserSession.created_at).yield_per(10000):
+        yield row._asdict()
+
+
+def load_photos(path: str) -> List[bytes]:
+    """Image bytes from one file, or from every image in a directory (sorted by name)"""
+    if os.path.isdir(path):
+        paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(PHOTO_EXTENSIONS)
+        )
+    else:
+        paths = [path]
+    photos = []
+    for photo_path in paths:
+        with open(photo_path, "rb") as f:
+            photos.append(f.read())
+    if not photos:
+        raise ValueError(f"No images found at {path}")
+    return photos
+
+
+def synthetic_photo(seed: int, size: Tuple[int, int] = PHOTO_SIZE) -> bytes:
+    """A JPEG of a made-up room: a wall colour, a floor and a few pieces of furniture"""
+    from PIL import Image, ImageDraw
+
+    rng = np.random.default_rng(seed)
+    width, height = size
+    image = Image.new("RGB", size, tuple(int(c) for c in rng.integers(90, 240, 3)))
+    draw = ImageDraw.Draw(image)
+    floor = int(height * rng.uniform(0.6, 0.8))
+    draw.rectangle((0, floor, width, height), fill=tuple(int(c) for c in rng.integers(40, 160, 3)))
+    for _ in range(int(rng.integers(2, 6))):
+        x, y = int(rng.integers(0, width - 80)), int(rng.integers(height // 4, floor))
+        w, h = int(rng.integers(40, 200)), int(rng.integers(30, 160))
+        draw.rectangle((x, y, x + w, y + h), fill=tuple(int(c) for c in rng.integers(0, 256, 3)))
+    pixels = np.asarray(image, dtype=np.int16) + rng.integers(-12, 13, (height, width, 1))
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def busiest_window(sessions: List[dict], seconds: float) -> Tuple[datetime, datetime]:
+    """Start and end of the window of the given length holding the most sessions"""
+    times = sorted(session["created_at"] for session in sessions)
+    if not times:
+        raise ValueError("No sessions to replay")
+    width = timedelta(seconds=seconds)
+    best_start, best_count, lo = times[0], 0, 0
+    for hi, at in enumerate(times):
+        while at - times[lo] >= width:
+            lo += 1
+        if hi - lo + 1 > best_count:
+            best_start, best_count = times[lo], hi - lo + 1
+    return best_start, best_start + width
+
+
+def build_schedule(sessions: Iterable[dict], speed: float = 1.0, k: int = 10,
+                   detail_delay: float = DETAIL_DELAY_SECONDS,
+                   photos: Sequence[bytes] = None) -> List[ReplayRequest]:
+    """Requests ordered by their offset (seconds from the first session, divided by speed)
+
+    Photo sessions upload photos[i % len(photos)], i counting photo sessions.
+    """
+    sessions = sorted(sessions, key=lambda session: session["created_at"])
+    if not sessions:
+        return []
+    first = sessions[0]["created_at"]
+    schedule = []
+    photo_sessions = 0
+    for session in sessions:
+        offset = (session["created_at"] - first).total_seconds() / speed
+        method, path = QUERY_TYPE_ROUTES.get(session.get("query_type"), QUERY_TYPE_ROUTES["text"])
+        body = photo = None
+        if path == "/recommendations/stream":
+            body = {"query_text": session.get("query_text") or "", "k": k}
+            if session.get("user_id"):
+                body["user_id"] = str(session["user_id"])
+        elif path == "/rooms/analyze":
+            if not photos:
+                raise ValueError("Photo sessions need photos to upload")
+            photo = photos[photo_sessions % len(photos)]
+            photo_sessions += 1
+        schedule.append(ReplayRequest(offset, f"{method} {path}", method, path, body, photo))
+        if session.get("chosen_id"):
+            schedule.append(ReplayRequest(
+                offset + detail_delay / speed, DETAIL_ENDPOINT, "GET", f"/artworks/{session['chosen_id']}",
+            ))
+    schedule.sort(key=lambda request: request.offset)
+    return schedule
+
+
+class Result:
+    __slots__ = ("endpoint", "status", "latency", "lag", "error")
+
+    def __init__(self, endpoint: str, status: Optional[int], latency: float, lag: float, error: str = None):
+        self.endpoint = endpoint
+        self.status = status
+        self.latency = latency
+        self.lag = lag
+        self.error = error
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or self.status >= 400
+
+
+async def send(client: httpx.AsyncClient, request: ReplayRequest, scheduled: float) -> Result:
+    """Issue one request and read the whole body (streams included)"""
+    lag = time.perf_counter() - scheduled
+    try:
+        files = {"file": ("room.jpg", request.photo, "image/jpeg")} if request.photo is not None else None
+        async with client.stream(request.method, request.path, json=request.body, files=files) as response:
+            await response.aread()
+        return Result(request.endpoint, response.status_code, time.perf_counter() - scheduled, lag)
+    except httpx.HTTPError as e:
+        return Result(request.endpoint, None, time.perf_counter() - scheduled, lag, type(e).__name__)
+
+
+async def replay(schedule: List[ReplayRequest], client: httpx.AsyncClient) -> Tuple[List[Result], float]:
+    """Fire every request at its offset without waiting for earlier ones; returns (results, wall seconds)"""
+    started = time.perf_counter()
+    tasks = []
+    for request in schedule:
+        scheduled = started + request.offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(client, request, scheduled)))
+    results = await asyncio.gather(*tasks)
+    return list(results), time.perf_counter() - started
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    latencies_ms = np.asarray(latencies) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p90_ms": round(float(np.percentile(latencies_ms, 90)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+        "max_ms": round(float(latencies_ms.max()), 2),
+    }
+
+
+def summarize(results: List[Result], wall: float) -> dict:
+    """Per-endpoint and overall counts, error rates and latency percentiles"""
+    by_endpoint = defaultdict(list)
+    for result in results:
+        by_endpoint[result.endpoint].append(result)
+
+    def describe(group: List[Result]) -> dict:
+        statuses = defaultdict(int)
+        for result in group:
+            statuses[str(result.status) if result.error is None else result.error] += 1
+        errors = sum(result.failed for result in group)
+        return {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4),
+            "rps": round(len(group) / wall, 2) if wall else None,
+            "statuses": dict(sorted(statuses.items())),
+            **latency_summary([result.latency for result in group]),
+        }
+
+    report = {
+        "wall_seconds": round(wall, 3),
+        "endpoints": {endpoint: describe(group) for endpoint, group in sorted(by_endpoint.items())},
+    }
+    if results:
+        report["overall"] = describe(results)
+        # Large values mean the load generator, not the server, fell behind
+        report["max_start_lag_ms"] = round(max(result.lag for result in results) * 1000.0, 2)
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n{'endpoint':<36} {'reqs':>7} {'err%':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    rows = list(report["endpoints"].items()) + [("overall", report.get("overall"))]
+    for endpoint, stats in rows:
+        if not stats:
+            continue
+        print(
+            f"{endpoint:<36} {stats['requests']:>7} {stats['error_rate'] * 100:>5.1f}% "
+            f"{stats['p50_ms']:>8.1f} {stats['p90_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}"
+        )
+    print(f"\nwall {report['wall_seconds']}s, max start lag {report.get('max_start_lag_ms', 0)}ms")
+
+
+async def run(schedule: List[ReplayRequest], base_url: str, timeout: float, connections: int):
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        return await replay(schedule, client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded sessions against a running API")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="NDJSON session export")
+    source.add_argument("--database", action="store_true", help="Read sessions from DATABASE_URL")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression factor (10 = 10x faster)")
+    parser.add_argument("--since", type=parse_timestamp, help="Only sessions at or after this time (UTC unless an offset is given)")
+    parser.add_argument("--until", type=parse_timestamp, help="Only sessions before this time")
+    parser.add_argument("--busiest", type=float, metavar="SECONDS", help="Replay only the busiest window of this length")
+    parser.add_argument("--limit", type=int, help="Replay at most this many sessions")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--photo", help="Image file or directory uploaded by photo sessions "
+                                        "(default: generated JPEGs, needs Pillow)")
+    parser.add_argument("--photo-pool", type=int, default=PHOTO_POOL_SIZE,
+                        help="Most distinct photos to generate; photo sessions cycle through them")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.database:
+        from models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            sessions = list(load_sessions_from_db(db, args.since, args.until))
+        finally:
+            db.close()
+    else:
+        sessions = [
+            session for session in load_sessions_from_file(args.file)
+            if (args.since is None or session["created_at"] >= args.since)
+            and (args.until is None or session["created_at"] < args.until)
+        ]
+    if args.busiest:
+        start, end = busiest_window(sessions, args.busiest)
+        sessions = [session for session in sessions if start <= session["created_at"] < end]
+        print(f"📈 Busiest window {start.isoformat()} – {end.isoformat()}")
+    sessions.sort(key=lambda session: session["created_at"])
+    if args.limit:
+        sessions = sessions[:args.limit]
+
+    photo_count = sum(
+        QUERY_TYPE_ROUTES.get(session.get("query_type"), QUERY_TYPE_ROUTES["text"])[1] == "/rooms/analyze"
+        for session in sessions
+    )
+    photos = None
+    if args.photo:
+        photos = load_photos(args.photo)
+    elif photo_count:
+        pool_size = max(1, min(photo_count, args.photo_pool))
+        try:
+            photos = [synthetic_photo(seed) for seed in range(pool_size)]
+        except ImportError:
+            raise SystemExit("Generating room photos needs Pillow; install it or pass --photo")
+        print(f"🖼️  Generated {pool_size} room photos for {photo_count} photo sessions")
+
+    schedule = build_schedule(sessions, args.speed, args.k, photos=photos)
+    if not schedule:
+        raise SystemExit("No sessions to replay")
+    print(f"🔁 Replaying {len(sessions)} sessions ({len(schedule)} requests) over "
+          f"{schedule[-1].offset:.1f}s against {args.url}")
+    results, wall = asyncio.run(run(schedule, args.url, args.timeout, args.connections))
+    report = summarize(results, wall)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
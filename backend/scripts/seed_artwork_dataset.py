@@ -4,6 +4,7 @@ Artwork Dataset Seeding Script
 Creates a curated dataset of 500+ artworks for Art.Decor.AI
 """
 
+import argparse
 import json
 import random
 from datetime import datetime
@@ -14,9 +15,6 @@ from models.database import SessionLocal, engine
 from models.artwork import Artwork, ArtworkEmbedding
 from models.database import Base
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 # Artwork styles and their characteristics
 ARTWORK_STYLES = {
     "abstract": {
@@ -172,12 +170,27 @@ def seed_artwork_dataset():
     finally:
         db.close()
 
+def export_artwork_dataset(path: str, total: int, seed: int = 42) -> int:
+    """Write generated artworks as NDJSON for main_simple (MOCK_DATASET_PATH)"""
+    random.seed(seed)
+    styles = list(ARTWORK_STYLES.keys())
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < total:
+            batch = min(1000, total - written)
+            for artwork in generate_artwork_data(random.choice(styles), batch):
+                artwork = {"id": str(uuid.UUID(int=random.getrandbits(128), version=4)), **artwork}
+                f.write(json.dumps(artwork) + "\n")
+            written += batch
+    return written
+
 def create_sample_trend_data():
     """Create sample trend analysis data"""
     db = SessionLocal()
     
     try:
         from models.trend import TrendAnalysis
+        from services.trends import rebuild_latest
         
         trends = [
             {
@@ -220,6 +233,8 @@ def create_sample_trend_data():
             db.add(trend)
         
         db.commit()
+        # The insert trigger keeps trend_latest current; rebuild in case it was not installed
+        rebuild_latest(db)
         print("✅ Created trend analysis data")
         
     except Exception as e:
@@ -229,6 +244,20 @@ def create_sample_trend_data():
         db.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the artwork dataset")
+    parser.add_argument("--export", metavar="PATH", help="Write an NDJSON dataset instead of seeding the database")
+    parser.add_argument("--count", type=int, default=100000, help="Artworks to export")
+    args = parser.parse_args()
+
+    if args.export:
+        print(f"📦 Exporting {args.count} artworks to {args.export}...")
+        export_artwork_dataset(args.export, args.count)
+        print("🎉 Dataset export completed!")
+        raise SystemExit(0)
+
+    # Create tables
+    Base.metadata.create_all(bind=engine)
+
     print("🌱 Starting artwork dataset seeding...")
     seed_artwork_dataset()
     create_sample_trend_data()
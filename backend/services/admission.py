@@ -0,0 +1,152 @@
+"""
+Admission control and load shedding for expensive endpoints
+
+Each limited route gets a fixed number of concurrent slots and a bounded wait
+queue. When the queue is full, or a request waits longer than queue_timeout,
+the request is shed at once with 503 and Retry-After instead of piling up.
+Routes without a limit (the cheap catalog reads) bypass admission entirely,
+so a burst of uploads cannot starve them.
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Dict, Tuple
+
+
+class RouteLimit:
+    """Concurrency slots plus a bounded FIFO wait queue for one route"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float = 5.0,
+                 retry_after: int = 1):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.peak_in_flight = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False means shed"""
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self._admit()
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._abandon(waiter)
+                self.timed_out += 1
+                self.shed += 1
+                return False
+        except asyncio.CancelledError:
+            # The client went away while queued; a slot already handed over must not leak
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            else:
+                self._abandon(waiter)
+            raise
+        # release() handed its slot over, in_flight already counts us
+        self.admitted += 1
+        return True
+
+    def release(self):
+        """Hand the slot to the oldest live waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def _abandon(self, waiter: asyncio.Future):
+        """Drop a waiter that gave up, so it no longer counts against max_queue"""
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _admit(self):
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "peak_in_flight": self.peak_in_flight,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    """Route limits keyed on (method, path)"""
+
+    def __init__(self, limits: Dict[Tuple[str, str], RouteLimit] = None):
+        self.limits = dict(limits or {})
+
+    def limit_for(self, method: str, path: str):
+        return self.limits.get((method, path))
+
+    def stats(self) -> dict:
+        return {f"{method} {path}": limit.stats() for (method, path), limit in self.limits.items()}
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying an AdmissionController to HTTP requests"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self.controller.limit_for(scope["method"], scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limit.acquire():
+            await self._reject(send, limit)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+    async def _reject(self, send, limit: RouteLimit):
+        body = json.dumps({"detail": "Server busy, retry later"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(limit.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
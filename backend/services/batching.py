@@ -0,0 +1,190 @@
+"""
+Dynamic micro-batching for embedding models
+
+Callers submit single inputs and wait on a future. A dedicated worker thread
+collects submissions until it has max_batch_size of them or the oldest has
+waited max_wait_ms, then runs one forward pass for the whole batch. Under
+concurrency this turns many batch-of-one encoder calls into a few full ones.
+"""
+import asyncio
+import bisect
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+from services.encoders import Encoder
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+_STOP = object()
+
+
+class Histogram:
+    """Fixed-bucket histogram; the last bucket catches everything above the edges"""
+
+    def __init__(self, edges: Sequence[float]):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.edges, value)] += 1
+            self.count += 1
+            self.total += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={edge:g}" for edge in self.edges] + [f">{self.edges[-1]:g}"]
+            return {
+                "count": self.count,
+                "mean": round(self.total / self.count, 3) if self.count else None,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class _Pending:
+    __slots__ = ("payload", "future", "enqueued_at")
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class MicroBatcher:
+    """Runs batch_fn over inputs gathered from concurrent callers"""
+
+    def __init__(self, batch_fn: Callable[[List], Sequence], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, name: str = "micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.batches = 0
+        self.failed_batches = 0
+
+    def submit(self, payload) -> Future:
+        """Queue one input; the future resolves to its row of the batch output"""
+        self._ensure_worker()
+        pending = _Pending(payload)
+        self._queue.put(pending)
+        return pending.future
+
+    async def run(self, payload):
+        """Awaitable form of submit() for async handlers"""
+        return await asyncio.wrap_future(self.submit(payload))
+
+    def map(self, payloads: Sequence) -> List:
+        """Submit several inputs and wait for all of them"""
+        futures = [self.submit(payload) for payload in payloads]
+        return [future.result() for future in futures]
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = first.enqueued_at + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[_Pending]):
+        started = time.monotonic()
+        live = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        for pending in live:
+            self.queue_wait_ms.observe((started - pending.enqueued_at) * 1000)
+        self.batch_sizes.observe(len(live))
+        self.batches += 1
+        try:
+            outputs = self.batch_fn([pending.payload for pending in live])
+            if len(outputs) != len(live):
+                raise RuntimeError(f"{self.name} returned {len(outputs)} outputs for {len(live)} inputs")
+        except Exception as e:
+            self.failed_batches += 1
+            logger.warning("%s batch of %d failed: %s", self.name, len(live), e)
+            for pending in live:
+                pending.future.set_exception(e)
+            return
+        for pending, output in zip(live, outputs):
+            pending.future.set_result(output)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
+
+
+class BatchedEncoder(Encoder):
+    """Encoder wrapper that routes every call through per-modality micro-batchers"""
+
+    def __init__(self, encoder: Encoder, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.encoder = encoder
+        self.model_version = encoder.model_version
+        self.dim = encoder.dim
+        self.texts = MicroBatcher(encoder.encode_texts, max_batch_size, max_wait_ms, name="text-batcher")
+        self.images = MicroBatcher(encoder.encode_images, max_batch_size, max_wait_ms, name="image-batcher")
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        return np.stack(self.texts.map(texts)) if texts else np.empty((0, self.dim), dtype=np.float32)
+
+    def encode_images(self, images: Sequence[bytes]) -> np.ndarray:
+        return np.stack(self.images.map(images)) if images else np.empty((0, self.dim), dtype=np.float32)
+
+    def stop(self):
+        self.texts.stop()
+        self.images.stop()
+
+    def stats(self) -> dict:
+        return {"texts": self.texts.stats(), "images": self.images.stats()}
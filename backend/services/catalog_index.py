@@ -0,0 +1,117 @@
+"""
+In-memory artwork catalog index for the simplified API
+
+Artworks are encoded to JSON once at load time and addressed by position.
+An id hash map serves lookups, and every style has a posting list of
+positions plus a price-sorted copy, so a filtered, paginated query is a dict
+lookup, two bisects and a slice however large the catalog is.
+"""
+import bisect
+import json
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+from services.serialization import dumps
+
+
+class PostingList:
+    """Positions for one style, in catalog order and in price order"""
+
+    def __init__(self, positions: Iterable[int], prices: array):
+        self.positions = array("q", positions)
+        priced = sorted((prices[p], p) for p in self.positions if prices[p] == prices[p])
+        self.by_price = array("q", (p for _, p in priced))
+        self.prices = array("d", (price for price, _ in priced))
+
+    def page(self, price_min: Optional[float], price_max: Optional[float],
+             skip: int, limit: int) -> Tuple[int, array]:
+        """(total, positions) for one page; price filtered pages are cheapest first"""
+        if price_min is None and price_max is None:
+            return len(self.positions), self.positions[skip:skip + limit]
+        start = 0 if price_min is None else bisect.bisect_left(self.prices, price_min)
+        end = len(self.prices) if price_max is None else bisect.bisect_right(self.prices, price_max)
+        total = max(end - start, 0)
+        first = start + skip
+        return total, self.by_price[first:min(end, first + limit)] if first < end else array("q")
+
+
+class CatalogIndex:
+    """Id map, style posting lists and price indexes over pre-encoded artworks"""
+
+    def __init__(self, artworks: Iterable[dict] = ()):
+        self.fragments: List[bytes] = []
+        self.by_id = {}
+        self._prices = array("d")
+        self._style_positions = {}
+        for artwork in artworks:
+            self.add(artwork)
+        self.build()
+
+    def add(self, artwork: dict, fragment: bytes = None):
+        """Append one artwork; fragment is its JSON when already encoded with a string id"""
+        artwork_id = artwork.get("id")
+        if not isinstance(artwork_id, str):
+            artwork_id = str(artwork_id if artwork_id is not None else len(self.fragments) + 1)
+            fragment = None
+        if artwork_id in self.by_id:
+            return
+        position = len(self.fragments)
+        self.by_id[artwork_id] = position
+        self.fragments.append(fragment or dumps({**artwork, "id": artwork_id}))
+        price = artwork.get("price")
+        self._prices.append(float("nan") if price is None else float(price))
+        for tag in dict.fromkeys(artwork.get("style_tags") or []):
+            self._style_positions.setdefault(tag, []).append(position)
+
+    def build(self):
+        """(Re)build the posting lists after adding artworks"""
+        self.everything = PostingList(range(len(self.fragments)), self._prices)
+        self.styles = {tag: PostingList(positions, self._prices)
+                       for tag, positions in self._style_positions.items()}
+
+    def __len__(self) -> int:
+        return len(self.fragments)
+
+    def style_names(self) -> List[str]:
+        """Styles in order of first appearance"""
+        return list(self.styles)
+
+    def get(self, artwork_id: str) -> Optional[bytes]:
+        position = self.by_id.get(artwork_id)
+        return None if position is None else self.fragments[position]
+
+    def query(self, style: str = None, price_min: float = None, price_max: float = None,
+              skip: int = 0, limit: int = 20) -> Tuple[int, List[bytes]]:
+        """(total, encoded artworks) for one page of a filtered listing"""
+        if style:
+            postings = self.styles.get(style)
+            if postings is None:
+                return 0, []
+        else:
+            postings = self.everything
+        total, positions = postings.page(price_min, price_max, max(skip, 0), max(limit, 0))
+        return total, [self.fragments[p] for p in positions]
+
+
+def iter_dataset(path: str) -> Iterable[Tuple[dict, Optional[bytes]]]:
+    """(artwork, raw JSON) pairs from NDJSON lines, a JSON array or {"artworks": [...]}"""
+    if path.endswith((".ndjson", ".jsonl")):
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line), line
+        return
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for artwork in data["artworks"] if isinstance(data, dict) else data:
+        yield artwork, None
+
+
+def load_catalog(path: str) -> CatalogIndex:
+    """Index a dataset file, reusing NDJSON lines as the encoded artworks"""
+    catalog = CatalogIndex()
+    for artwork, fragment in iter_dataset(path):
+        catalog.add(artwork, fragment)
+    catalog.build()
+    return catalog
@@ -0,0 +1,94 @@
+"""
+Catalog change feed
+
+Consumers poll with the token from their last page and get every artwork
+insert, update and delete after it. Every artwork and tombstone row carries
+change_xid, the id of the transaction that last wrote it (set by triggers,
+see database/schema.sql), and the feed is ordered by (change_xid, id).
+Upserts come from artwork on the (change_xid, id) index and deletes from
+artwork_tombstone; both are keyset-paged, so a page costs the same however
+far back the feed goes.
+
+Transactions do not commit in xid order, so only rows written by
+transactions older than the snapshot's xmin are served: every transaction
+below it has finished, and anything still running or not yet started gets
+an xid at or above it. The watermark therefore only moves forward and no
+late commit can land behind a token already handed out, however long the
+transaction ran. The flip side is that a long-running transaction anywhere
+in the database holds the feed back (it stalls, it never skips) until it
+ends.
+"""
+import base64
+import heapq
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+
+from models.artwork import Artwork, ArtworkTombstone
+
+Cursor = Tuple[int, uuid.UUID]
+
+
+def encode_token(cursor: Cursor) -> str:
+    xid, artwork_id = cursor
+    raw = f"{xid}|{artwork_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> Cursor:
+    """Inverse of encode_token; raises ValueError on malformed tokens"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+        xid, artwork_id = raw.split("|")
+        xid = int(xid)
+        artwork_id = uuid.UUID(artwork_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid change token") from e
+    if xid < 0:
+        raise ValueError("Invalid change token")
+    return xid, artwork_id
+
+
+def visible_xid_horizon():
+    """Oldest transaction still running; every xid below it has committed or aborted"""
+    return func.txid_snapshot_xmin(func.txid_current_snapshot())
+
+
+class Change:
+    __slots__ = ("op", "xid", "at", "artwork_id", "artwork")
+
+    def __init__(self, op: str, xid: int, at: datetime, artwork_id: uuid.UUID, artwork=None):
+        self.op = op
+        self.xid = xid
+        self.at = at
+        self.artwork_id = artwork_id
+        self.artwork = artwork
+
+    @property
+    def cursor(self) -> Cursor:
+        return self.xid, self.artwork_id
+
+
+def changes_since(db, cursor: Optional[Cursor] = None, limit: int = 500) -> Tuple[List[Change], bool]:
+    """(changes, has_more) after cursor, oldest transaction first"""
+    horizon = visible_xid_horizon()
+
+    upserts = db.query(Artwork).filter(Artwork.change_xid < horizon)
+    deletes = db.query(ArtworkTombstone).filter(ArtworkTombstone.change_xid < horizon)
+    if cursor is not None:
+        upserts = upserts.filter(tuple_(Artwork.change_xid, Artwork.id) > cursor)
+        deletes = deletes.filter(tuple_(ArtworkTombstone.change_xid, ArtworkTombstone.artwork_id) > cursor)
+    upserts = upserts.order_by(Artwork.change_xid, Artwork.id).limit(limit + 1).all()
+    deletes = deletes.order_by(ArtworkTombstone.change_xid, ArtworkTombstone.artwork_id).limit(limit + 1).all()
+
+    merged = heapq.merge(
+        (Change("created" if row.created_at == row.updated_at else "updated",
+                row.change_xid, row.updated_at, row.id, row)
+         for row in upserts),
+        (Change("deleted", row.change_xid, row.deleted_at, row.artwork_id) for row in deletes),
+        key=lambda change: change.cursor,
+    )
+    changes = [change for _, change in zip(range(limit + 1), merged)]
+    return changes[:limit], len(changes) > limit
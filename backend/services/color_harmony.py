@@ -0,0 +1,233 @@
+"""
+Colour harmony between room and artwork palettes
+
+Every artwork palette is reduced once to hue-wheel features: its dominant
+hue (the first colour with real chroma) and the harmony anchors around it
+as unit vectors (complementary, analogous, triadic and split-complementary
+offsets). Palettes without chroma are flagged neutral. A room palette is
+scored against the whole catalog at once: the angle from each room hue to
+the nearest anchor of every artwork is a single einsum over (artworks,
+anchors, room colours), so pieces that sit opposite or beside the room's
+colours rank above pieces that merely repeat them.
+
+Rankings are cached per quantized room palette (hue bins, saturation and
+lightness levels), so near-identical uploads share one computation.
+"""
+import colorsys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.index_cache import IndexCache
+from services.palettes import hex_to_rgb, palette_hex
+
+# Anchor offsets in degrees from an artwork's dominant hue
+HARMONY_SCHEMES = {
+    "complementary": (180.0,),
+    "analogous": (-30.0, 30.0),
+    "triadic": (-120.0, 120.0),
+    "split_complementary": (150.0, 210.0),
+}
+NEUTRAL_SATURATION = 0.15  # greys, whites and blacks carry no usable hue
+NEUTRAL_SCORE = 0.35  # neutral pieces go with anything, but never beat a real harmony
+ANGLE_TOLERANCE = 20.0  # degrees at which a match scores exp(-1)
+MAX_COLORS = 6
+
+HUE_BINS = 24
+SATURATION_LEVELS = 4
+LIGHTNESS_LEVELS = 4
+
+
+def harmony_colors(palette) -> List[str]:
+    """The first MAX_COLORS valid hex colours of a palette blob"""
+    return palette_hex(palette)[:MAX_COLORS]
+
+
+def hls_components(colors: Iterable[str]) -> np.ndarray:
+    """(n, 3) hue in degrees, lightness and saturation"""
+    rows = []
+    for color in colors:
+        h, l, s = colorsys.rgb_to_hls(*(channel / 255.0 for channel in hex_to_rgb(color)))
+        rows.append((h * 360.0, l, s))
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+
+
+def hue_vectors(hues: np.ndarray) -> np.ndarray:
+    radians = np.deg2rad(hues)
+    return np.stack([np.cos(radians), np.sin(radians)], axis=-1)
+
+
+def chroma_weights(components: np.ndarray) -> np.ndarray:
+    """Saturation, damped near black and white where hue is barely visible"""
+    lightness, saturation = components[:, 1], components[:, 2]
+    weights = saturation * (1.0 - np.abs(2.0 * lightness - 1.0))
+    return np.where(saturation < NEUTRAL_SATURATION, 0.0, weights)
+
+
+def quantize_palette(colors: Iterable[str]) -> Tuple[Tuple[int, int, int], ...]:
+    """Sorted (hue bin, saturation level, lightness level) per colour, the cache key"""
+    components = hls_components(colors)
+    bins = set()
+    for hue, lightness, saturation in components:
+        bins.add((
+            int(round(hue / (360.0 / HUE_BINS))) % HUE_BINS,
+            min(int(saturation * SATURATION_LEVELS), SATURATION_LEVELS - 1),
+            min(int(lightness * LIGHTNESS_LEVELS), LIGHTNESS_LEVELS - 1),
+        ))
+    return tuple(sorted(bins))
+
+
+def dequantize_palette(key: Tuple[Tuple[int, int, int], ...]) -> List[str]:
+    """Representative hex colour for every quantized bin"""
+    colors = []
+    for hue_bin, saturation_level, lightness_level in key:
+        r, g, b = colorsys.hls_to_rgb(
+            hue_bin * (360.0 / HUE_BINS) / 360.0,
+            (lightness_level + 0.5) / LIGHTNESS_LEVELS,
+            (saturation_level + 0.5) / SATURATION_LEVELS,
+        )
+        colors.append("#{:02X}{:02X}{:02X}".format(*(int(round(c * 255)) for c in (r, g, b))))
+    return colors
+
+
+class HarmonyIndex:
+    """Hue-wheel features for every artwork palette, scored in bulk against room palettes"""
+
+    def __init__(self, rows: Iterable[Tuple], cache_size: int = 1024, max_results: int = 100):
+        ids, palette_index = [], []
+        palettes = {}  # catalogs reuse a small set of palettes, so features are per distinct palette
+        parsed = {}  # raw colour list -> validated colours
+        for artwork_id, palette in rows:
+            raw = palette.get("colors") if isinstance(palette, dict) else palette
+            try:
+                colors = parsed[tuple(raw)]
+            except (KeyError, TypeError):
+                colors = tuple(harmony_colors(palette))
+                if isinstance(raw, list) and all(isinstance(color, str) for color in raw):
+                    parsed[tuple(raw)] = colors
+            ids.append(artwork_id)
+            palette_index.append(palettes.setdefault(colors, len(palettes)))
+
+        dominant = np.zeros(len(palettes))
+        neutral = np.ones(len(palettes), dtype=bool)
+        for colors, i in palettes.items():
+            components = hls_components(colors)
+            chromatic = np.flatnonzero(chroma_weights(components) > 0.0)
+            if chromatic.size:
+                # Palettes list the primary colour first
+                dominant[i] = components[chromatic[0], 0]
+                neutral[i] = False
+
+        self.ids = ids
+        palette_index = np.asarray(palette_index, dtype=np.int64)
+        self.neutral = neutral[palette_index]
+        dominant = dominant[palette_index]
+        self.anchors = {
+            scheme: hue_vectors(dominant[:, None] + np.asarray(offsets)[None, :]).astype(np.float32)
+            for scheme, offsets in HARMONY_SCHEMES.items()
+        }
+        self.max_results = max_results
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, colors: List[str], schemes: Iterable[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(best score, best scheme index) per artwork for a room palette
+
+        A room colour scores exp(-(d / ANGLE_TOLERANCE)^2), d being its angle
+        to the nearest anchor of the artwork; room colours are averaged by
+        chroma weight. Neutral artworks, and every artwork against a neutral
+        room, get NEUTRAL_SCORE with scheme index -1.
+        """
+        schemes = list(schemes or HARMONY_SCHEMES)
+        components = hls_components(colors)
+        room_weights = chroma_weights(components)
+        if room_weights.sum() == 0.0:
+            # An all-neutral room: every hue is equally welcome
+            return np.full(len(self.ids), NEUTRAL_SCORE), np.full(len(self.ids), -1)
+        room_weights = room_weights / room_weights.sum()
+        room = hue_vectors(components[:, 0]).astype(np.float32)
+
+        per_scheme = np.empty((len(schemes), len(self.ids)))
+        for i, scheme in enumerate(schemes):
+            # cos of the angle between every anchor and every room hue: (artworks, anchors, room colours)
+            cosine = np.einsum("nac,rc->nar", self.anchors[scheme], room).max(axis=1)
+            angle = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+            per_scheme[i] = np.exp(-(angle / ANGLE_TOLERANCE) ** 2) @ room_weights
+
+        best = per_scheme.argmax(axis=0)
+        score = per_scheme[best, np.arange(len(self.ids))]
+        score[self.neutral] = NEUTRAL_SCORE
+        best[self.neutral] = -1
+        return score, best
+
+    def recommend(self, colors: List[str], k: int = 20, schemes: Iterable[str] = None) -> Dict:
+        """Top-k artworks for a room palette, cached per quantized palette and scheme set"""
+        colors = harmony_colors(list(colors))
+        schemes = tuple(sorted(schemes or HARMONY_SCHEMES))
+        unknown = set(schemes) - set(HARMONY_SCHEMES)
+        if unknown:
+            raise ValueError(f"Unknown harmony schemes: {', '.join(sorted(unknown))}")
+        key = (quantize_palette(colors), schemes)
+        if not key[0]:
+            raise ValueError("Palette has no valid hex colours")
+
+        with self._lock:
+            ranking = self._cache.get(key)
+            if ranking is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if ranking is None:
+            ranking = self._rank(key)
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = ranking
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return {"palette": ranking["palette"], "matches": ranking["matches"][:k]}
+
+    def _rank(self, key) -> Dict:
+        quantized, schemes = key
+        palette = dequantize_palette(quantized)
+        if not self.ids:
+            return {"palette": palette, "matches": []}
+        score, best = self.scores(palette, schemes)
+        count = min(self.max_results, len(self.ids))
+        top = np.argpartition(-score, count - 1)[:count]
+        top = top[np.lexsort((top, -score[top]))]
+        return {
+            "palette": palette,
+            "matches": [
+                (self.ids[i], round(float(score[i]), 4), "neutral" if best[i] < 0 else schemes[best[i]])
+                for i in top
+            ],
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "artworks": len(self.ids),
+                "cached_palettes": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class HarmonyCache(IndexCache):
+    """Process-wide HarmonyIndex, rebuilt once it is older than ttl seconds"""
+
+    def __init__(self, loader: Callable[..., Iterable[Tuple]], ttl: float = 300.0):
+        super().__init__(HarmonyIndex, loader, ttl)
+
+    def stats(self) -> Optional[dict]:
+        index = self._index
+        return index.stats() if index is not None else None
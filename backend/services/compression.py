@@ -0,0 +1,154 @@
+"""
+Negotiated response compression
+
+Single-body responses above a size threshold are compressed with brotli
+when the client accepts it and the brotli package is installed, otherwise
+with gzip. Streaming responses (SSE, chunked bodies) pass through untouched
+so events are not held back in a compressor buffer.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: str, brotli_available: bool = None) -> str:
+    """Best supported coding the client accepts, or None"""
+    if brotli_available is None:
+        brotli_available = brotli is not None
+    accepted = parse_accept_encoding(header or "")
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli_available else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionStats:
+    """Counters shared with /metrics (Starlette builds middleware instances itself)"""
+
+    def __init__(self):
+        self.compressed = {"br": 0, "gzip": 0}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, encoding: str, size_in: int, size_out: int):
+        self.compressed[encoding] += 1
+        self.bytes_in += size_in
+        self.bytes_out += size_out
+
+    def snapshot(self) -> dict:
+        return {
+            "compressed_responses": dict(self.compressed),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None,
+            "brotli_available": brotli is not None,
+        }
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses of at least minimum_size bytes"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 stats: CompressionStats = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats or CompressionStats()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._should_compress(start, body):
+                # Streaming or not worth it: forward as-is from here on
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            self.stats.record(encoding, len(body), len(compressed))
+            response_headers = [
+                (name, value) for name, value in start["headers"]
+                if name.lower() not in (b"content-length", b"vary")
+            ]
+            vary = [value for name, value in start["headers"] if name.lower() == b"vary"]
+            response_headers += [
+                (b"content-encoding", encoding.encode("ascii")),
+                (b"content-length", str(len(compressed)).encode("ascii")),
+                (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+            ]
+            await send({**start, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, start, body: bytes) -> bool:
+        if len(body) < self.minimum_size:
+            return False
+        content_type = b""
+        for name, value in start["headers"]:
+            name = name.lower()
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.decode("latin-1").split(";")[0].strip() in COMPRESSIBLE_TYPES
+
@@ -0,0 +1,150 @@
+"""
+Near-duplicate artwork detection
+
+Embeddings are hashed with random-hyperplane LSH into several bands of sign
+bits. Only artworks that share a band bucket are compared, which keeps the job
+sub-quadratic. A candidate pair counts as a duplicate when both the embedding
+cosine similarity and the dominant_palette similarity clear their thresholds.
+Duplicates are merged with union-find, and each cluster gets one canonical
+artwork id.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from services.palettes import palette_rgb
+
+# Largest RGB distance, used to scale palette similarity into [0, 1]
+MAX_RGB_DISTANCE = float(np.sqrt(3 * 255 ** 2))
+
+
+def palette_similarity(a, b) -> float:
+    """1.0 for identical palettes, falling with the mean nearest-color RGB distance"""
+    a = a if isinstance(a, np.ndarray) else palette_rgb(a)
+    b = b if isinstance(b, np.ndarray) else palette_rgb(b)
+    if not len(a) or not len(b):
+        return 0.0
+    distances = np.linalg.norm(a[:, None, :] - b[None, :, :], axis=2)
+    mean_distance = (distances.min(axis=1).mean() + distances.min(axis=0).mean()) / 2
+    return float(1.0 - mean_distance / MAX_RGB_DISTANCE)
+
+
+class RandomHyperplaneLSH:
+    """Sign-of-projection hashing split into bands of bits_per_band bits"""
+
+    def __init__(self, dim: int, bands: int = 8, bits_per_band: int = 16, seed: int = 0):
+        if bits_per_band > 63:
+            raise ValueError("bits_per_band must fit in a 64-bit key")
+        self.bands = bands
+        self.bits_per_band = bits_per_band
+        self.planes = np.random.default_rng(seed).normal(size=(bands * bits_per_band, dim)).astype(np.float32)
+        self._weights = (1 << np.arange(bits_per_band, dtype=np.uint64)).astype(np.uint64)
+
+    def signatures(self, vectors: np.ndarray, chunk_rows: int = 65536,
+                   positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """(n, bands) uint64 bucket keys, for the rows at positions if given
+
+        Rows are read chunk_rows at a time, so a memory-mapped matrix is
+        never copied whole.
+        """
+        n = len(vectors) if positions is None else len(positions)
+        keys = np.empty((n, self.bands), dtype=np.uint64)
+        for start in range(0, n, chunk_rows):
+            rows = slice(start, start + chunk_rows) if positions is None else positions[start:start + chunk_rows]
+            block = np.asarray(vectors[rows], dtype=np.float32)
+            bits = (block @ self.planes.T > 0).reshape(len(block), self.bands, self.bits_per_band)
+            keys[start:start + len(block)] = (bits.astype(np.uint64) * self._weights).sum(axis=2)
+        return keys
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def candidate_buckets(keys: np.ndarray, max_bucket: int) -> Iterable[np.ndarray]:
+    """Row positions sharing a bucket in any band (buckets larger than max_bucket are skipped)"""
+    for band in range(keys.shape[1]):
+        column = keys[:, band]
+        order = np.argsort(column, kind="stable")
+        sorted_keys = column[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(sorted_keys)]
+        for start, end in zip(starts, ends):
+            if 1 < end - start <= max_bucket:
+                yield order[start:end]
+
+
+def find_duplicate_clusters(ids: Sequence, vectors: np.ndarray, palettes: Sequence,
+                            cosine_threshold: float = 0.95, palette_threshold: float = 0.9,
+                            rank: Optional[Sequence] = None, bands: int = 8, bits_per_band: int = 16,
+                            max_bucket: int = 512, seed: int = 0,
+                            positions: Optional[Sequence[int]] = None) -> Dict[str, str]:
+    """Map every artwork in a duplicate cluster to its cluster's canonical id
+
+    `vectors` must be L2-normalised. With `positions`, ids[i] is the row at
+    vectors[positions[i]], so a memory-mapped store can be scanned in place.
+    `rank` orders candidates for canonical choice (lowest wins, e.g.
+    created_at); by default the first row wins. Artworks without duplicates
+    are left out of the result.
+    """
+    n = len(ids)
+    if n < 2:
+        return {}
+    rows = np.arange(n) if positions is None else np.asarray(positions, dtype=np.intp)
+    lsh = RandomHyperplaneLSH(vectors.shape[1], bands, bits_per_band, seed)
+    keys = lsh.signatures(vectors, positions=None if positions is None else rows)
+    colors = [palette_rgb(p) for p in palettes]
+    clusters = UnionFind(n)
+    checked = set()
+
+    for members in candidate_buckets(keys, max_bucket):
+        members = np.sort(members)
+        block = np.asarray(vectors[rows[members]], dtype=np.float32)
+        similar = np.triu(block @ block.T >= cosine_threshold, k=1)
+        for a, b in zip(*np.nonzero(similar)):
+            i, j = int(members[a]), int(members[b])
+            if (i, j) in checked or clusters.find(i) == clusters.find(j):
+                continue
+            checked.add((i, j))
+            if palette_similarity(colors[i], colors[j]) >= palette_threshold:
+                clusters.union(i, j)
+
+    roots = np.fromiter((clusters.find(i) for i in range(n)), dtype=np.int64, count=n)
+    grouped = np.flatnonzero(roots != np.arange(n))
+    groups: Dict[int, List[int]] = {}
+    for i in grouped:
+        groups.setdefault(int(roots[i]), [int(roots[i])]).append(int(i))
+
+    canonical = {}
+    for members in groups.values():
+        winner = min(members, key=lambda i: (rank[i], i) if rank is not None else i)
+        for i in members:
+            canonical[str(ids[i])] = str(ids[winner])
+    return canonical
+
+
+def collapse_ranked(artwork_ids: Sequence, canonical_ids: Dict) -> List:
+    """Keep the best-ranked artwork of each duplicate cluster, preserving order"""
+    seen = set()
+    collapsed = []
+    for artwork_id in artwork_ids:
+        key = canonical_ids.get(artwork_id) or artwork_id
+        if key in seen:
+            continue
+        seen.add(key)
+        collapsed.append(artwork_id)
+    return collapsed
@@ -0,0 +1,131 @@
+"""
+Pluggable embedding encoders
+
+Every encoder maps raw image bytes or query text into the shared 512-dim
+embedding space and reports a model_version that is stored with each
+ArtworkEmbedding row, so re-encoding with a new model can be detected.
+"""
+import hashlib
+import importlib
+import io
+import os
+from typing import List, Sequence
+
+import numpy as np
+
+from services.vector_store import EMBEDDING_DIM
+
+
+class Encoder:
+    """Interface implemented by every embedding encoder"""
+
+    model_version = "unknown"
+    dim = EMBEDDING_DIM
+
+    def encode_images(self, images: Sequence[bytes]) -> np.ndarray:
+        """(len(images), dim) float32 array of L2-normalised embeddings"""
+        raise NotImplementedError
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32 array of L2-normalised embeddings"""
+        raise NotImplementedError
+
+    def decode_image(self, data: bytes):
+        """One image prepared for encode_decoded; raises ValueError if it cannot be decoded"""
+        return data
+
+    def encode_decoded(self, decoded: Sequence) -> np.ndarray:
+        """encode_images for images already passed through decode_image"""
+        return self.encode_images(decoded)
+
+    def limit_threads(self, threads: int):
+        """Cap intra-op threads when several encoder processes share the CPUs"""
+
+
+class StubEncoder(Encoder):
+    """Deterministic content-hash vectors for tests and offline runs"""
+
+    model_version = "stub-v1"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _encode(self, payloads: List[bytes]) -> np.ndarray:
+        vectors = np.empty((len(payloads), self.dim), dtype=np.float32)
+        for row, payload in enumerate(payloads):
+            seed = int.from_bytes(hashlib.sha256(payload).digest()[:8], "little")
+            vectors[row] = np.random.default_rng(seed).normal(size=self.dim)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def encode_images(self, images: Sequence[bytes]) -> np.ndarray:
+        return self._encode(list(images))
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        return self._encode([text.encode("utf-8") for text in texts])
+
+
+class ClipEncoder(Encoder):
+    """OpenAI CLIP image/text encoder; the model loads on first use"""
+
+    def __init__(self, model_name: str = None):
+        self.model_name = model_name or os.getenv("CLIP_MODEL", "ViT-B/32")
+        self.model_version = f"clip-{self.model_name}"
+        self._loaded = None
+
+    def _load(self):
+        if self._loaded is None:
+            from services.model_registry import load_clip
+
+            self._loaded = load_clip()
+        return self._loaded
+
+    def _finish(self, features) -> np.ndarray:
+        features = features / features.norm(dim=-1, keepdim=True)
+        return features.cpu().numpy().astype(np.float32)
+
+    def decode_image(self, data: bytes):
+        from PIL import Image, UnidentifiedImageError
+
+        try:
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            raise ValueError(f"Undecodable image: {e}") from e
+        return self._load()["preprocess"](image)
+
+    def encode_decoded(self, decoded: Sequence) -> np.ndarray:
+        import torch
+
+        loaded = self._load()
+        batch = torch.stack(list(decoded)).to(loaded["device"])
+        with torch.no_grad():
+            return self._finish(loaded["model"].encode_image(batch))
+
+    def encode_images(self, images: Sequence[bytes]) -> np.ndarray:
+        return self.encode_decoded([self.decode_image(data) for data in images])
+
+    def limit_threads(self, threads: int):
+        import torch
+
+        torch.set_num_threads(threads)
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        import clip
+        import torch
+
+        loaded = self._load()
+        tokens = clip.tokenize(list(texts), truncate=True).to(loaded["device"])
+        with torch.no_grad():
+            return self._finish(loaded["model"].encode_text(tokens))
+
+
+ENCODERS = {"stub": StubEncoder, "clip": ClipEncoder}
+
+
+def load_encoder(spec: str) -> Encoder:
+    """Build an encoder from a short name ("clip", "stub") or "package.module:ClassName" """
+    if spec in ENCODERS:
+        return ENCODERS[spec]()
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown encoder '{spec}', expected one of {sorted(ENCODERS)} or module:Class")
+    return getattr(importlib.import_module(module_name), class_name)()
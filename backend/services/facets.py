@@ -0,0 +1,115 @@
+"""
+Facet counts from in-memory bitmaps
+
+The catalog is loaded once into a FacetIndex that keeps one bitmap per style
+tag, brand and price bucket. Bitmaps are Python ints with one bit per artwork,
+so intersecting is a single `&` and counting is int.bit_count(). Rows are
+ordered by price, which makes any price range a contiguous run of bits.
+
+Counts follow multi-select semantics: each facet is counted against every
+active filter except its own, so the UI can show alternatives for the
+selected facet.
+"""
+import bisect
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.index_cache import IndexCache
+
+# Upper bounds of the price buckets; the last bucket is open ended
+PRICE_BUCKET_EDGES = (50, 100, 200, 300, 500)
+
+
+def price_buckets() -> List[Tuple[str, float, Optional[float]]]:
+    buckets = []
+    low = 0
+    for high in PRICE_BUCKET_EDGES:
+        buckets.append((f"{low}-{high}", low, high))
+        low = high
+    buckets.append((f"{low}+", low, None))
+    return buckets
+
+
+def bitmap_from_positions(positions: Iterable[int], size: int) -> int:
+    """Build an int bitmap in O(n) rather than one shift-or per bit"""
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def range_mask(start: int, end: int) -> int:
+    """Bitmap with bits [start, end) set"""
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+class FacetIndex:
+    """Style, brand and price bucket bitmaps over one catalog snapshot"""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        """rows: (id, style_tags, brand, price, is_canonical) tuples"""
+        rows = sorted(rows, key=lambda row: (row[3] is None, row[3] or 0.0))
+        self.size = len(rows)
+        self.ids = [str(row[0]) for row in rows]
+        self.prices = [row[3] for row in rows if row[3] is not None]
+        self.all = range_mask(0, self.size)
+
+        style_positions: Dict[str, List[int]] = {}
+        brand_positions: Dict[str, List[int]] = {}
+        canonical_positions = []
+        for position, (_, style_tags, brand, _, is_canonical) in enumerate(rows):
+            for tag in set(style_tags or []):
+                style_positions.setdefault(tag, []).append(position)
+            if brand:
+                brand_positions.setdefault(brand, []).append(position)
+            if is_canonical:
+                canonical_positions.append(position)
+
+        self.styles = {tag: bitmap_from_positions(p, self.size) for tag, p in style_positions.items()}
+        self.brands = {brand: bitmap_from_positions(p, self.size) for brand, p in brand_positions.items()}
+        self.canonical = bitmap_from_positions(canonical_positions, self.size)
+        self.price_buckets = {
+            label: self.price_mask(low, None if high is None else high - 1e-9)
+            for label, low, high in price_buckets()
+        }
+        self.built_at = time.time()
+
+    def price_mask(self, price_min: Optional[float] = None, price_max: Optional[float] = None) -> int:
+        """Rows with price_min <= price <= price_max (rows without a price only match no bounds)"""
+        if price_min is None and price_max is None:
+            return self.all
+        start = 0 if price_min is None else bisect.bisect_left(self.prices, price_min)
+        end = len(self.prices) if price_max is None else bisect.bisect_right(self.prices, price_max)
+        return range_mask(start, end)
+
+    def counts(self, style: str = None, brand: str = None, price_min: float = None,
+               price_max: float = None, collapse_duplicates: bool = True) -> dict:
+        """Counts for every style, brand and price bucket under the current filters"""
+        base = self.canonical if collapse_duplicates else self.all
+        style_mask = self.styles.get(style, 0) if style else self.all
+        brand_mask = self.brands.get(brand, 0) if brand else self.all
+        price_mask = self.price_mask(price_min, price_max)
+
+        def tally(bitmaps: Dict[str, int], scope: int) -> Dict[str, int]:
+            counts = {value: (bitmap & scope).bit_count() for value, bitmap in bitmaps.items()}
+            return {value: count for value, count in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+                    if count}
+
+        return {
+            "styles": tally(self.styles, base & brand_mask & price_mask),
+            "brands": tally(self.brands, base & style_mask & price_mask),
+            "price_buckets": {
+                label: (bitmap & base & style_mask & brand_mask).bit_count()
+                for label, bitmap in self.price_buckets.items()
+            },
+            "total": (base & style_mask & brand_mask & price_mask).bit_count(),
+        }
+
+
+class FacetCache(IndexCache):
+    """Process-wide FacetIndex, rebuilt once it is older than ttl seconds"""
+
+    def __init__(self, loader: Callable[..., Iterable[Tuple]], ttl: float = 60.0):
+        super().__init__(FacetIndex, loader, ttl)
@@ -0,0 +1,49 @@
+"""
+Process-wide in-memory indexes rebuilt on a TTL
+
+Catalog indexes (facet bitmaps, harmony features) are built from one full
+scan and shared by every request in the worker. The first request after the
+TTL rebuilds it; requests arriving meanwhile keep using the old index until
+the new one is in place. Only the very first build makes callers wait.
+"""
+import threading
+import time
+from typing import Callable, Iterable, Optional, Tuple
+
+
+class IndexCache:
+    """Shares one build(loader(*args)) per process and rebuilds it once it is older than ttl seconds
+
+    Built indexes must carry a built_at timestamp (time.time()).
+    """
+
+    def __init__(self, build: Callable[[Iterable[Tuple]], object],
+                 loader: Callable[..., Iterable[Tuple]], ttl: float):
+        self.build = build
+        self.loader = loader
+        self.ttl = ttl
+        self._index: Optional[object] = None
+        self._lock = threading.Lock()
+
+    def _fresh(self, index) -> bool:
+        return index is not None and time.time() - index.built_at < self.ttl
+
+    def get(self, *args):
+        index = self._index
+        if self._fresh(index):
+            return index
+        if index is None:
+            self._lock.acquire()
+        elif not self._lock.acquire(blocking=False):
+            return index  # another caller is rebuilding; serve the old index meanwhile
+        try:
+            index = self._index
+            if not self._fresh(index):
+                index = self.build(self.loader(*args))
+                self._index = index
+            return index
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        self._index = None
@@ -0,0 +1,215 @@
+"""
+Lazy model registry with background warm-up
+
+Heavy ML dependencies (torch, CLIP, whisper, YOLO, faiss) are imported inside
+loader functions, so importing the API stays cheap. Entries named in
+PRELOAD_MODELS are loaded by a background warm-up thread and gate /ready;
+everything else loads on first use.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+AI_MODEL_PATH = os.getenv("AI_MODEL_PATH", "./ai-model/weights")
+
+# Entry states
+UNLOADED = "unloaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# Report section for each entry kind
+KIND_SECTIONS = {"model": "models", "index": "indexes", "db_pool": "db_pools"}
+
+
+class ModelEntry:
+    """A named resource that is loaded at most once"""
+
+    def __init__(self, name: str, loader: Callable, kind: str = "model",
+                 preload: bool = False, check: Optional[Callable] = None):
+        self.name = name
+        self.loader = loader
+        self.kind = kind
+        self.preload = preload
+        self.check = check
+        self.state = UNLOADED
+        self.value = None
+        self.error = None
+        self.load_seconds = None
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def describe(self) -> dict:
+        return {
+            "state": self.state,
+            "preload": self.preload,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """Registry of lazily loaded models, indexes and connection pools"""
+
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+        self._warm_up_thread = None
+
+    def register(self, name: str, loader: Callable, kind: str = "model",
+                 preload: bool = False, check: Optional[Callable] = None) -> ModelEntry:
+        """Register a loader; nothing is imported or loaded until it is needed"""
+        if kind not in KIND_SECTIONS:
+            raise ValueError(f"Unknown registry kind: {kind}")
+        entry = ModelEntry(name, loader, kind=kind, preload=preload, check=check)
+        self._entries[name] = entry
+        return entry
+
+    def entry(self, name: str) -> ModelEntry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"No model registered under '{name}'") from None
+
+    def get(self, name: str):
+        """Return the loaded resource, loading it on first use"""
+        entry = self.entry(name)
+        if entry.state == READY:
+            return entry.value
+
+        with entry.lock:
+            if entry.state == READY:
+                return entry.value
+            entry.state = LOADING
+            started = time.perf_counter()
+            try:
+                value = entry.loader()
+            except Exception as e:
+                entry.state = FAILED
+                entry.error = f"{type(e).__name__}: {e}"
+                logger.warning("Failed to load %s: %s", name, entry.error)
+                raise
+            entry.value = value
+            entry.error = None
+            entry.load_seconds = round(time.perf_counter() - started, 3)
+            entry.loaded_at = datetime.now(timezone.utc).isoformat()
+            entry.state = READY
+            logger.info("Loaded %s in %.2fs", name, entry.load_seconds)
+            return value
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._entries and self._entries[name].state == READY
+
+    def replace(self, name: str, value):
+        """Swap in an already loaded value, e.g. after an index rebuild"""
+        entry = self.entry(name)
+        with entry.lock:
+            entry.value = value
+            entry.error = None
+            entry.loaded_at = datetime.now(timezone.utc).isoformat()
+            entry.state = READY
+
+    def warm_up(self, names: Optional[Iterable[str]] = None):
+        """Load the given entries (default: all preload entries), recording failures"""
+        if names is None:
+            names = [name for name, entry in self._entries.items() if entry.preload]
+        for name in names:
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    def start_warm_up(self) -> threading.Thread:
+        """Run warm_up in a daemon thread so startup is not blocked"""
+        if self._warm_up_thread is None or not self._warm_up_thread.is_alive():
+            self._warm_up_thread = threading.Thread(
+                target=self.warm_up, name="model-warm-up", daemon=True
+            )
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def status(self) -> dict:
+        """Readiness report grouped by models, indexes and DB pools"""
+        report = {section: {} for section in KIND_SECTIONS.values()}
+        ready = True
+        for name, entry in self._entries.items():
+            if entry.kind == "db_pool" and entry.state in (UNLOADED, FAILED):
+                # DB pools are cheap to retry; models and indexes never load inside a probe
+                try:
+                    self.get(name)
+                except Exception:
+                    pass
+            info = entry.describe()
+            if entry.check is not None and entry.state == READY:
+                try:
+                    info["check"] = entry.check(entry.value)
+                    info["healthy"] = True
+                except Exception as e:
+                    info["healthy"] = False
+                    info["error"] = f"{type(e).__name__}: {e}"
+            if entry.preload and (entry.state != READY or info.get("healthy") is False):
+                ready = False
+            report[KIND_SECTIONS[entry.kind]][name] = info
+
+        report["ready"] = ready
+        report["timestamp"] = datetime.now(timezone.utc).isoformat()
+        return report
+
+
+# Default model loaders. Imports live inside each loader on purpose.
+
+def load_clip():
+    import clip
+    import torch
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model, preprocess = clip.load(os.getenv("CLIP_MODEL", "ViT-B/32"), device=device)
+    model.eval()
+    return {"model": model, "preprocess": preprocess, "device": device}
+
+
+def load_text_encoder():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(os.getenv("TEXT_EMBEDDING_MODEL", "clip-ViT-B-32"))
+
+
+def load_whisper():
+    import whisper
+
+    return whisper.load_model(os.getenv("WHISPER_MODEL", "base"))
+
+
+def load_wall_detector():
+    from ultralytics import YOLO
+
+    return YOLO(os.getenv("YOLO_WEIGHTS", os.path.join(AI_MODEL_PATH, "yolov8n.pt")))
+
+
+DEFAULT_MODELS = {
+    "clip": load_clip,
+    "text_encoder": load_text_encoder,
+    "whisper": load_whisper,
+    "wall_detector": load_wall_detector,
+}
+
+
+def parse_names(value: str) -> set:
+    """Parse a comma separated list of registry names"""
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def register_default_models(registry: ModelRegistry, preload: str = ""):
+    """Register the standard model loaders; `preload` is a comma separated list of names"""
+    preload_names = parse_names(preload)
+    for name, loader in DEFAULT_MODELS.items():
+        registry.register(name, loader, kind="model", preload=name in preload_names)
+
+
+# Shared registry used by the API
+registry = ModelRegistry()
@@ -0,0 +1,47 @@
+"""
+Hex colour palettes as stored in dominant_palette and palette_json
+
+A palette blob is {"colors": [...]}, named entries ({"primary": ...,
+"secondary": ..., "accent": ...}) or a bare list of "#RRGGBB"/"#RGB"
+strings. Unparseable entries are skipped.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+NAMED_COLORS = ("primary", "secondary", "accent")
+
+
+def hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    """(r, g, b) in 0-255; raises ValueError for anything but "#RRGGBB" or "#RGB" """
+    if not isinstance(color, str):
+        raise ValueError(f"Not a hex colour: {color!r}")
+    value = color.strip().lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    if len(value) != 6:
+        raise ValueError(f"Not a hex colour: {color!r}")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def is_hex_color(color) -> bool:
+    try:
+        hex_to_rgb(color)
+    except ValueError:
+        return False
+    return True
+
+
+def palette_hex(palette) -> List[str]:
+    """Valid hex colour strings of a palette blob, in order"""
+    if isinstance(palette, dict):
+        palette = palette.get("colors") or [palette[key] for key in NAMED_COLORS if palette.get(key)]
+    if not isinstance(palette, (list, tuple)):
+        return []
+    return [color for color in palette if is_hex_color(color)]
+
+
+def palette_rgb(palette) -> np.ndarray:
+    """(n, 3) float32 RGB array of a palette blob"""
+    colors = [hex_to_rgb(color) for color in palette_hex(palette)]
+    return np.asarray(colors, dtype=np.float32).reshape(-1, 3)
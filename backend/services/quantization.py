@@ -0,0 +1,285 @@
+"""
+Quantized artwork embeddings with exact re-ranking
+
+Two compressed representations of the 512-dim float32 embeddings:
+
+    int8  one signed byte per dimension (4x smaller)
+    pq    product quantization, one byte per sub-vector (64 bytes at m=64)
+
+Search scores every artwork against the compressed codes, keeps a shortlist
+and re-ranks it with the exact float vectors, which stay on the memory-mapped
+store and are only paged in for shortlisted rows.
+"""
+import os
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+QUANTIZATION_MODES = ("int8", "pq")
+
+# Rows scored per step, bounds temporary memory on large catalogs
+CHUNK_ROWS = 65536
+
+
+def _normalize(query) -> np.ndarray:
+    q = np.asarray(query, dtype=np.float32).ravel()
+    norm = np.linalg.norm(q)
+    return q / norm if norm else q
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class ScalarQuantizer:
+    """Per-dimension linear quantization to int8"""
+
+    kind = "int8"
+
+    def __init__(self):
+        self.low = None
+        self.scale = None
+
+    def fit(self, vectors: np.ndarray) -> "ScalarQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.low = vectors.min(axis=0)
+        high = vectors.max(axis=0)
+        self.scale = np.maximum(high - self.low, 1e-12) / 255.0
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.low) / self.scale)
+        return (np.clip(codes, 0, 255) - 128).astype(np.int8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return self.low + (codes.astype(np.float32) + 128.0) * self.scale
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate inner products without decoding the whole matrix"""
+        weights = query * self.scale
+        offset = float(query @ self.low) + 128.0 * float(weights.sum())
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), CHUNK_ROWS):
+            block = codes[start:start + CHUNK_ROWS].astype(np.float32)
+            out[start:start + len(block)] = block @ weights + offset
+        return out
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return dim
+
+    def state(self) -> dict:
+        return {"low": self.low, "scale": self.scale}
+
+    @classmethod
+    def from_state(cls, state) -> "ScalarQuantizer":
+        quantizer = cls()
+        quantizer.low = np.asarray(state["low"], dtype=np.float32)
+        quantizer.scale = np.asarray(state["scale"], dtype=np.float32)
+        return quantizer
+
+
+class ProductQuantizer:
+    """Product quantization with 256 centroids per sub-space"""
+
+    kind = "pq"
+
+    def __init__(self, m: int = 64, iterations: int = 20, train_size: int = 50000, seed: int = 0):
+        self.m = m
+        self.iterations = iterations
+        self.train_size = train_size
+        self.seed = seed
+        self.centroids = None  # (m, 256, dsub)
+
+    def fit(self, vectors: np.ndarray) -> "ProductQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        if dim % self.m:
+            raise ValueError(f"Dimension {dim} is not divisible by m={self.m}")
+        rng = np.random.default_rng(self.seed)
+        if n > self.train_size:
+            vectors = vectors[np.sort(rng.choice(n, self.train_size, replace=False))]
+        dsub = dim // self.m
+        ksub = min(256, len(vectors))
+        self.centroids = np.empty((self.m, ksub, dsub), dtype=np.float32)
+        for j in range(self.m):
+            sub = np.ascontiguousarray(vectors[:, j * dsub:(j + 1) * dsub])
+            self.centroids[j] = _kmeans(sub, ksub, self.iterations, rng)
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dsub = self.centroids.shape[2]
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            sub = vectors[:, j * dsub:(j + 1) * dsub]
+            codes[:, j] = _assign(sub, self.centroids[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = [self.centroids[j][codes[:, j]] for j in range(self.m)]
+        return np.concatenate(parts, axis=1)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Asymmetric distance computation via per-query lookup tables"""
+        dsub = self.centroids.shape[2]
+        tables = np.einsum("jkd,jd->jk", self.centroids, query.reshape(self.m, dsub))
+        out = np.empty(len(codes), dtype=np.float32)
+        columns = np.arange(self.m)
+        for start in range(0, len(codes), CHUNK_ROWS):
+            block = codes[start:start + CHUNK_ROWS]
+            out[start:start + len(block)] = tables[columns, block].sum(axis=1)
+        return out
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return self.m
+
+    def state(self) -> dict:
+        return {"centroids": self.centroids}
+
+    @classmethod
+    def from_state(cls, state) -> "ProductQuantizer":
+        centroids = np.asarray(state["centroids"], dtype=np.float32)
+        quantizer = cls(m=centroids.shape[0])
+        quantizer.centroids = centroids
+        return quantizer
+
+
+QUANTIZERS = {"int8": ScalarQuantizer, "pq": ProductQuantizer}
+
+
+class QuantizedIndex:
+    """Compressed codes for approximate scoring plus float vectors for re-ranking"""
+
+    def __init__(self, quantizer, codes: np.ndarray, vectors: np.ndarray, ids: Optional[Sequence] = None):
+        self.quantizer = quantizer
+        self.codes = codes
+        self.vectors = vectors
+        self.ids = ids
+
+    @property
+    def mode(self) -> str:
+        return self.quantizer.kind
+
+    @classmethod
+    def build(cls, mode: str, vectors: np.ndarray, ids: Optional[Sequence] = None, **options) -> "QuantizedIndex":
+        """Train a quantizer on the catalog vectors and encode them in chunks"""
+        if mode not in QUANTIZERS:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        quantizer = QUANTIZERS[mode](**options).fit(vectors)
+        codes = np.concatenate([
+            quantizer.encode(vectors[start:start + CHUNK_ROWS])
+            for start in range(0, len(vectors), CHUNK_ROWS)
+        ]) if len(vectors) else quantizer.encode(np.empty((0, vectors.shape[1]), dtype=np.float32))
+        return cls(quantizer, codes, vectors, ids)
+
+    def search_positions(self, query, k: int = 10, shortlist: int = 100, rerank: bool = True) -> np.ndarray:
+        """Row positions of the best k matches"""
+        q = _normalize(query)
+        approx = self.quantizer.scores(self.codes, q)
+        if not rerank:
+            return _top_k(approx, k)
+        candidates = _top_k(approx, max(shortlist, k))
+        # Sorted positions keep memory-mapped reads sequential
+        candidates = np.sort(candidates)
+        exact = np.asarray(self.vectors[candidates], dtype=np.float32) @ q
+        return candidates[_top_k(exact, k)]
+
+    def search(self, query, k: int = 10, shortlist: int = 100):
+        """(id, exact score) pairs for the best k matches"""
+        q = _normalize(query)
+        positions = self.search_positions(q, k, shortlist)
+        scores = np.asarray(self.vectors[positions], dtype=np.float32) @ q
+        ids = self.ids if self.ids is not None else np.arange(len(self.vectors))
+        return [(str(ids[p]), float(s)) for p, s in zip(positions, scores)]
+
+    def bytes_per_vector(self) -> int:
+        return self.quantizer.bytes_per_vector(self.vectors.shape[1])
+
+    def save(self, directory: str):
+        """Persist codes and quantizer parameters next to a store generation"""
+        np.save(os.path.join(directory, f"{self.mode}.codes.npy"), self.codes)
+        np.savez(os.path.join(directory, f"{self.mode}.params.npz"), **self.quantizer.state())
+
+    @classmethod
+    def load(cls, directory: str, mode: str, vectors: np.ndarray, ids: Optional[Sequence] = None) -> "QuantizedIndex":
+        codes = np.load(os.path.join(directory, f"{mode}.codes.npy"), mmap_mode="r")[:len(vectors)]
+        with np.load(os.path.join(directory, f"{mode}.params.npz")) as state:
+            quantizer = QUANTIZERS[mode].from_state(state)
+        return cls(quantizer, codes, vectors, ids)
+
+
+def exact_search(vectors: np.ndarray, queries: np.ndarray, k: int = 10) -> np.ndarray:
+    """Brute-force ground truth: (len(queries), k) row positions"""
+    queries = np.asarray(queries, dtype=np.float32)
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    queries = queries / np.where(norms == 0, 1.0, norms)
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_ids = np.empty((len(queries), 0), dtype=np.int64)
+    # Keep the (queries x rows) score block around 16M floats
+    rows = max(1024, (1 << 24) // max(len(queries), 1))
+    for start in range(0, len(vectors), rows):
+        block = np.asarray(vectors[start:start + rows], dtype=np.float32)
+        scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+        ids = np.concatenate([best_ids, np.broadcast_to(
+            np.arange(start, start + len(block)), (len(queries), len(block)))], axis=1)
+        keep = min(k, scores.shape[1])
+        top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_ids = np.take_along_axis(ids, top, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_ids, order, axis=1)
+
+
+def recall_at_k(found: Sequence[Sequence[int]], truth: np.ndarray, k: int) -> float:
+    hits = sum(len(set(list(row)[:k]) & set(truth_row[:k].tolist())) for row, truth_row in zip(found, truth))
+    return hits / float(len(truth) * k) if len(truth) else 0.0
+
+
+def evaluate_recall(index: QuantizedIndex, queries: np.ndarray, k: int = 10, shortlist: int = 100,
+                    ground_truth: Optional[np.ndarray] = None) -> dict:
+    """Recall@k of the quantized index against exact float search"""
+    if ground_truth is None:
+        ground_truth = exact_search(index.vectors, queries, k)
+    started = time.perf_counter()
+    reranked = [index.search_positions(q, k, shortlist) for q in queries]
+    elapsed = time.perf_counter() - started
+    approximate = [index.search_positions(q, k, rerank=False) for q in queries]
+    dim = index.vectors.shape[1]
+    return {
+        "mode": index.mode,
+        "k": k,
+        "shortlist": shortlist,
+        "queries": len(queries),
+        "recall_at_k": round(recall_at_k(reranked, ground_truth, k), 4),
+        "recall_at_k_without_rerank": round(recall_at_k(approximate, ground_truth, k), 4),
+        "bytes_per_vector": index.bytes_per_vector(),
+        "float_bytes_per_vector": dim * 4,
+        "compression": round(dim * 4 / index.bytes_per_vector(), 1),
+        "mean_query_ms": round(1000 * elapsed / max(len(queries), 1), 3),
+    }
+
+
+def _assign(sub: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+    scores = sub @ centroids.T - 0.5 * (centroids * centroids).sum(axis=1)
+    return scores.argmax(axis=1)
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int, rng) -> np.ndarray:
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(data, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([
+            np.bincount(labels, weights=data[:, d], minlength=k) for d in range(data.shape[1])
+        ], axis=1)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+    return centroids
@@ -0,0 +1,141 @@
+"""
+Staged recommendations streamed over Server-Sent Events
+
+The pipeline yields each stage as soon as it is ready, so time to first
+result is query encoding plus vector search:
+
+    candidates  provisional artwork ids and scores straight from the index
+    artworks    enriched payloads, duplicates collapsed, in final rank order
+    rationale   one event per artwork as its explanation is generated
+    done        counts and per-stage timings
+    error       a stage failed; sent instead of the remaining stages
+"""
+import logging
+import re
+import time
+import uuid
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from models.artwork import Artwork
+from services.dedup import collapse_ranked
+from services.serialization import artwork_serializer, assemble_json, dumps
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data) -> bytes:
+    """One SSE frame; bytes data is treated as pre-encoded single-line JSON"""
+    payload = bytes(data) if isinstance(data, (bytes, bytearray)) else dumps(data)
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + payload + b"\n\n"
+
+
+def build_rationale(query_text: str, artwork, score: float) -> str:
+    """Short explanation of why an artwork matches the query"""
+    query_words = set(re.findall(r"[a-z]+", (query_text or "").lower()))
+    matched = [tag for tag in artwork.style_tags or [] if tag in query_words]
+    if matched:
+        parts = [f"Matches the {', '.join(matched)} style you asked for"]
+    else:
+        parts = [f"Visually close to your request ({score:.0%} similarity)"]
+    palette = artwork.dominant_palette or {}
+    if palette.get("primary"):
+        parts.append(f"its palette is led by {palette['primary']}")
+    if artwork.price is not None:
+        parts.append(f"priced at ${artwork.price:.2f}")
+    return "; ".join(parts) + "."
+
+
+def fetch_artworks(session_factory: Callable, artwork_ids: Sequence[str]) -> List:
+    """Artwork rows for the given ids (any order, missing ids skipped)"""
+    uuids = []
+    for artwork_id in artwork_ids:
+        try:
+            uuids.append(uuid.UUID(str(artwork_id)))
+        except ValueError:
+            continue
+    if not uuids:
+        return []
+    db = session_factory()
+    try:
+        return db.query(Artwork).filter(Artwork.id.in_(uuids)).all()
+    finally:
+        db.close()
+
+
+class RecommendationStream:
+    """Encode, search, enrich and explain one query, yielding each stage as it completes"""
+
+    def __init__(self, encoder, store, fetch: Callable[[Sequence[str]], List],
+                 serializer=artwork_serializer, log=None, k: int = 10, oversample: int = 3):
+        self.encoder = encoder
+        self.store = store
+        self.fetch = fetch
+        self.serializer = serializer
+        self.log = log
+        self.k = k
+        self.oversample = oversample
+
+    async def events(self, query_text: str, user_id: Optional[uuid.UUID] = None,
+                     query_type: str = "text") -> AsyncIterator[bytes]:
+        """The stages as SSE frames"""
+        async for event, data in self.stages(query_text, user_id, query_type):
+            yield sse_event(event, data)
+
+    async def stages(self, query_text: str, user_id: Optional[uuid.UUID] = None,
+                     query_type: str = "text") -> AsyncIterator[Tuple[str, object]]:
+        """(event, data) pairs; data is a dict or pre-encoded JSON bytes
+
+        The response has already started by the time a stage runs, so a
+        failure ends the stream with an error event rather than an exception.
+        """
+        try:
+            async for stage in self._run(query_text, user_id, query_type):
+                yield stage
+        except Exception:
+            logger.exception("Recommendation stream failed")
+            yield "error", {"detail": "Recommendations failed, please retry"}
+
+    async def _run(self, query_text: str, user_id: Optional[uuid.UUID],
+                   query_type: str) -> AsyncIterator[Tuple[str, object]]:
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        def mark(stage: str):
+            timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+
+        # Over-fetch so collapsing duplicates still leaves k results
+        vectors = await run_in_threadpool(self.encoder.encode_texts, [query_text])
+        hits = await run_in_threadpool(self.store.search, vectors[0], self.k * self.oversample)
+        scores = dict(hits)
+        mark("candidates")
+        yield "candidates", {
+            "ids": [artwork_id for artwork_id, _ in hits[:self.k]],
+            "scores": [round(score, 4) for _, score in hits[:self.k]],
+        }
+
+        rows = await run_in_threadpool(self.fetch, [artwork_id for artwork_id, _ in hits])
+        by_id = {str(row.id): row for row in rows}
+        ranked = [artwork_id for artwork_id, _ in hits if artwork_id in by_id]
+        canonical_ids = {artwork_id: str(by_id[artwork_id].canonical_id or artwork_id) for artwork_id in ranked}
+        artworks = [by_id[artwork_id] for artwork_id in collapse_ranked(ranked, canonical_ids)[:self.k]]
+        mark("artworks")
+        yield "artworks", assemble_json({"artworks": self.serializer.encode_many(artworks)})
+
+        rationales = []
+        for artwork in artworks:
+            rationale = build_rationale(query_text, artwork, scores[str(artwork.id)])
+            rationales.append(rationale)
+            yield "rationale", {"id": str(artwork.id), "rationale": rationale}
+        mark("rationale")
+
+        if self.log is not None and user_id is not None:
+            self.log.log(
+                user_id=user_id,
+                query_text=query_text,
+                query_type=query_type,
+                topk_ids=[artwork.id for artwork in artworks],
+                rationale="\n".join(rationales),
+            )
+        yield "done", {"count": len(artworks), "timings_ms": timings}
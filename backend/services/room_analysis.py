@@ -0,0 +1,207 @@
+"""
+Room photo analysis with a perceptual-hash cache
+
+Users often re-upload the same room photo, re-cropped, re-compressed or with
+a filter applied. Every upload is reduced to a 64-bit difference hash (dHash)
+of its downscaled greyscale image, which survives resizing, JPEG artefacts
+and brightness/contrast changes. Finished analyses are cached under that hash
+and a new upload within max_distance bits of a cached one reuses its stored
+JSON instead of re-running analysis.
+
+Near lookups use multi-index hashing: the hash is split into more bands than
+the allowed distance, so by pigeonhole any match agrees exactly with the
+query on at least one band, and only those bucket members are compared.
+"""
+import io
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.serialization import dumps
+
+HASH_SIZE = 8  # 8x8 gradient bits = 64-bit hash
+ANALYSIS_SIZE = 64  # longest side of the image the basic analysis runs on
+ENTRY_OVERHEAD_BYTES = 256  # hash, index and bookkeeping per cached analysis
+MAX_IMAGE_PIXELS = 50_000_000  # well above any phone camera, well below a decompression bomb
+
+
+def decode_image(data: bytes):
+    """Pillow image in upright RGB; raises ValueError for anything that is not an image"""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        # Only the header has been read so far; refuse huge canvases before decoding them
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise ValueError(f"Image is larger than {MAX_IMAGE_PIXELS} pixels")
+        # JPEGs decode straight to a reduced size; hashing and analysis never need full resolution
+        image.draft("RGB", (ANALYSIS_SIZE * 4, ANALYSIS_SIZE * 4))
+        # Phones store rotation in EXIF, so the same shot can arrive either way up
+        return ImageOps.exif_transpose(image).convert("RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        # DecompressionBombError is not an OSError
+        raise ValueError("Upload is not a readable image") from e
+
+
+def dhash_pixels(gray: np.ndarray) -> int:
+    """dHash of a (HASH_SIZE, HASH_SIZE + 1) greyscale array: one bit per horizontal gradient sign"""
+    bits = (gray[:, 1:] > gray[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def image_dhash(image) -> int:
+    from PIL import Image
+
+    gray = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR)
+    return dhash_pixels(np.asarray(gray, dtype=np.int16))
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def dominant_colors(pixels: np.ndarray, count: int = 5) -> List[str]:
+    """Most common colours of an (n, 3) RGB array, via a 4-bit-per-channel histogram"""
+    quantized = (pixels >> 4).astype(np.int32)
+    codes = (quantized[:, 0] << 8) | (quantized[:, 1] << 4) | quantized[:, 2]
+    counts = np.bincount(codes, minlength=4096)
+    colors = []
+    for code in np.argsort(-counts, kind="stable")[:count]:
+        if counts[code] == 0:
+            break
+        mask = codes == code
+        r, g, b = (int(c) for c in pixels[mask].mean(axis=0).round())
+        colors.append(f"#{r:02X}{g:02X}{b:02X}")
+    return colors
+
+
+def analyze_image(image) -> Dict:
+    """Palette and lighting from the downscaled photo
+
+    Wall detection and style classification need the vision models and are
+    filled in by the model pipeline; their sections stay empty here.
+    """
+    small = image.copy()
+    small.thumbnail((ANALYSIS_SIZE, ANALYSIS_SIZE))
+    pixels = np.asarray(small, dtype=np.uint8).reshape(-1, 3)
+    luminance = pixels @ np.array([0.2126, 0.7152, 0.0722])
+    red, blue = pixels[:, 0].mean(), pixels[:, 2].mean()
+    colors = dominant_colors(pixels)
+    return {
+        "palette_json": {"colors": colors},
+        "lighting_json": {
+            "brightness": round(float(luminance.mean() / 255.0), 3),
+            "contrast": round(float(luminance.std() / 255.0), 3),
+            "tone": "warm" if red > blue * 1.08 else "cool" if blue > red * 1.08 else "neutral",
+        },
+        "wall_detection_json": {},
+        "style_analysis": {},
+    }
+
+
+class RoomAnalysisCache:
+    """LRU of encoded analyses keyed on dHash, bounded by total encoded bytes"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_distance: int = 6):
+        if not 0 <= max_distance < 64:
+            raise ValueError("max_distance must be between 0 and 63")
+        self.max_bytes = max_bytes
+        self.max_distance = max_distance
+        # Smallest band count above max_distance that splits 64 bits evenly
+        self.bands = next(b for b in (1, 2, 4, 8, 16, 32, 64) if b > max_distance)
+        self.band_bits = 64 // self.bands
+        self._entries: "OrderedDict[int, bytes]" = OrderedDict()
+        self._index: List[Dict[int, set]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _band_keys(self, phash: int):
+        mask = (1 << self.band_bits) - 1
+        return [(phash >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def get(self, phash: int) -> Optional[Tuple[bytes, int]]:
+        """(encoded analysis, Hamming distance) of the closest cached hash within max_distance"""
+        with self._lock:
+            fragment = self._entries.get(phash)
+            if fragment is not None:
+                self._entries.move_to_end(phash)
+                self.hits += 1
+                return fragment, 0
+
+            candidates = set()
+            for band, key in enumerate(self._band_keys(phash)):
+                candidates.update(self._index[band].get(key, ()))
+            best, best_distance = None, self.max_distance + 1
+            for candidate in candidates:
+                distance = hamming(phash, candidate)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.near_hits += 1
+            return self._entries[best], best_distance
+
+    def put(self, phash: int, analysis) -> bytes:
+        """Cache an analysis (dict or pre-encoded JSON) and return its encoding"""
+        fragment = analysis if isinstance(analysis, bytes) else dumps(analysis)
+        size = len(fragment) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return fragment
+        with self._lock:
+            if phash in self._entries:
+                self._remove(phash)
+            self._entries[phash] = fragment
+            self.bytes += size
+            for band, key in enumerate(self._band_keys(phash)):
+                self._index[band].setdefault(key, set()).add(phash)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return fragment
+
+    def _remove(self, phash: int):
+        fragment = self._entries.pop(phash)
+        self.bytes -= len(fragment) + ENTRY_OVERHEAD_BYTES
+        for band, key in enumerate(self._band_keys(phash)):
+            bucket = self._index[band][key]
+            bucket.discard(phash)
+            if not bucket:
+                del self._index[band][key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "max_distance": self.max_distance,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def analyze_with_cache(data: bytes, cache: RoomAnalysisCache,
+                       analyze: Callable = analyze_image) -> Tuple[bytes, int, Optional[int]]:
+    """(encoded analysis, dHash, distance to the cached shot or None on a miss)
+
+    Blocking (image decoding and analysis); call it from a worker thread.
+    """
+    image = decode_image(data)
+    phash = image_dhash(image)
+    cached = cache.get(phash)
+    if cached is not None:
+        return cached[0], phash, cached[1]
+    return cache.put(phash, analyze(image)), phash, None
@@ -0,0 +1,154 @@
+"""
+Artwork serialization with cached JSON fragments
+
+Each artwork is encoded to JSON bytes once per (id, updated_at) and the
+fragments are spliced into list responses, so hot endpoints never re-encode
+the same rows or run FastAPI's jsonable_encoder over them.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Iterable, Mapping, Tuple
+
+from fastapi.responses import Response
+
+# Field sets used by the artwork endpoints
+ARTWORK_LIST_FIELDS = (
+    "id",
+    "title",
+    "brand",
+    "price",
+    "style_tags",
+    "dominant_palette",
+    "image_url",
+    "dimensions",
+    "description",
+)
+ARTWORK_DETAIL_FIELDS = ARTWORK_LIST_FIELDS + ("created_at",)
+ARTWORK_SUMMARY_FIELDS = ("id", "title", "price", "image_url")
+
+# Named presets accepted by the fields= query parameter
+FIELD_SETS = {
+    "summary": ARTWORK_SUMMARY_FIELDS,
+    "list": ARTWORK_LIST_FIELDS,
+    "detail": ARTWORK_DETAIL_FIELDS,
+}
+
+
+def parse_fields(value: str = None, default: Tuple[str, ...] = ARTWORK_LIST_FIELDS,
+                 allowed: Tuple[str, ...] = ARTWORK_DETAIL_FIELDS) -> Tuple[str, ...]:
+    """Canonical field tuple for a fields= value ("summary" or "title,price")
+
+    Fields come back in `allowed` order with id always included, so every
+    spelling of the same set shares one serializer cache entry per artwork.
+    Raises ValueError on unknown fields.
+    """
+    if not value:
+        return default
+    if value in FIELD_SETS:
+        return FIELD_SETS[value]
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in allowed if name in requested)
+
+
+def dumps(value) -> bytes:
+    """Encode a value with the same settings as Starlette's JSONResponse"""
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def artwork_to_dict(artwork, fields: Tuple[str, ...] = ARTWORK_LIST_FIELDS) -> dict:
+    """Convert an Artwork row to a plain dict containing the requested fields"""
+    data = {}
+    for field in fields:
+        value = getattr(artwork, field)
+        if field == "id":
+            value = str(value)
+        elif field in ("created_at", "updated_at") and value is not None:
+            value = value.isoformat()
+        data[field] = value
+    return data
+
+
+def assemble_json(parts: Mapping) -> bytes:
+    """Build a JSON object whose bytes values are spliced in as pre-encoded fragments"""
+    chunks = []
+    for key, value in parts.items():
+        encoded = bytes(value) if isinstance(value, (bytes, bytearray)) else dumps(value)
+        chunks.append(dumps(key) + b":" + encoded)
+    return b"{" + b",".join(chunks) + b"}"
+
+
+class ArtworkSerializer:
+    """LRU cache of encoded artwork fragments keyed on (id, updated_at, fields)"""
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, artwork, fields: Tuple[str, ...] = ARTWORK_LIST_FIELDS) -> bytes:
+        """Return the JSON bytes for one artwork, encoding it only on a cache miss"""
+        updated_at = artwork.updated_at
+        if updated_at is None:
+            # Without a version stamp we cannot tell when the entry goes stale
+            return dumps(artwork_to_dict(artwork, fields))
+
+        key = (artwork.id, updated_at, fields)
+        with self._lock:
+            fragment = self._cache.get(key)
+            if fragment is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return fragment
+
+        fragment = dumps(artwork_to_dict(artwork, fields))
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = fragment
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return fragment
+
+    def encode_many(self, artworks: Iterable, fields: Tuple[str, ...] = ARTWORK_LIST_FIELDS) -> bytes:
+        """Return a JSON array assembled from cached artwork fragments"""
+        return b"[" + b",".join(self.encode(artwork, fields) for artwork in artworks) + b"]"
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class PreEncodedJSONResponse(Response):
+    """JSON response that passes pre-encoded bytes through untouched"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+
+# Shared serializer used by the API handlers
+artwork_serializer = ArtworkSerializer()
@@ -0,0 +1,151 @@
+"""
+Write-behind logging of recommendation sessions
+
+Handlers call session_log.log(...) which only puts a record on a bounded
+in-memory queue. A background thread drains the queue and writes the rows with
+one bulk INSERT per batch, flushing when the batch is full or the flush
+interval elapses, so no request pays for a commit.
+"""
+import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import insert
+
+from models.database import SessionLocal
+from models.user import Session as UserSession
+
+logger = logging.getLogger(__name__)
+
+SESSION_FIELDS = (
+    "user_id",
+    "query_text",
+    "query_type",
+    "topk_ids",
+    "chosen_id",
+    "rationale",
+    "satisfaction_score",
+)
+
+
+class SessionLogWriter:
+    """Bounded queue of Session rows flushed in bulk by a background thread"""
+
+    def __init__(self, session_factory: Callable = SessionLocal, max_queue: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 1.0):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counter_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_at = None
+
+    def log(self, **record) -> bool:
+        """Queue a Session row without blocking; returns False if it was dropped"""
+        unknown = set(record) - set(SESSION_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown session fields: {', '.join(sorted(unknown))}")
+        # id and created_at are fixed now so late flushes keep the real arrival time
+        record.setdefault("id", uuid.uuid4())
+        record.setdefault("created_at", datetime.now(timezone.utc))
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+            return False
+        with self._counter_lock:
+            self.enqueued += 1
+        return True
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the writer after flushing everything already queued"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # Anything left (writer never started or join timed out) is flushed inline
+        self._drain()
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while not self._stop.is_set():
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self._queue.get(timeout=min(timeout, 0.1)))
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        if batch:
+            self._flush(batch)
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch):
+        db = self.session_factory()
+        try:
+            db.execute(insert(UserSession), batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to write %d session rows", len(batch))
+            with self._counter_lock:
+                self.failed += len(batch)
+            return
+        finally:
+            db.close()
+        with self._counter_lock:
+            self.written += len(batch)
+            self.batches += 1
+            self.last_flush_at = datetime.now(timezone.utc).isoformat()
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "last_flush_at": self.last_flush_at,
+            }
+
+
+# Shared writer started and stopped with the API
+session_log = SessionLogWriter()
@@ -0,0 +1,136 @@
+"""
+Single-flight coalescing of identical concurrent requests
+
+While a flight for a key is running, later calls with the same key wait for
+it and get the same result instead of running the computation again. Keys are
+the handler name plus its normalised keyword arguments; per-request objects
+such as the DB session are excluded. Nothing is cached once the flight lands.
+The shared computation runs in its own task, so no single caller's
+cancellation can take it down for the rest.
+"""
+import asyncio
+import functools
+import inspect
+from collections import Counter
+from typing import Callable, Dict, Iterable, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+
+def freeze(value):
+    """Hashable, order-normalised form of a parameter value"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(freeze(v) for v in value))
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def flight_key(name: str, kwargs: dict, exclude: Iterable[str] = ()) -> Tuple:
+    excluded = set(exclude)
+    return (name,) + tuple(sorted((k, freeze(v)) for k, v in kwargs.items() if k not in excluded))
+
+
+class _Flight:
+    __slots__ = ("task", "absorbed")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.absorbed = 0
+
+
+class SingleFlight:
+    """Shares one in-flight computation between identical concurrent callers"""
+
+    def __init__(self):
+        self._flights: Dict[Tuple, _Flight] = {}
+        self._stats: Dict[str, dict] = {}
+
+    async def do(self, key: Tuple, fn: Callable):
+        """Await fn() unless a flight for key is already running, then await that"""
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.absorbed += 1
+        else:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._land(key, flight))
+        # Every caller, the starter included, waits through a shield
+        return await asyncio.shield(flight.task)
+
+    def _land(self, key: Tuple, flight: _Flight):
+        del self._flights[key]
+        self._record(key[0], flight.absorbed)
+        if not flight.task.cancelled():
+            flight.task.exception()  # mark retrieved when every caller has gone
+
+    def coalesce(self, exclude: Iterable[str] = ("db",), bypass: Callable[[dict], bool] = None,
+                 session_factory: Callable = None, session_arg: str = "db"):
+        """Decorator for FastAPI handlers; sync handlers run in the threadpool
+
+        Calls for which bypass(kwargs) is true run on their own, e.g. reads
+        that must see the caller's own recent writes. With session_factory,
+        a flight opens and closes its own session for session_arg instead of
+        borrowing the starting request's, which is torn down when that
+        request ends even if other callers are still waiting on the flight.
+        """
+        exclude = tuple(exclude)
+
+        def decorator(handler):
+            name = handler.__name__
+            is_async = inspect.iscoroutinefunction(handler)
+
+            async def invoke(kwargs):
+                if is_async:
+                    return await handler(**kwargs)
+                return await run_in_threadpool(handler, **kwargs)
+
+            async def flight(kwargs):
+                # Opening a read session may probe replicas, so keep it off the event loop
+                db = await run_in_threadpool(session_factory)
+                try:
+                    return await invoke({**kwargs, session_arg: db})
+                finally:
+                    db.close()
+
+            @functools.wraps(handler)
+            async def wrapper(**kwargs):
+                if bypass is not None and bypass(kwargs):
+                    return await invoke(kwargs)
+                if session_factory is None:
+                    call = lambda: invoke(kwargs)
+                else:
+                    shared = {k: v for k, v in kwargs.items() if k != session_arg}
+                    call = lambda: flight(shared)
+                return await self.do(flight_key(name, kwargs, exclude), call)
+
+            return wrapper
+
+        return decorator
+
+    def _record(self, name: str, absorbed: int):
+        stats = self._stats.setdefault(name, {"flights": 0, "requests": 0, "absorbed": Counter()})
+        stats["flights"] += 1
+        stats["requests"] += 1 + absorbed
+        stats["absorbed"][absorbed] += 1
+
+    def stats(self) -> dict:
+        """Per handler: flights run, requests served, and a histogram of requests absorbed per flight"""
+        return {
+            name: {
+                "flights": s["flights"],
+                "requests": s["requests"],
+                "coalesced": s["requests"] - s["flights"],
+                "in_flight": sum(1 for key in self._flights if key[0] == name),
+                "max_absorbed": max(s["absorbed"]),
+                "absorbed_per_flight": {str(k): v for k, v in sorted(s["absorbed"].items())},
+            }
+            for name, s in self._stats.items()
+        }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,84 @@
+"""
+Trend rollups and time-bucketed history
+
+trend_analysis is an append-only history per style and region. Reads of
+"what is trending now" go to trend_latest, a one-row-per-(style, region)
+rollup kept current by an insert trigger (see database/schema.sql), and
+history is aggregated into time buckets over the (style, region, created_at)
+index rather than returning every row.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, text
+
+from models.trend import TrendAnalysis, TrendLatest
+
+GLOBAL_REGION = "global"
+HISTORY_BUCKETS = ("hour", "day", "week", "month")
+DEFAULT_HISTORY_DAYS = 90
+
+
+def latest_trends(db, region: str = None, style: str = None, season: str = None):
+    """Query over the rollup, highest score first"""
+    query = db.query(TrendLatest)
+    if region:
+        query = query.filter(TrendLatest.region == region)
+    if style:
+        query = query.filter(TrendLatest.style == style)
+    if season:
+        # Year-round trends apply to every season
+        query = query.filter(TrendLatest.season.in_([season, "all"]))
+    return query.order_by(TrendLatest.trend_score.desc(), TrendLatest.style)
+
+
+def trend_history(db, style: str = None, region: str = None, bucket: str = "week",
+                  since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Average, peak and sample count of trend_score per time bucket"""
+    if bucket not in HISTORY_BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(HISTORY_BUCKETS)}")
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(days=DEFAULT_HISTORY_DAYS)
+
+    period = func.date_trunc(bucket, TrendAnalysis.created_at).label("bucket")
+    region_key = func.coalesce(TrendAnalysis.region, GLOBAL_REGION).label("region")
+    query = db.query(
+        period,
+        TrendAnalysis.style,
+        region_key,
+        func.avg(TrendAnalysis.trend_score).label("avg_score"),
+        func.max(TrendAnalysis.trend_score).label("max_score"),
+        func.count().label("samples"),
+    ).filter(TrendAnalysis.created_at >= since)
+    if until is not None:
+        query = query.filter(TrendAnalysis.created_at < until)
+    if style:
+        query = query.filter(TrendAnalysis.style == style)
+    if region:
+        query = query.filter(region_key == region)
+    return query.group_by(period, TrendAnalysis.style, region_key).order_by(
+        TrendAnalysis.style, region_key, period
+    )
+
+
+REBUILD_LATEST_SQL = text("""
+    INSERT INTO trend_latest (style, region, season, trend_score, seasonal_factor, analysis_data, trend_id, as_of)
+    SELECT DISTINCT ON (style, COALESCE(region, 'global'))
+        style, COALESCE(region, 'global'), COALESCE(season, analysis_data->>'season'),
+        trend_score, seasonal_factor, analysis_data, id, created_at
+    FROM trend_analysis
+    ORDER BY style, COALESCE(region, 'global'), created_at DESC
+    ON CONFLICT (style, region) DO UPDATE SET
+        season = EXCLUDED.season,
+        trend_score = EXCLUDED.trend_score,
+        seasonal_factor = EXCLUDED.seasonal_factor,
+        analysis_data = EXCLUDED.analysis_data,
+        trend_id = EXCLUDED.trend_id,
+        as_of = EXCLUDED.as_of
+""")
+
+
+def rebuild_latest(db):
+    """Recompute trend_latest from history, for databases created without the trigger"""
+    db.execute(REBUILD_LATEST_SQL)
+    db.commit()
@@ -0,0 +1,257 @@
+"""
+Memory-mapped artwork embedding store shared across worker processes
+
+The catalog embedding matrix is written once into a generation directory as
+.npy files and every uvicorn worker maps it read-only, so all workers share
+the same page-cache pages instead of each holding a private copy.
+
+Layout of EMBEDDING_STORE_DIR:
+
+    CURRENT              name of the live generation, replaced atomically
+    gen-000001/
+        vectors.npy      float32 (count, dim), L2-normalised
+        ids.npy          artwork ids as fixed-width strings
+        meta.json        count, dim, generation, created_at
+        int8.codes.npy   optional quantized codes (see services.quantization)
+        pq.codes.npy
+
+Reloads write a complete new generation next to the old one and then swap
+CURRENT with os.replace; readers notice the new name and re-map.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.quantization import QUANTIZATION_MODES, QuantizedIndex
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "./data/embeddings")
+EMBEDDING_DIM = 512
+
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise each row so inner product equals cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class EmbeddingSnapshot:
+    """One immutable, memory-mapped generation of the embedding matrix"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.generation = os.path.basename(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        count = self.meta["count"]
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")[:count]
+        self.ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="r")[:count]
+        self._quantized = {}
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @property
+    def quantized_modes(self) -> List[str]:
+        return [mode for mode in QUANTIZATION_MODES
+                if os.path.exists(os.path.join(self.path, f"{mode}.codes.npy"))]
+
+    def quantized_index(self, mode: str) -> QuantizedIndex:
+        """Quantized codes persisted with this generation, mapped on first use"""
+        if mode not in self._quantized:
+            if mode not in self.quantized_modes:
+                raise ValueError(f"Generation {self.generation} has no {mode} codes")
+            self._quantized[mode] = QuantizedIndex.load(self.path, mode, self.vectors, self.ids)
+        return self._quantized[mode]
+
+    def search(self, query: Sequence[float], k: int = 10, mode: str = "exact",
+               shortlist: int = 100) -> List[Tuple[str, float]]:
+        """Cosine search: exact over the float matrix, or quantized with exact re-rank"""
+        if len(self) == 0:
+            return []
+        if mode != "exact":
+            return self.quantized_index(mode).search(query, k, shortlist)
+        q = normalize_rows(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        scores = self.vectors @ q
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(str(self.ids[i]), float(scores[i])) for i in top]
+
+
+class GenerationWriter:
+    """Writes a new generation incrementally, then publishes it atomically"""
+
+    def __init__(self, root: str, count: int, dim: int = EMBEDDING_DIM, id_width: int = 36,
+                 model_version: str = None):
+        self.root = root
+        self.count = count
+        self.dim = dim
+        self.model_version = model_version  # Encoder the vectors came from, recorded in meta.json
+        os.makedirs(root, exist_ok=True)
+        self.tmp_path = os.path.join(root, f"tmp-{uuid.uuid4().hex}")
+        os.makedirs(self.tmp_path)
+        self.vectors = np.lib.format.open_memmap(
+            os.path.join(self.tmp_path, "vectors.npy"), mode="w+",
+            dtype=np.float32, shape=(count, dim),
+        )
+        self.ids = np.lib.format.open_memmap(
+            os.path.join(self.tmp_path, "ids.npy"), mode="w+",
+            dtype=f"U{id_width}", shape=(count,),
+        )
+        self.written = 0
+
+    def write(self, ids: Sequence, vectors) -> int:
+        """Append a chunk of rows; returns the number written so far"""
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        end = self.written + len(ids)
+        if end > self.count:
+            raise ValueError(f"Generation sized for {self.count} rows, got {end}")
+        self.vectors[self.written:end] = vectors
+        self.ids[self.written:end] = [str(i) for i in ids]
+        self.written = end
+        return self.written
+
+    def add_quantized(self, mode: str, **options) -> QuantizedIndex:
+        """Train and save quantized codes for the rows written so far"""
+        index = QuantizedIndex.build(mode, self.vectors[:self.written], **options)
+        index.save(self.tmp_path)
+        return index
+
+    def commit(self, keep: int = 2) -> str:
+        """Flush, rename into place and swap CURRENT; returns the generation name
+
+        A generation may be committed with fewer rows than it was sized for
+        (rows deleted while streaming); readers only map the written prefix.
+        """
+        self.vectors.flush()
+        self.ids.flush()
+        del self.vectors, self.ids
+
+        generation = _next_generation(self.root)
+        with open(os.path.join(self.tmp_path, "meta.json"), "w") as f:
+            json.dump({
+                "count": self.written,
+                "dim": self.dim,
+                "model_version": self.model_version,
+                "generation": generation,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }, f)
+        final_path = os.path.join(self.root, generation)
+        os.rename(self.tmp_path, final_path)
+
+        pointer_tmp = os.path.join(self.root, f".{CURRENT_FILE}.{uuid.uuid4().hex}")
+        with open(pointer_tmp, "w") as f:
+            f.write(generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(self.root, CURRENT_FILE))
+
+        _prune_generations(self.root, keep)
+        return generation
+
+    def abort(self):
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+class EmbeddingStore:
+    """Reader handle that follows CURRENT and swaps generations without locking readers"""
+
+    def __init__(self, root: str = EMBEDDING_STORE_DIR, check_interval: float = 5.0):
+        self.root = root
+        self.check_interval = check_interval
+        self._snapshot: Optional[EmbeddingSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def attach(self) -> "EmbeddingStore":
+        """Map the live generation; raises FileNotFoundError if none was published"""
+        self.reload()
+        return self
+
+    def current_generation(self) -> str:
+        with open(os.path.join(self.root, CURRENT_FILE)) as f:
+            return f.read().strip()
+
+    def reload(self) -> bool:
+        """Re-map if CURRENT points at a new generation; returns True on swap"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            generation = self.current_generation()
+            if self._snapshot is not None and self._snapshot.generation == generation:
+                return False
+            # Attribute assignment is atomic: in-flight searches keep the old snapshot
+            self._snapshot = EmbeddingSnapshot(os.path.join(self.root, generation))
+            return True
+
+    @property
+    def snapshot(self) -> EmbeddingSnapshot:
+        if self._snapshot is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        return self._snapshot
+
+    def search(self, query: Sequence[float], k: int = 10, mode: str = "exact",
+               shortlist: int = 100) -> List[Tuple[str, float]]:
+        return self.snapshot.search(query, k, mode, shortlist)
+
+    def describe(self) -> dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"generation": None}
+        return {
+            "generation": snapshot.generation,
+            "count": len(snapshot),
+            "dim": snapshot.dim,
+            "model_version": snapshot.meta.get("model_version"),
+            "bytes": int(snapshot.vectors.nbytes),
+            "quantized_modes": snapshot.quantized_modes,
+        }
+
+
+def publish(root: str, ids: Sequence, vectors, keep: int = 2) -> str:
+    """Write a full generation from in-memory arrays and make it live"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    id_width = max([len(str(i)) for i in ids] + [1])
+    writer = GenerationWriter(root, len(ids), vectors.shape[1] if vectors.ndim == 2 else EMBEDDING_DIM,
+                              id_width=id_width)
+    try:
+        if len(ids):
+            writer.write(ids, vectors)
+        return writer.commit(keep=keep)
+    except Exception:
+        writer.abort()
+        raise
+
+
+def _generations(root: str) -> List[str]:
+    return sorted(
+        name for name in os.listdir(root)
+        if name.startswith(GENERATION_PREFIX) and os.path.isdir(os.path.join(root, name))
+    )
+
+
+def _next_generation(root: str) -> str:
+    existing = _generations(root)
+    number = int(existing[-1][len(GENERATION_PREFIX):]) + 1 if existing else 1
+    return f"{GENERATION_PREFIX}{number:06d}"
+
+
+def _prune_generations(root: str, keep: int):
+    # Workers still mapping an old generation keep their pages until they re-map
+    for name in _generations(root)[:-keep]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
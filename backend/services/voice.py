@@ -0,0 +1,177 @@
+"""
+Incremental transcription of streamed voice queries
+
+Audio arrives as PCM16 chunks. IncrementalTranscriber keeps only the audio
+after the last commit point and re-transcribes that tail every step_seconds
+to produce partial text. Once the tail reaches window_seconds it is cut at
+the quietest frame near its end and the text before the cut is committed, so
+each transcriber call sees at most one window and the final transcript needs
+only the last stretch of speech, not the whole recording.
+"""
+import os
+from functools import partial
+from typing import Callable, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+
+
+def pcm16_to_float(data: bytes) -> np.ndarray:
+    """Little-endian signed 16-bit PCM to float32 in [-1, 1]"""
+    usable = len(data) - len(data) % 2
+    return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def resample(audio: np.ndarray, from_rate: int, to_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Linear-interpolation resampling; enough for speech recognition input"""
+    if from_rate == to_rate or audio.size == 0:
+        return audio
+    count = int(round(audio.size * to_rate / from_rate))
+    positions = np.linspace(0, audio.size - 1, count)
+    return np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+
+
+def frame_energy(audio: np.ndarray, frame: int) -> np.ndarray:
+    """RMS energy of consecutive frames (a trailing partial frame is dropped)"""
+    frames = audio[:audio.size - audio.size % frame].reshape(-1, frame)
+    return np.sqrt(np.mean(frames ** 2, axis=1)) if frames.size else np.empty(0, dtype=np.float32)
+
+
+class Transcriber:
+    """Interface implemented by every speech-to-text backend"""
+
+    def transcribe(self, audio: np.ndarray, prompt: str = "") -> str:
+        """Text for 16 kHz mono float32 audio; prompt is the text committed so far"""
+        raise NotImplementedError
+
+
+class StubTranscriber(Transcriber):
+    """Deterministic transcriber for tests: every voiced run is one word picked by its amplitude
+
+    A run of (median) amplitude a between silences transcribes to
+    VOCABULARY[round(a * 100) % len(VOCABULARY)].
+    """
+
+    VOCABULARY = ("calm", "blue", "minimalist", "abstract", "warm", "vintage", "art", "for", "bedroom", "wall")
+
+    def __init__(self, silence: float = 0.01):
+        self.silence = silence
+
+    def transcribe(self, audio: np.ndarray, prompt: str = "") -> str:
+        frame = int(SAMPLE_RATE * FRAME_SECONDS)
+        voiced = frame_energy(audio, frame) > self.silence
+        words = []
+        start = None
+        for i, is_voiced in enumerate(list(voiced) + [False]):
+            if is_voiced and start is None:
+                start = i
+            elif not is_voiced and start is not None:
+                amplitude = float(np.median(np.abs(audio[start * frame:i * frame])))
+                words.append(self.VOCABULARY[int(round(amplitude * 100)) % len(self.VOCABULARY)])
+                start = None
+        return " ".join(words)
+
+
+class WhisperTranscriber(Transcriber):
+    """OpenAI Whisper; the model loads on first use, shared through the model registry by default"""
+
+    def __init__(self, load: Callable = None):
+        if load is None:
+            from services.model_registry import registry
+
+            load = partial(registry.get, "whisper")
+        self._load = load
+        self._model = None
+
+    def transcribe(self, audio: np.ndarray, prompt: str = "") -> str:
+        if self._model is None:
+            self._model = self._load()
+        result = self._model.transcribe(audio, initial_prompt=prompt or None, fp16=False,
+                                        language=os.getenv("WHISPER_LANGUAGE") or None)
+        return result["text"].strip()
+
+
+TRANSCRIBERS = {"stub": StubTranscriber, "whisper": WhisperTranscriber}
+
+
+def load_transcriber(name: str, **options) -> Transcriber:
+    if name not in TRANSCRIBERS:
+        raise ValueError(f"Unknown transcriber '{name}', expected one of {sorted(TRANSCRIBERS)}")
+    return TRANSCRIBERS[name](**options)
+
+
+class IncrementalTranscriber:
+    """Sliding-window transcription of one streamed utterance"""
+
+    def __init__(self, transcriber: Transcriber, sample_rate: int = SAMPLE_RATE, step_seconds: float = 1.0,
+                 window_seconds: float = 8.0, cut_search_seconds: float = 1.5):
+        self.transcriber = transcriber
+        self.sample_rate = sample_rate
+        self.step = int(step_seconds * SAMPLE_RATE)
+        self.window = int(window_seconds * SAMPLE_RATE)
+        self.cut_search = int(cut_search_seconds * SAMPLE_RATE)
+        self.committed: List[str] = []
+        self._tail = np.empty(0, dtype=np.float32)
+        self._pending_bytes = b""
+        self._since_partial = 0
+        self.audio_seconds = 0.0
+        self.transcribed_seconds = 0.0
+        self.transcribe_calls = 0
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.committed)
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """Add a PCM16 chunk; returns new partial text when a step has elapsed"""
+        data = self._pending_bytes + chunk
+        self._pending_bytes = data[len(data) - len(data) % 2:]
+        audio = resample(pcm16_to_float(data), self.sample_rate)
+        self.audio_seconds += audio.size / SAMPLE_RATE
+        self._tail = np.concatenate([self._tail, audio])
+        self._since_partial += audio.size
+
+        while self._tail.size >= self.window:
+            self._commit(self._cut_point())
+        if self._since_partial < self.step:
+            return None
+        self._since_partial = 0
+        return self._join(self._transcribe(self._tail)) if self._tail.size else self.text
+
+    def finish(self) -> str:
+        """Transcribe whatever is left and return the full transcript"""
+        if self._tail.size:
+            self._commit(self._tail.size)
+        return self.text
+
+    def _cut_point(self) -> int:
+        """Index of the quietest frame in the last cut_search samples of the window"""
+        frame = int(SAMPLE_RATE * FRAME_SECONDS)
+        start = max(self.window - self.cut_search, 0)
+        energy = frame_energy(self._tail[start:self.window], frame)
+        if energy.size == 0:
+            return self.window
+        return start + int(np.argmin(energy)) * frame + frame // 2
+
+    def _commit(self, cut: int):
+        text = self._transcribe(self._tail[:cut])
+        if text:
+            self.committed.append(text)
+        self._tail = self._tail[cut:]
+
+    def _transcribe(self, audio: np.ndarray) -> str:
+        self.transcribe_calls += 1
+        self.transcribed_seconds += audio.size / SAMPLE_RATE
+        return self.transcriber.transcribe(audio, prompt=self.text).strip()
+
+    def _join(self, hypothesis: str) -> str:
+        return " ".join(part for part in (self.text, hypothesis) if part)
+
+    def stats(self) -> dict:
+        return {
+            "audio_seconds": round(self.audio_seconds, 3),
+            "transcribed_seconds": round(self.transcribed_seconds, 3),
+            "transcribe_calls": self.transcribe_calls,
+        }
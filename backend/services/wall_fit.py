@@ -0,0 +1,58 @@
+"""
+Wall-fit artwork search
+
+Artwork sizes live in the typed width_cm/height_cm columns (kept in sync with
+the dimensions JSON by the Artwork model), so "fits this wall at 50-75% width
+coverage" is an indexed range scan instead of a JSON parse per row.
+"""
+from typing import Optional, Tuple
+
+from sqlalchemy import func
+
+from models.artwork import Artwork, to_cm
+
+
+def wall_size_from_detection(wall_detection, default_unit: str = "cm") -> Tuple[Optional[float], Optional[float]]:
+    """(width_cm, height_cm) of the largest wall in RoomUpload.wall_detection_json
+
+    Accepts {"walls": [{"width", "height", "unit"}, ...]} or a single
+    {"width", "height", "unit"} object.
+    """
+    if not isinstance(wall_detection, dict):
+        return None, None
+    walls = wall_detection.get("walls")
+    if not isinstance(walls, list):
+        walls = [wall_detection]
+
+    best = (None, None)
+    best_area = -1.0
+    for wall in walls:
+        if not isinstance(wall, dict):
+            continue
+        unit = wall.get("unit") or wall_detection.get("unit") or default_unit
+        width = to_cm(wall.get("width"), unit)
+        height = to_cm(wall.get("height"), unit)
+        if width is None:
+            continue
+        area = width * (height or 0.0)
+        if area > best_area:
+            best, best_area = (width, height), area
+    return best
+
+
+def fit_width_range(wall_width_cm: float, min_coverage: float, max_coverage: float) -> Tuple[float, float]:
+    """Artwork width bounds covering the given fraction of the wall width"""
+    if not 0 < min_coverage <= max_coverage:
+        raise ValueError("Coverage must satisfy 0 < min_coverage <= max_coverage")
+    return wall_width_cm * min_coverage, wall_width_cm * max_coverage
+
+
+def filter_fitting(query, wall_width_cm: float, wall_height_cm: Optional[float] = None,
+                   min_coverage: float = 0.5, max_coverage: float = 0.75):
+    """Restrict an Artwork query to pieces that fit the wall, best proportioned first"""
+    low, high = fit_width_range(wall_width_cm, min_coverage, max_coverage)
+    query = query.filter(Artwork.width_cm >= low, Artwork.width_cm <= high)
+    if wall_height_cm:
+        query = query.filter(Artwork.height_cm <= wall_height_cm)
+    target = wall_width_cm * (min_coverage + max_coverage) / 2
+    return query.order_by(func.abs(Artwork.width_cm - target), Artwork.id)
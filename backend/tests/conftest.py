@@ -0,0 +1,9 @@
+from tests import query_budget
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Queries and rows used per endpoint by assert_query_budget"""
+    if query_budget.MEASUREMENTS:
+        terminalreporter.section("query budgets")
+        for line in query_budget.summary_lines():
+            terminalreporter.write_line(line)
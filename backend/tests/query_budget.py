@@ -0,0 +1,135 @@
+"""
+SQL query budgets for endpoint tests
+
+QueryRecorder listens to SQLAlchemy engine events and records every
+statement executed while it is active, with the rows it returned and its
+duration. assert_query_budget sends one request through a test client and
+fails with a numbered list of the statements when the endpoint runs more
+queries or fetches more rows than its budget, marking repeated statements
+(the usual N+1 signature).
+
+Rows come from cursor.rowcount, which psycopg2 sets for SELECTs; drivers or
+server-side cursors that report -1 are left out of the row total.
+"""
+import re
+import time
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event
+
+SQL_PREVIEW_CHARS = 160
+
+# Every measured request, for the end-of-run report (see conftest.py)
+MEASUREMENTS = []
+
+
+class Statement:
+    __slots__ = ("sql", "rows", "seconds", "executemany")
+
+    def __init__(self, sql: str, rows: Optional[int], seconds: float, executemany: bool):
+        self.sql = sql
+        self.rows = rows
+        self.seconds = seconds
+        self.executemany = executemany
+
+    @property
+    def shape(self) -> str:
+        """The statement with literals and whitespace collapsed, to spot repeats"""
+        shape = re.sub(r"'[^']*'|\b\d+\b", "?", self.sql)
+        return re.sub(r"\s+", " ", shape).strip()
+
+
+class QueryRecorder:
+    """Context manager recording statements executed on the given engines"""
+
+    def __init__(self, engines: Iterable = None):
+        if engines is None:
+            from models.database import engine, router
+
+            engines = [engine] + list(router.replicas)
+        self.engines = list(engines)
+        self.statements: List[Statement] = []
+
+    # Start times live on the per-statement execution context, so a statement
+    # that raises leaves nothing behind on the pooled connection
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_budget_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = context._query_budget_started
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        self.statements.append(Statement(statement, rows, time.perf_counter() - started, executemany))
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+        return self
+
+    def __exit__(self, *exc_info):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+
+    @property
+    def queries(self) -> int:
+        return len(self.statements)
+
+    @property
+    def rows(self) -> int:
+        return sum(statement.rows or 0 for statement in self.statements)
+
+    def report(self) -> str:
+        repeated = {shape for shape, count in Counter(s.shape for s in self.statements).items() if count > 1}
+        lines = []
+        for i, statement in enumerate(self.statements, 1):
+            sql = re.sub(r"\s+", " ", statement.sql).strip()
+            if len(sql) > SQL_PREVIEW_CHARS:
+                sql = sql[:SQL_PREVIEW_CHARS] + "…"
+            marker = " [repeated]" if statement.shape in repeated else ""
+            rows = "?" if statement.rows is None else statement.rows
+            lines.append(f"  {i}. ({rows} rows, {statement.seconds * 1000:.1f}ms){marker} {sql}")
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def check_budget(label: str, recorder: QueryRecorder, queries: int, rows: int = None):
+    """Raise QueryBudgetExceeded listing the statements if the recording is over budget"""
+    problems = []
+    if recorder.queries > queries:
+        problems.append(f"{recorder.queries} queries > budget {queries}")
+    if rows is not None and recorder.rows > rows:
+        problems.append(f"{recorder.rows} rows > budget {rows}")
+    if problems:
+        raise QueryBudgetExceeded(f"{label}: {'; '.join(problems)}\n{recorder.report()}")
+
+
+def assert_query_budget(client, method: str, url: str, queries: int, rows: int = None,
+                        engines: Iterable = None, expected_status: int = 200, warm_up: bool = True,
+                        **request_options):
+    """Send one request and fail if it exceeds its query/row budget; returns the response
+
+    With warm_up the request is sent once unmeasured first, so connection
+    setup and per-process caches do not count against the budget.
+    """
+    label = f"{method} {url}"
+    if warm_up:
+        client.request(method, url, **request_options)
+    with QueryRecorder(engines) as recorder:
+        response = client.request(method, url, **request_options)
+    assert response.status_code == expected_status, f"{label} returned {response.status_code}"
+    MEASUREMENTS.append((label, recorder.queries, queries, recorder.rows, rows))
+    check_budget(label, recorder, queries, rows)
+    return response
+
+
+def summary_lines() -> List[str]:
+    lines = [f"{'endpoint':<50} {'queries':>12} {'rows':>14}"]
+    for label, used, budget, rows, row_budget in MEASUREMENTS:
+        row_text = f"{rows}/{row_budget}" if row_budget is not None else str(rows)
+        lines.append(f"{label:<50} {f'{used}/{budget}':>12} {row_text:>14}")
+    return lines
@@ -0,0 +1,144 @@
+"""
+Test admission control and load shedding
+"""
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from services.admission import AdmissionController, AdmissionControlMiddleware, RouteLimit
+
+
+def test_route_limit_queues_then_sheds():
+    """Requests beyond the slots wait in the queue, beyond the queue they are shed"""
+    async def scenario():
+        limit = RouteLimit(max_concurrent=1, max_queue=1, queue_timeout=1.0)
+        assert await limit.acquire()
+        waiter = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        assert limit.queue_depth == 1
+        assert not await limit.acquire()  # queue full
+        limit.release()
+        assert await waiter
+        assert limit.in_flight == 1
+        limit.release()
+        assert limit.in_flight == 0
+        return limit.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 2 and stats["queued"] == 1 and stats["shed"] == 1
+    print("✅ Route queueing and shedding working")
+
+
+def test_route_limit_times_out_waiters():
+    """A waiter that outlives queue_timeout is shed and does not leak a slot"""
+    async def scenario():
+        limit = RouteLimit(max_concurrent=1, max_queue=4, queue_timeout=0.01)
+        assert await limit.acquire()
+        assert not await limit.acquire()
+        limit.release()
+        assert limit.in_flight == 0 and limit.queue_depth == 0
+        return limit.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["timed_out"] == 1 and stats["shed"] == 1
+    print("✅ Queue timeout working")
+
+
+def test_route_limit_cancelled_waiters_do_not_leak_slots():
+    """A waiter cancelled before or after being handed a slot gives it back"""
+    async def scenario():
+        limit = RouteLimit(max_concurrent=1, max_queue=4, queue_timeout=1.0)
+        assert await limit.acquire()
+
+        # Cancelled while still queued: release() skips it and frees the slot
+        queued = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert limit.queue_depth == 0
+
+        # Cancelled, then handed the slot by release() before it gets to run
+        handed = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        handed.cancel()
+        limit.release()
+        await asyncio.gather(handed, return_exceptions=True)
+        assert handed.cancelled()
+        assert limit.in_flight == 0 and limit.queue_depth == 0
+
+        assert await limit.acquire()
+        limit.release()
+        return limit.in_flight
+
+    assert asyncio.run(scenario()) == 0
+    print("✅ Cancelled waiters release their slots")
+
+
+def test_expired_waiters_free_their_queue_places():
+    """Waiters that timed out no longer count as queued, so new requests queue instead of shedding"""
+    async def scenario():
+        limit = RouteLimit(max_concurrent=1, max_queue=2, queue_timeout=0.01)
+        assert await limit.acquire()
+        assert not any(await asyncio.gather(limit.acquire(), limit.acquire()))
+
+        limit.queue_timeout = 1.0
+        waiter = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        assert limit.queue_depth == 1
+        limit.release()
+        assert await waiter
+        limit.release()
+        return limit.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["timed_out"] == 2 and stats["shed"] == 2 and stats["queued"] == 3
+    assert stats["in_flight"] == 0
+    print("✅ Expired waiters leave the queue")
+
+
+def test_middleware_returns_503_and_lets_cheap_routes_through():
+    """Overloaded routes shed with Retry-After while unlimited routes keep serving"""
+    app = FastAPI()
+    gate = asyncio.Event()
+
+    @app.post("/slow")
+    async def slow():
+        await gate.wait()
+        return {"ok": True}
+
+    @app.get("/cheap")
+    async def cheap():
+        return {"ok": True}
+
+    limit = RouteLimit(max_concurrent=1, max_queue=1, queue_timeout=5.0, retry_after=7)
+    app.add_middleware(AdmissionControlMiddleware, controller=AdmissionController({("POST", "/slow"): limit}))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            running = [asyncio.ensure_future(client.post("/slow")) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            shed = await client.post("/slow")
+            cheap = await client.get("/cheap")
+            gate.set()
+            done = await asyncio.gather(*running)
+        return shed, cheap, done
+
+    shed, cheap, done = asyncio.run(scenario())
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "7"
+    assert cheap.status_code == 200
+    assert [response.status_code for response in done] == [200, 200]
+    assert limit.stats()["in_flight"] == 0
+    print("✅ Admission middleware working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing admission control...")
+    test_route_limit_queues_then_sheds()
+    test_route_limit_times_out_waiters()
+    test_route_limit_cancelled_waiters_do_not_leak_slots()
+    test_expired_waiters_free_their_queue_places()
+    test_middleware_returns_503_and_lets_cheap_routes_through()
+    print("🎉 All admission tests passed!")
@@ -51,6 +51,15 @@ def test_artworks_with_filters():
     data = response.json()
     print("✅ Artworks style filter working")
 
+def test_artworks_fit_requires_wall():
+    """Test the wall-fit endpoint rejects requests without a wall size"""
+    response = client.get("/artworks/fit")
+    assert response.status_code == 400
+    
+    response = client.get("/artworks/fit?wall_width=4&unit=m&min_coverage=0.9&max_coverage=0.5")
+    assert response.status_code == 400
+    print("✅ Artworks fit validation working")
+
 def test_styles_endpoint():
     """Test the styles endpoint"""
     response = client.get("/styles")
@@ -117,6 +126,7 @@ if __name__ == "__main__":
     test_health_endpoint()
     test_artworks_endpoint()
     test_artworks_with_filters()
+    test_artworks_fit_requires_wall()
     test_styles_endpoint()
     test_trends_endpoint()
     test_room_analyze_endpoint()
@@ -0,0 +1,201 @@
+"""
+Test the embedding backfill checkpoint and paging
+"""
+import json
+import os
+import tempfile
+import uuid
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+import scripts.backfill_embeddings as backfill
+from scripts.backfill_embeddings import Checkpoint, pending_artworks
+from services.encoders import StubEncoder
+
+
+class PickyEncoder(StubEncoder):
+    """Rejects images that do not start with a fake magic number"""
+
+    def decode_image(self, data: bytes):
+        if not data.startswith(b"IMG"):
+            raise ValueError("Undecodable image")
+        return data
+
+
+class RecordingSession:
+    """Stands in for a Session: builds real queries and records their SQL instead of running them"""
+
+    def __init__(self):
+        self.statements = []
+
+    def query(self, *entities):
+        session = self
+
+        class RecordingQuery(Query):
+            def all(self):
+                compiled = self.statement.compile(dialect=postgresql.dialect(),
+                                                  compile_kwargs={"literal_binds": True})
+                session.statements.append(str(compiled))
+                return []
+
+        return RecordingQuery(entities)
+
+
+class FakeArtworks:
+    """In-memory pending artworks paged by id, recording every write"""
+
+    def __init__(self, count: int, image_root: str):
+        self.ids = sorted(uuid.uuid4() for _ in range(count))
+        self.image_root = image_root
+        self.pages = []
+        self.written = []
+        self.fail_after = None
+        for artwork_id in self.ids:
+            with open(os.path.join(image_root, f"{artwork_id}.jpg"), "wb") as f:
+                f.write(artwork_id.bytes)
+
+    def pending(self, db, model_version, after_id, limit):
+        self.pages.append(after_id)
+        done = {artwork_id for batch in self.written for artwork_id in batch}
+        rows = [
+            Row(artwork_id, f"/{artwork_id}.jpg") for artwork_id in self.ids
+            if (after_id is None or artwork_id > uuid.UUID(str(after_id))) and str(artwork_id) not in done
+        ]
+        return rows[:limit]
+
+    def write(self, db, model_version, ids, vectors):
+        if self.fail_after is not None and len(self.written) >= self.fail_after:
+            raise RuntimeError("database went away")
+        assert len(ids) == len(vectors)
+        self.written.append(list(ids))
+
+
+class Row:
+    def __init__(self, artwork_id, image_url):
+        self.id = artwork_id
+        self.image_url = image_url
+
+
+class ClosingSession:
+    def close(self):
+        pass
+
+
+def install(monkeypatch, artworks: FakeArtworks):
+    monkeypatch.setattr(backfill, "SessionLocal", ClosingSession)
+    monkeypatch.setattr(backfill, "pending_artworks", artworks.pending)
+    monkeypatch.setattr(backfill, "write_embeddings", artworks.write)
+
+
+def test_checkpoint_round_trip():
+    """Saved progress loads back for the same model version only"""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "checkpoint.json")
+        checkpoint = Checkpoint(path, "stub-v1")
+        checkpoint.watermark, checkpoint.encoded, checkpoint.missing = "abc", 12, 3
+        checkpoint.save()
+
+        loaded = Checkpoint.load(path, "stub-v1")
+        assert (loaded.watermark, loaded.encoded, loaded.missing) == ("abc", 12, 3)
+        assert Checkpoint.load(path, "clip-v2").watermark is None
+        assert Checkpoint.load(path, "stub-v1", restart=True).watermark is None
+
+        loaded.clear()
+        assert loaded.watermark is None and not os.path.exists(path)
+        assert Checkpoint.load(path, "stub-v1").watermark is None
+    print("✅ Checkpoint save/load working")
+
+
+def test_pending_artworks_query():
+    """Pages skip already-embedded artworks and continue after the watermark in id order"""
+    db = RecordingSession()
+    watermark = uuid.uuid4()
+    pending_artworks(db, "stub-v1", None, 64)
+    pending_artworks(db, "stub-v1", str(watermark), 64)
+    first, after = db.statements
+
+    for sql in (first, after):
+        assert "NOT (EXISTS" in sql and "'stub-v1'" in sql
+        assert "ORDER BY artwork.id" in sql and "LIMIT 64" in sql
+    assert "artwork.id >" not in first
+    assert f"artwork.id > '{watermark}'" in after
+    print("✅ Pending artwork paging working")
+
+
+def test_complete_run_clears_checkpoint(monkeypatch):
+    """A finished run removes its checkpoint, so the next run starts from the lowest id"""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "checkpoint.json")
+        artworks = FakeArtworks(10, root)
+        install(monkeypatch, artworks)
+
+        checkpoint = backfill.backfill_embeddings("stub", root, batch_size=3, workers=1, checkpoint_path=path)
+        assert checkpoint.encoded == 10 and checkpoint.watermark is None
+        assert not os.path.exists(path)
+        assert sorted(i for batch in artworks.written for i in batch) == sorted(map(str, artworks.ids))
+
+        # An artwork whose random id sorts first is still found by the next run
+        artworks.ids.insert(0, uuid.UUID(int=0))
+        with open(os.path.join(root, f"{artworks.ids[0]}.jpg"), "wb") as f:
+            f.write(b"new")
+        artworks.pages.clear()
+        checkpoint = backfill.backfill_embeddings("stub", root, batch_size=3, workers=1, checkpoint_path=path)
+        assert artworks.pages[0] is None
+        assert checkpoint.encoded == 1 and artworks.written[-1] == [str(uuid.UUID(int=0))]
+    print("✅ Completed runs clear their checkpoint")
+
+
+def test_interrupted_run_resumes_after_watermark(monkeypatch):
+    """A run that dies keeps its watermark and the next run continues after it"""
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "checkpoint.json")
+        artworks = FakeArtworks(9, root)
+        install(monkeypatch, artworks)
+        artworks.fail_after = 1
+
+        try:
+            backfill.backfill_embeddings("stub", root, batch_size=3, workers=1, checkpoint_path=path)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("the failing write should stop the run")
+        with open(path) as f:
+            saved = json.load(f)
+        assert saved["watermark"] == str(artworks.ids[2]) and saved["encoded"] == 3
+
+        artworks.fail_after = None
+        artworks.pages.clear()
+        checkpoint = backfill.backfill_embeddings("stub", root, batch_size=3, workers=1, checkpoint_path=path)
+        assert artworks.pages[0] == str(artworks.ids[2])
+        assert checkpoint.encoded == 9 and not os.path.exists(path)
+        assert [i for batch in artworks.written for i in batch] == [str(i) for i in artworks.ids]
+    print("✅ Interrupted runs resume after the watermark")
+
+
+def test_undecodable_images_count_as_missing():
+    """A bad image is reported as missing instead of failing its whole batch"""
+    with tempfile.TemporaryDirectory() as root:
+        items = []
+        for name, data in (("good", b"IMG good"), ("corrupt", b"not an image"), ("also-good", b"IMG fine")):
+            path = os.path.join(root, f"{name}.jpg")
+            with open(path, "wb") as f:
+                f.write(data)
+            items.append((name, path))
+        items.append(("absent", os.path.join(root, "absent.jpg")))
+
+        backfill._init_worker("tests.test_backfill:PickyEncoder")
+        ids, vectors, missing = backfill.encode_batch(items)
+    assert ids == ["good", "also-good"]
+    assert missing == ["corrupt", "absent"]
+    assert vectors.shape == (2, backfill._encoder.dim)
+    assert (vectors == StubEncoder().encode_images([b"IMG good", b"IMG fine"])).all()
+    print("✅ Undecodable images count as missing")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing embedding backfill...")
+    test_checkpoint_round_trip()
+    test_pending_artworks_query()
+    test_undecodable_images_count_as_missing()
+    print("🎉 All backfill tests passed!")
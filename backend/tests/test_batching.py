@@ -0,0 +1,104 @@
+"""
+Test dynamic micro-batching of encoder calls
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services.batching import BatchedEncoder, Histogram, MicroBatcher
+from services.encoders import StubEncoder
+
+
+def test_histogram_buckets():
+    """Values land in the first bucket whose edge covers them"""
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 9):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"<=1": 2, "<=5": 1, ">5": 1}
+    assert snapshot["count"] == 4 and snapshot["mean"] == 3.375
+    print("✅ Histogram working")
+
+
+def test_concurrent_submissions_share_batches():
+    """Concurrent callers are served by fewer, larger batches with correct rows"""
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        time.sleep(0.01)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=16, max_wait_ms=20)
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        results = list(pool.map(lambda i: batcher.submit(i).result(), range(64)))
+    batcher.stop()
+    assert results == [i * 2 for i in range(64)]
+    assert max(sizes) > 1 and max(sizes) <= 16
+    assert sum(sizes) == 64
+    stats = batcher.stats()
+    assert stats["batch_size"]["count"] == len(sizes)
+    assert stats["queue_wait_ms"]["count"] == 64
+    print("✅ Micro-batching working")
+
+
+def test_lone_request_flushes_after_max_wait():
+    """A single request is not held longer than max_wait_ms"""
+    batcher = MicroBatcher(lambda items: items, max_batch_size=32, max_wait_ms=5)
+    started = time.monotonic()
+    assert batcher.submit("a").result(timeout=1) == "a"
+    assert time.monotonic() - started < 0.5
+    batcher.stop()
+    print("✅ Max wait flush working")
+
+
+def test_batch_errors_reach_every_caller():
+    """A failing forward pass fails every future in the batch, and the worker survives"""
+    calls = []
+
+    def batch_fn(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise RuntimeError("CUDA out of memory")
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=20)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=1)
+    assert batcher.submit("ok").result(timeout=1) == "ok"
+    assert batcher.stats()["failed_batches"] == 1
+    batcher.stop()
+    print("✅ Batch error handling working")
+
+
+def test_async_and_batched_encoder():
+    """Async submissions and the Encoder wrapper return the unbatched embeddings"""
+    stub = StubEncoder(dim=16)
+    encoder = BatchedEncoder(stub, max_batch_size=8, max_wait_ms=10)
+
+    async def scenario():
+        return await asyncio.gather(*[encoder.texts.run(f"query {i}") for i in range(5)])
+
+    rows = asyncio.run(scenario())
+    expected = stub.encode_texts([f"query {i}" for i in range(5)])
+    assert np.allclose(np.stack(rows), expected)
+    assert np.allclose(encoder.encode_texts(["query 1", "query 2"]), expected[1:3])
+    assert encoder.encode_texts([]).shape == (0, 16)
+    assert encoder.model_version == stub.model_version
+    encoder.stop()
+    print("✅ Batched encoder working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing micro-batching...")
+    test_histogram_buckets()
+    test_concurrent_submissions_share_batches()
+    test_lone_request_flushes_after_max_wait()
+    test_batch_errors_reach_every_caller()
+    test_async_and_batched_encoder()
+    print("🎉 All micro-batching tests passed!")
@@ -0,0 +1,111 @@
+"""
+Test colour harmony recommendations
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from services.color_harmony import (
+    NEUTRAL_SCORE,
+    HarmonyCache,
+    HarmonyIndex,
+    harmony_colors,
+    quantize_palette,
+)
+
+CATALOG = [
+    ("red", {"colors": ["#E53935", "#FFFFFF"]}),
+    ("cyan", {"colors": ["#00ACC1", "#F5F5F5"]}),  # complementary to red
+    ("green", {"colors": ["#43A047"]}),  # triadic with red
+    ("orange", {"colors": ["#FB8C00"]}),  # analogous to red
+    ("grey", {"colors": ["#FFFFFF", "#9E9E9E", "#212121"]}),
+    ("broken", {"colors": ["not-a-colour"]}),
+]
+
+
+def ranked(index, colors, **options):
+    return [(artwork_id, scheme) for artwork_id, _, scheme in index.recommend(colors, **options)["matches"]]
+
+
+def test_palette_parsing():
+    """Palettes come as colour lists, named entries or bare lists; junk is dropped"""
+    assert harmony_colors({"colors": ["#fff", "nope", "#123456"]}) == ["#fff", "#123456"]
+    assert harmony_colors({"primary": "#FF0000", "accent": "#00FF00", "mood": "calm"}) == ["#FF0000", "#00FF00"]
+    assert harmony_colors(["#000000"]) == ["#000000"]
+    assert harmony_colors(None) == [] and harmony_colors({"colors": "red"}) == []
+    print("✅ Palette parsing working")
+
+
+def test_harmonies_rank_above_matches():
+    """A red room prefers complementary, triadic and analogous pieces over another red one"""
+    index = HarmonyIndex(CATALOG)
+    order = ranked(index, ["#D32F2F"], k=10)
+    assert set(order[:3]) == {("cyan", "complementary"), ("green", "triadic"), ("orange", "analogous")}
+    ids = [artwork_id for artwork_id, _ in order]
+    assert ids.index("red") > ids.index("grey")  # a plain match scores below even a neutral piece
+    assert ("grey", "neutral") in order and ("broken", "neutral") in order
+
+    only_analogous = ranked(index, ["#D32F2F"], k=1, schemes=["analogous"])
+    assert only_analogous == [("orange", "analogous")]
+    print("✅ Harmony ranking working")
+
+
+def test_neutral_room_and_bad_input():
+    """All-neutral rooms score everything the same; bad palettes and schemes raise"""
+    index = HarmonyIndex(CATALOG)
+    scores = {score for _, score, _ in index.recommend(["#FAFAFA", "#202020"])["matches"]}
+    assert scores == {NEUTRAL_SCORE}
+    with pytest.raises(ValueError):
+        index.recommend(["nope"])
+    with pytest.raises(ValueError):
+        index.recommend(["#FF0000"], schemes=["clashing"])
+    print("✅ Neutral and invalid palettes working")
+
+
+def test_rankings_cached_per_quantized_palette():
+    """Near-identical palettes, in any order, share one cached ranking"""
+    index = HarmonyIndex(CATALOG)
+    assert quantize_palette(["#D32F2F", "#00ACC1"]) == quantize_palette(["#00ADC2", "#D4302E"])
+    first = index.recommend(["#D32F2F", "#00ACC1"], k=3)
+    second = index.recommend(["#00ADC2", "#D4302E"], k=2)
+    assert second["matches"] == first["matches"][:2]
+    assert second["palette"] == first["palette"]
+    assert index.stats() == {"artworks": len(CATALOG), "cached_palettes": 1, "hits": 1, "misses": 1}
+    print("✅ Quantized palette cache working")
+
+
+def test_harmony_cache_rebuilds_after_ttl():
+    """The catalog is loaded once per ttl and a rebuild starts with an empty ranking cache"""
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return CATALOG
+
+    cache = HarmonyCache(loader, ttl=60)
+    assert cache.get() is cache.get()
+    assert len(loads) == 1
+    cache.ttl = 0
+    assert len(cache.get()) == len(CATALOG) and len(loads) == 2
+    print("✅ Harmony cache working")
+
+
+def test_harmony_endpoint_validates_palette(monkeypatch):
+    """Palettes without a valid colour are rejected with 400"""
+    import main
+
+    index = HarmonyIndex(CATALOG)
+    monkeypatch.setattr(main.harmony_cache, "get", lambda db: index)
+    client = TestClient(main.app)
+    assert client.get("/artworks/harmony", params={"colors": "zzz"}).status_code == 400
+    assert client.get("/artworks/harmony", params={"colors": "#FF0000", "schemes": "clash"}).status_code == 400
+    print("✅ Harmony endpoint validation working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing colour harmony...")
+    test_palette_parsing()
+    test_harmonies_rank_above_matches()
+    test_neutral_room_and_bad_input()
+    test_rankings_cached_per_quantized_palette()
+    test_harmony_cache_rebuilds_after_ttl()
+    print("🎉 All colour harmony tests passed!")
@@ -0,0 +1,117 @@
+"""
+Test negotiated response compression
+"""
+import asyncio
+import gzip
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from services.compression import (
+    CompressionMiddleware,
+    CompressionStats,
+    choose_encoding,
+    compress,
+    parse_accept_encoding,
+)
+
+BIG = {"artworks": [{"id": i, "title": f"Artwork {i}", "price": 100.0} for i in range(200)]}
+
+
+def make_app(stats):
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return BIG
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("x" * 4096, headers={"Vary": "Origin"})
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            for i in range(3):
+                yield f"data: {'y' * 2048}\n\n".encode()
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=512, stats=stats)
+    return app
+
+
+def fetch(app, path, accept_encoding):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+    return asyncio.run(scenario())
+
+
+def test_negotiation():
+    """br is preferred when available, q=0 refuses a coding, identity-only gets nothing"""
+    assert parse_accept_encoding("gzip;q=0.5, br") == {"gzip": 0.5, "br": 1.0}
+    assert choose_encoding("gzip, deflate, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert choose_encoding("br;q=0.1, gzip", brotli_available=True) == "gzip"
+    assert choose_encoding("gzip;q=0", brotli_available=False) is None
+    assert choose_encoding("*", brotli_available=False) == "gzip"
+    assert choose_encoding("identity", brotli_available=True) is None
+    assert choose_encoding("", brotli_available=True) is None
+    print("✅ Accept-Encoding negotiation working")
+
+
+def test_large_json_is_gzipped():
+    """Large buffered responses are compressed with a corrected Content-Length and Vary"""
+    stats = CompressionStats()
+    app = make_app(stats)
+    response = fetch(app, "/big", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == BIG  # httpx decodes the gzip body
+
+    raw = fetch(app, "/text", "gzip")
+    assert raw.headers["vary"] == "Origin, Accept-Encoding"
+    assert int(raw.headers["content-length"]) < 4096
+
+    snapshot = stats.snapshot()
+    assert snapshot["compressed_responses"]["gzip"] == 2
+    assert snapshot["bytes_out"] < snapshot["bytes_in"]
+    print("✅ Gzip compression working")
+
+
+def test_small_streaming_and_unaccepted_pass_through():
+    """Small bodies, streams and clients without gzip get the response untouched"""
+    stats = CompressionStats()
+    app = make_app(stats)
+    assert "content-encoding" not in fetch(app, "/small", "gzip").headers
+    assert "content-encoding" not in fetch(app, "/big", "identity").headers
+
+    stream = fetch(app, "/stream", "gzip")
+    assert "content-encoding" not in stream.headers
+    assert stream.text.count("data: ") == 3
+    assert stats.snapshot()["compressed_responses"]["gzip"] == 0
+    print("✅ Compression passthrough working")
+
+
+def test_gzip_output_is_deterministic():
+    """mtime is pinned so identical bodies compress to identical bytes (ETag friendly)"""
+    body = b'{"a":1}' * 200
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip")) == body
+    print("✅ Deterministic gzip working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing response compression...")
+    test_negotiation()
+    test_large_json_is_gzipped()
+    test_small_streaming_and_unaccepted_pass_through()
+    test_gzip_output_is_deterministic()
+    print("🎉 All compression tests passed!")
@@ -0,0 +1,113 @@
+"""
+Test near-duplicate artwork detection
+"""
+import numpy as np
+
+from services.dedup import (
+    RandomHyperplaneLSH,
+    collapse_ranked,
+    find_duplicate_clusters,
+    palette_similarity,
+)
+from services.vector_store import normalize_rows
+
+WARM = {"colors": ["#8B4513", "#D2691E", "#CD853F"]}
+WARM_SHIFTED = {"colors": ["#8A4614", "#D3681F", "#CC863E"]}
+GREEN = {"colors": ["#228B22", "#32CD32", "#90EE90"]}
+
+
+def catalog(count=300, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.normal(size=(count, dim)))
+
+
+def test_palette_similarity():
+    """Near-identical palettes score high, unrelated ones low"""
+    assert palette_similarity(WARM, WARM) == 1.0
+    assert palette_similarity(WARM, WARM_SHIFTED) > 0.98
+    assert palette_similarity(WARM, GREEN) < 0.8
+    assert palette_similarity(WARM, {}) == 0.0
+    # Named entries, short hex and junk parse the same way as in colour harmony
+    assert palette_similarity({"primary": "#FF0000", "mood": "calm"}, ["#f00", "nope"]) == 1.0
+    print("✅ Palette similarity working")
+
+
+def test_lsh_signatures_stable():
+    """Identical vectors land in identical buckets"""
+    vectors = catalog(10)
+    lsh = RandomHyperplaneLSH(64, bands=4, bits_per_band=12)
+    keys = lsh.signatures(np.vstack([vectors, vectors[:3]]))
+    assert keys.shape == (13, 4)
+    assert (keys[:3] == keys[10:]).all()
+    print("✅ LSH signatures working")
+
+
+def test_duplicate_clusters():
+    """Copies with matching palettes cluster; look-alikes with other palettes do not"""
+    rng = np.random.default_rng(1)
+    vectors = catalog()
+    ids = [f"art-{i}" for i in range(len(vectors))]
+    palettes = [GREEN] * len(vectors)
+
+    # art-300/301 re-list art-5 from other brands, art-302 matches art-9 but with a different palette
+    copies = normalize_rows(vectors[[5, 5, 9]] + 0.01 * rng.normal(size=(3, 64)))
+    vectors = np.vstack([vectors, copies])
+    ids += ["art-300", "art-301", "art-302"]
+    palettes += [GREEN, GREEN, WARM]
+    rank = list(range(len(ids)))
+    rank[301] = -1  # oldest listing
+
+    canonical = find_duplicate_clusters(ids, vectors, palettes, cosine_threshold=0.95,
+                                        palette_threshold=0.9, rank=rank)
+    assert canonical == {"art-5": "art-301", "art-300": "art-301", "art-301": "art-301"}
+    print("✅ Duplicate clustering working")
+
+
+def test_clusters_over_store_positions(tmp_path):
+    """Scanning a memmap through positions matches scanning the copied rows"""
+    vectors = catalog(200)
+    vectors[150] = vectors[40]
+    path = str(tmp_path / "vectors.npy")
+    np.save(path, vectors)
+    mapped = np.load(path, mmap_mode="r")
+
+    positions = np.arange(0, 200, 2)  # artworks missing from the catalog are skipped
+    ids = [f"art-{i}" for i in positions]
+    palettes = [GREEN] * len(ids)
+    lsh = RandomHyperplaneLSH(64)
+    assert (lsh.signatures(mapped, chunk_rows=16, positions=positions) == lsh.signatures(vectors[positions])).all()
+
+    expected = find_duplicate_clusters(ids, vectors[positions], palettes)
+    assert expected == {"art-40": "art-40", "art-150": "art-40"}
+    assert find_duplicate_clusters(ids, mapped, palettes, positions=positions) == expected
+    print("✅ Clustering over store positions working")
+
+
+def test_collapse_ranked():
+    """Only the best-ranked member of each cluster survives"""
+    canonical = {"b": "a", "a": "a", "d": "d", "e": "d"}
+    assert collapse_ranked(["b", "c", "a", "e", "d"], canonical) == ["b", "c", "e"]
+    print("✅ Ranked collapse working")
+
+
+def test_canonical_changes_skip_unchanged_rows():
+    """Only artworks whose canonical id differs from the stored one are written"""
+    from scripts.dedup_artworks import canonical_changes
+
+    current = {"a": "x", "b": "x", "c": "y"}
+    canonical = {"a": "x", "b": "z", "d": "x"}
+    changed, cleared = canonical_changes(current, canonical)
+    assert changed == {"b": "z", "d": "x"}
+    assert cleared == ["c"]
+    assert canonical_changes(canonical, canonical) == ({}, [])
+    print("✅ Canonical id diff working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing dedup...")
+    test_palette_similarity()
+    test_lsh_signatures_stable()
+    test_duplicate_clusters()
+    test_collapse_ranked()
+    test_canonical_changes_skip_unchanged_rows()
+    print("🎉 All dedup tests passed!")
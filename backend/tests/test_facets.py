@@ -0,0 +1,102 @@
+"""
+Test bitmap facet counts
+"""
+from services.facets import FacetCache, FacetIndex, bitmap_from_positions, price_buckets
+
+ROWS = [
+    # id, style_tags, brand, price, is_canonical
+    ("1", ["minimalist", "modern"], "Clean Lines", 40.0, True),
+    ("2", ["minimalist"], "Clean Lines", 120.0, True),
+    ("3", ["abstract", "modern"], "Modern Art Co.", 250.0, True),
+    ("4", ["abstract"], "Modern Art Co.", 620.0, True),
+    ("5", ["abstract"], "Abstract Expressions", 250.0, False),  # duplicate of 3
+    ("6", ["vintage"], None, None, True),
+]
+
+
+def brute_force(style=None, brand=None, price_min=None, price_max=None, collapse=True):
+    def keep(row):
+        _, tags, row_brand, price, canonical = row
+        if collapse and not canonical:
+            return False
+        if style and style not in tags:
+            return False
+        if brand and row_brand != brand:
+            return False
+        if price_min is not None and (price is None or price < price_min):
+            return False
+        if price_max is not None and (price is None or price > price_max):
+            return False
+        return True
+    return [row for row in ROWS if keep(row)]
+
+
+def test_bitmap_from_positions():
+    """Positions map onto the matching bits"""
+    assert bitmap_from_positions([0, 3, 9], 10) == (1 << 0) | (1 << 3) | (1 << 9)
+    assert bitmap_from_positions([], 5) == 0
+    print("✅ Bitmap construction working")
+
+
+def test_counts_without_filters():
+    """Unfiltered counts cover the collapsed catalog"""
+    counts = FacetIndex(ROWS).counts()
+    assert counts["total"] == 5
+    assert counts["styles"] == {"abstract": 2, "minimalist": 2, "modern": 2, "vintage": 1}
+    assert counts["brands"] == {"Clean Lines": 2, "Modern Art Co.": 2}
+    assert counts["price_buckets"]["0-50"] == 1
+    assert counts["price_buckets"]["500+"] == 1
+    assert set(counts["price_buckets"]) == {label for label, _, _ in price_buckets()}
+    print("✅ Unfiltered facet counts working")
+
+
+def test_counts_match_brute_force():
+    """Filtered totals and per-facet counts match a linear scan"""
+    index = FacetIndex(ROWS)
+    filters = [
+        {"style": "abstract"},
+        {"brand": "Modern Art Co."},
+        {"price_min": 100, "price_max": 300},
+        {"style": "modern", "price_max": 100},
+        {"style": "abstract", "collapse": False},
+        {"style": "missing"},
+    ]
+    for f in filters:
+        collapse = f.pop("collapse", True)
+        counts = index.counts(collapse_duplicates=collapse, **f)
+        assert counts["total"] == len(brute_force(collapse=collapse, **f)), f
+
+        # A facet ignores its own filter but honours the others
+        others = {k: v for k, v in f.items() if k != "style"}
+        expected = {}
+        for _, tags, _, _, _ in brute_force(collapse=collapse, **others):
+            for tag in tags:
+                expected[tag] = expected.get(tag, 0) + 1
+        assert counts["styles"] == expected, f
+    print("✅ Filtered facet counts working")
+
+
+def test_cache_rebuilds_after_ttl():
+    """The cached index is shared until it expires"""
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return ROWS
+
+    cache = FacetCache(loader, ttl=60)
+    assert cache.get() is cache.get()
+    assert len(loads) == 1
+    cache.invalidate()
+    cache.get()
+    assert len(loads) == 2
+    print("✅ Facet cache working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing facets...")
+    test_bitmap_from_positions()
+    test_counts_without_filters()
+    test_counts_match_brute_force()
+    test_cache_rebuilds_after_ttl()
+    print("🎉 All facet tests passed!")
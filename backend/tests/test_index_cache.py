@@ -0,0 +1,74 @@
+"""
+Test the TTL index cache
+"""
+import threading
+import time
+
+from services.index_cache import IndexCache
+
+
+class Built:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.built_at = time.time()
+
+
+def test_stale_index_served_during_rebuild():
+    """While one caller rebuilds an expired index, others get the old one immediately"""
+    started, release = threading.Event(), threading.Event()
+    generation = {"value": 0}
+
+    def loader():
+        generation["value"] += 1
+        if generation["value"] > 1:
+            started.set()
+            release.wait(5)
+        return [generation["value"]]
+
+    cache = IndexCache(Built, loader, ttl=60)
+    old = cache.get()
+    assert old.rows == [1]
+    old.built_at -= 120  # expire it
+
+    rebuilt = {}
+    rebuilder = threading.Thread(target=lambda: rebuilt.setdefault("index", cache.get()))
+    rebuilder.start()
+    assert started.wait(5)
+
+    waited = time.perf_counter()
+    assert cache.get() is old
+    assert time.perf_counter() - waited < 0.5
+
+    release.set()
+    rebuilder.join(5)
+    assert rebuilt["index"].rows == [2]
+    assert cache.get() is rebuilt["index"]
+    print("✅ Stale index served during rebuild")
+
+
+def test_first_build_blocks_concurrent_callers():
+    """Without any index yet, concurrent callers wait for the one build"""
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return [1]
+
+    cache = IndexCache(Built, loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert len(results) == 4 and all(result is results[0] for result in results)
+    print("✅ First build shared")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing index cache...")
+    test_stale_index_served_during_rebuild()
+    test_first_build_blocks_concurrent_callers()
+    print("🎉 All index cache tests passed!")
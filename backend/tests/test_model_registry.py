@@ -0,0 +1,104 @@
+"""
+Test lazy model loading and readiness reporting
+"""
+import pytest
+
+from services.model_registry import FAILED, READY, UNLOADED, ModelRegistry
+
+
+def test_lazy_loading():
+    """Loaders only run on first use and exactly once"""
+    calls = []
+    registry = ModelRegistry()
+    registry.register("clip", lambda: calls.append("clip") or "model")
+
+    assert registry.entry("clip").state == UNLOADED
+    assert calls == []
+    assert registry.get("clip") == "model"
+    assert registry.get("clip") == "model"
+    assert calls == ["clip"]
+    print("✅ Lazy model loading working")
+
+
+def test_warm_up_gates_readiness():
+    """Preload entries must be loaded before the registry reports ready"""
+    registry = ModelRegistry()
+    registry.register("clip", lambda: "model", preload=True)
+    registry.register("whisper", lambda: "model")
+    registry.register("artwork_index", lambda: "index", kind="index", preload=True)
+
+    assert registry.status()["ready"] is False
+    registry.start_warm_up().join(timeout=5)
+
+    report = registry.status()
+    assert report["ready"] is True
+    assert report["models"]["clip"]["state"] == READY
+    assert report["models"]["whisper"]["state"] == UNLOADED
+    assert report["indexes"]["artwork_index"]["state"] == READY
+    print("✅ Warm-up readiness working")
+
+
+def test_failed_load_reported():
+    """A failing loader is recorded and keeps the registry not ready"""
+    def broken():
+        raise ImportError("No module named 'torch'")
+
+    registry = ModelRegistry()
+    registry.register("clip", broken, preload=True)
+    registry.warm_up()
+
+    report = registry.status()
+    assert report["ready"] is False
+    assert report["models"]["clip"]["state"] == FAILED
+    assert "torch" in report["models"]["clip"]["error"]
+    with pytest.raises(ImportError):
+        registry.get("clip")
+    print("✅ Failed load reporting working")
+
+
+def test_db_pool_check_recovers():
+    """Checked entries are re-probed so a database outage clears itself"""
+    database_up = {"value": False}
+
+    def probe(_=None):
+        if not database_up["value"]:
+            raise ConnectionError("database unavailable")
+        return {"pool": "ok"}
+
+    registry = ModelRegistry()
+    registry.register("database", probe, kind="db_pool", preload=True, check=probe)
+    registry.warm_up()
+    assert registry.status()["ready"] is False
+
+    database_up["value"] = True
+    report = registry.status()
+    assert report["ready"] is True
+    assert report["db_pools"]["database"]["healthy"] is True
+
+    database_up["value"] = False
+    assert registry.status()["ready"] is False
+    print("✅ DB pool readiness probe working")
+
+
+def test_status_never_loads_indexes():
+    """Readiness probes report unloaded or failed indexes without loading them inline"""
+    calls = []
+    registry = ModelRegistry()
+    registry.register("artwork_index", lambda: calls.append(1) or "index", kind="index",
+                      preload=True, check=lambda index: {"size": 1})
+
+    report = registry.status()
+    assert report["ready"] is False
+    assert report["indexes"]["artwork_index"]["state"] == UNLOADED
+    assert calls == []
+    print("✅ Readiness probe stays cheap")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing model registry...")
+    test_lazy_loading()
+    test_warm_up_gates_readiness()
+    test_failed_load_reported()
+    test_db_pool_check_recovers()
+    test_status_never_loads_indexes()
+    print("🎉 All model registry tests passed!")
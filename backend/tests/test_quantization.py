@@ -0,0 +1,96 @@
+"""
+Test quantized embedding search and recall reporting
+"""
+import numpy as np
+import pytest
+
+from services.quantization import (
+    ProductQuantizer,
+    QuantizedIndex,
+    ScalarQuantizer,
+    evaluate_recall,
+    exact_search,
+)
+from services.vector_store import EmbeddingStore, GenerationWriter, normalize_rows
+
+
+def clustered_vectors(count=2000, dim=64, clusters=12, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, count)
+    return normalize_rows(centers[labels] + 0.4 * rng.normal(size=(count, dim)))
+
+
+def test_scalar_quantizer_roundtrip():
+    """int8 codes decode close to the original vectors"""
+    vectors = clustered_vectors(500)
+    quantizer = ScalarQuantizer().fit(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.dtype == np.int8
+    assert np.abs(quantizer.decode(codes) - vectors).max() < 0.02
+
+    query = vectors[3]
+    assert np.allclose(quantizer.scores(codes, query), quantizer.decode(codes) @ query, atol=1e-4)
+    print("✅ Scalar quantizer working")
+
+
+def test_product_quantizer_scores():
+    """PQ lookup-table scores match decoded inner products"""
+    vectors = clustered_vectors(600, dim=32)
+    quantizer = ProductQuantizer(m=8, iterations=5).fit(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.shape == (600, 8)
+    assert quantizer.bytes_per_vector(32) == 8
+    query = vectors[0]
+    assert np.allclose(quantizer.scores(codes, query), quantizer.decode(codes) @ query, atol=1e-4)
+    print("✅ Product quantizer working")
+
+
+@pytest.mark.parametrize("mode,options", [("int8", {}), ("pq", {"m": 16, "iterations": 8})])
+def test_recall_with_rerank(mode, options):
+    """Re-ranking a shortlist recovers near-exact recall"""
+    vectors = clustered_vectors()
+    queries = clustered_vectors(50, seed=1)
+    index = QuantizedIndex.build(mode, vectors, **options)
+    report = evaluate_recall(index, queries, k=10, shortlist=200)
+
+    assert report["recall_at_k"] >= 0.9
+    assert report["recall_at_k"] >= report["recall_at_k_without_rerank"]
+    assert report["bytes_per_vector"] < report["float_bytes_per_vector"]
+    print(f"✅ {mode} recall@10 = {report['recall_at_k']}")
+
+
+def test_exact_search_matches_brute_force():
+    """Chunked ground truth equals a direct argsort"""
+    vectors = clustered_vectors(300)
+    queries = clustered_vectors(5, seed=2)
+    expected = np.argsort(-(queries @ vectors.T), axis=1)[:, :5]
+    assert (exact_search(vectors, queries, 5) == expected).all()
+    print("✅ Exact search ground truth working")
+
+
+def test_store_quantized_mode(tmp_path):
+    """Quantized codes persisted with a generation are used for search"""
+    vectors = clustered_vectors(400)
+    writer = GenerationWriter(str(tmp_path), 400, dim=64)
+    writer.write([f"art-{i}" for i in range(400)], vectors)
+    writer.add_quantized("int8")
+    writer.commit()
+
+    snapshot = EmbeddingStore(str(tmp_path)).attach().snapshot
+    assert snapshot.quantized_modes == ["int8"]
+    results = snapshot.search(vectors[7], k=3, mode="int8")
+    assert results[0][0] == "art-7"
+    with pytest.raises(ValueError):
+        snapshot.search(vectors[7], k=3, mode="pq")
+    print("✅ Store quantized search working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing quantization...")
+    test_scalar_quantizer_roundtrip()
+    test_product_quantizer_scores()
+    test_recall_with_rerank("int8", {})
+    test_recall_with_rerank("pq", {"m": 16, "iterations": 8})
+    test_exact_search_matches_brute_force()
+    print("🎉 All quantization tests passed!")
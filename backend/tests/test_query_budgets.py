@@ -0,0 +1,156 @@
+"""
+Test per-endpoint SQL query budgets
+
+The recorder tests use SQLite; the endpoint budgets run the API against
+DATABASE_URL like test_api.py and are skipped when it cannot be reached.
+"""
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from tests.query_budget import QueryBudgetExceeded, QueryRecorder, assert_query_budget, check_budget
+
+# (method, url, max queries, max rows)
+ENDPOINT_BUDGETS = [
+    ("GET", "/artworks?limit=20", 2, 21),  # page + count
+    ("GET", "/artworks?limit=20&fields=summary", 2, 21),
+    ("GET", "/artworks/changes?limit=50", 2, 102),  # upserts + tombstones
+    ("GET", "/styles", 1, 200),
+    ("GET", "/trends", 1, 500),
+    ("GET", "/trends/history?bucket=month", 1, 2000),
+]
+
+
+def database_reachable() -> bool:
+    from models.database import engine
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception:
+        return False
+    return True
+
+
+requires_database = pytest.mark.skipif(not database_reachable(), reason="DATABASE_URL is not reachable")
+
+
+def make_catalog_app():
+    """Tiny app with one efficient and one N+1 endpoint over a SQLite catalog"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE artwork (id INTEGER PRIMARY KEY, title TEXT)"))
+        connection.execute(text("CREATE TABLE tag (artwork_id INTEGER, name TEXT)"))
+        for i in range(5):
+            connection.execute(text("INSERT INTO artwork VALUES (:id, :title)"), {"id": i, "title": f"Art {i}"})
+            connection.execute(text("INSERT INTO tag VALUES (:id, 'calm')"), {"id": i})
+
+    def get_connection():
+        with engine.connect() as connection:
+            yield connection
+
+    app = FastAPI()
+
+    @app.get("/joined")
+    def joined(connection=Depends(get_connection)):
+        rows = connection.execute(text(
+            "SELECT artwork.id, tag.name FROM artwork JOIN tag ON tag.artwork_id = artwork.id"
+        )).all()
+        return {"count": len(rows)}
+
+    @app.get("/n_plus_one")
+    def n_plus_one(connection=Depends(get_connection)):
+        ids = connection.execute(text("SELECT id FROM artwork")).scalars().all()
+        for artwork_id in ids:
+            connection.execute(text("SELECT name FROM tag WHERE artwork_id = :id"), {"id": artwork_id}).all()
+        return {"count": len(ids)}
+
+    return TestClient(app), engine
+
+
+def test_recorder_counts_statements_and_rows():
+    """Statements on the watched engine are recorded; listeners are removed afterwards"""
+    client, engine = make_catalog_app()
+    with QueryRecorder([engine]) as recorder:
+        with engine.begin() as connection:
+            connection.execute(text("UPDATE artwork SET title = 'x' WHERE id < 3"))
+    assert recorder.queries == 1 and recorder.rows == 3
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert recorder.queries == 1
+    print("✅ Query recorder working")
+
+
+def test_budget_passes_and_fails_with_report():
+    """An N+1 endpoint blows its budget and the report marks the repeated statement"""
+    client, engine = make_catalog_app()
+    response = assert_query_budget(client, "GET", "/joined", queries=1, engines=[engine])
+    assert response.json() == {"count": 5}
+
+    with pytest.raises(QueryBudgetExceeded) as error:
+        assert_query_budget(client, "GET", "/n_plus_one", queries=2, engines=[engine])
+    message = str(error.value)
+    assert "6 queries > budget 2" in message
+    assert message.count("[repeated]") == 5
+    assert "1. (" in message and "SELECT id FROM artwork" in message
+    print("✅ Query budget assertions working")
+
+
+def test_row_budget():
+    """Row budgets are checked independently of the query count"""
+    client, engine = make_catalog_app()
+    with QueryRecorder([engine]) as recorder:
+        with engine.begin() as connection:
+            connection.execute(text("DELETE FROM tag"))
+    check_budget("cleanup", recorder, queries=1)
+    with pytest.raises(QueryBudgetExceeded, match="5 rows > budget 2"):
+        check_budget("cleanup", recorder, queries=1, rows=2)
+    print("✅ Row budgets working")
+
+
+def test_failed_statement_leaves_no_timing_state():
+    """A statement that raises is not recorded and leaves the pooled connection clean"""
+    client, engine = make_catalog_app()
+    with QueryRecorder([engine]) as recorder:
+        with engine.connect() as connection:
+            info_before = dict(connection.info)
+            with pytest.raises(Exception):
+                connection.execute(text("SELECT * FROM missing_table"))
+            assert dict(connection.info) == info_before
+            connection.execute(text("SELECT id FROM artwork")).all()
+    assert recorder.queries == 1
+    assert 0 <= recorder.statements[0].seconds < 1
+    print("✅ Failed statements handled")
+
+
+@requires_database
+@pytest.mark.parametrize("method,url,queries,rows", ENDPOINT_BUDGETS)
+def test_endpoint_query_budget(method, url, queries, rows):
+    """Catalog endpoints stay within their declared query and row budgets"""
+    from main import app
+
+    assert_query_budget(TestClient(app), method, url, queries, rows)
+
+
+@requires_database
+def test_artwork_detail_query_budget():
+    """A detail page is one primary-key lookup"""
+    from main import app
+
+    client = TestClient(app)
+    artworks = client.get("/artworks?limit=1&fields=summary").json()["artworks"]
+    if not artworks:
+        pytest.skip("empty catalog")
+    assert_query_budget(client, "GET", f"/artworks/{artworks[0]['id']}", queries=1, rows=1)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing query budgets...")
+    test_recorder_counts_statements_and_rows()
+    test_budget_passes_and_fails_with_report()
+    test_row_budget()
+    test_failed_statement_leaves_no_timing_state()
+    print("🎉 All query budget tests passed!")
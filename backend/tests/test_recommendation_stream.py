@@ -0,0 +1,166 @@
+"""
+Test streamed recommendations over Server-Sent Events
+"""
+import asyncio
+import json
+import tempfile
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from services.encoders import StubEncoder
+from services.model_registry import ModelRegistry
+from services.recommendation_stream import RecommendationStream, build_rationale, sse_event
+from services.serialization import ArtworkSerializer
+from services.vector_store import EmbeddingStore, publish
+
+QUERY = "calm minimalist piece"
+
+
+def parse_events(raw: bytes):
+    events = []
+    for frame in raw.decode("utf-8").strip().split("\n\n"):
+        name, data = frame.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def make_catalog(directory):
+    """Six artworks near the query vector; the last is a duplicate of the first"""
+    encoder = StubEncoder()
+    query = encoder.encode_texts([QUERY])[0]
+    rng = np.random.default_rng(0)
+    ids = [str(uuid.UUID(int=i + 1)) for i in range(6)]
+    vectors = query + rng.normal(scale=0.05, size=(6, query.size)).astype(np.float32)
+    publish(directory, ids, vectors)
+    artworks = {
+        artwork_id: SimpleNamespace(
+            id=uuid.UUID(artwork_id),
+            canonical_id=uuid.UUID(ids[0]) if i == 5 else None,
+            title=f"Piece {i}",
+            brand="Clean Lines",
+            price=100.0 + i,
+            style_tags=["minimalist"] if i % 2 == 0 else ["abstract"],
+            dominant_palette={"primary": "#FFFFFF"},
+            image_url=f"{i}.jpg",
+            dimensions={},
+            description="",
+            updated_at=None,
+        )
+        for i, artwork_id in enumerate(ids)
+    }
+    return encoder, EmbeddingStore(directory).attach(), artworks
+
+
+class RecordingLog:
+    def __init__(self):
+        self.records = []
+
+    def log(self, **record):
+        self.records.append(record)
+        return True
+
+
+def test_sse_event_format():
+    """Frames carry the event name and one line of JSON"""
+    assert sse_event("done", {"count": 1}) == b'event: done\ndata: {"count":1}\n\n'
+    assert sse_event("artworks", b'{"artworks":[]}') == b'event: artworks\ndata: {"artworks":[]}\n\n'
+    print("✅ SSE framing working")
+
+
+def test_rationale_mentions_matching_style():
+    """Rationales cite matched styles, palette and price"""
+    artwork = SimpleNamespace(style_tags=["minimalist"], dominant_palette={"primary": "#FFF"}, price=12.5)
+    rationale = build_rationale(QUERY, artwork, 0.9)
+    assert "minimalist" in rationale and "#FFF" in rationale and "$12.50" in rationale
+    artwork.style_tags = ["vintage"]
+    assert "90% similarity" in build_rationale(QUERY, artwork, 0.9)
+    print("✅ Rationale generation working")
+
+
+def test_stream_stages_in_order():
+    """Candidates come first, then collapsed artworks, rationales and done"""
+    with tempfile.TemporaryDirectory() as directory:
+        encoder, store, artworks = make_catalog(directory)
+        log = RecordingLog()
+        pipeline = RecommendationStream(
+            encoder, store,
+            fetch=lambda ids: [artworks[i] for i in ids],
+            serializer=ArtworkSerializer(),
+            log=log,
+            k=6,
+        )
+        user_id = uuid.uuid4()
+
+        async def collect():
+            return b"".join([frame async for frame in pipeline.events(QUERY, user_id)])
+
+        events = parse_events(asyncio.run(collect()))
+
+    names = [name for name, _ in events]
+    assert names == ["candidates", "artworks"] + ["rationale"] * 5 + ["done"]
+    assert len(events[0][1]["ids"]) == 6
+    returned = [a["id"] for a in events[1][1]["artworks"]]
+    assert len(returned) == 5 and len(set(returned)) == 5
+    assert not {str(uuid.UUID(int=1)), str(uuid.UUID(int=6))} <= set(returned)  # duplicate collapsed
+    assert [data["id"] for name, data in events if name == "rationale"] == returned
+    assert set(events[-1][1]["timings_ms"]) == {"candidates", "artworks", "rationale"}
+    assert log.records[0]["user_id"] == user_id
+    assert [str(i) for i in log.records[0]["topk_ids"]] == returned
+    print("✅ Staged streaming working")
+
+
+def test_stream_ends_with_error_event_on_failure():
+    """A stage that raises ends the stream with an error event"""
+    with tempfile.TemporaryDirectory() as directory:
+        encoder, store, _ = make_catalog(directory)
+
+        def fetch(ids):
+            raise RuntimeError("database went away")
+
+        pipeline = RecommendationStream(encoder, store, fetch=fetch, k=3)
+
+        async def collect():
+            return b"".join([frame async for frame in pipeline.events(QUERY)])
+
+        events = parse_events(asyncio.run(collect()))
+    assert [name for name, _ in events] == ["candidates", "error"]
+    assert events[-1][1]["detail"]
+    print("✅ Stream failures end with an error event")
+
+
+def test_stream_endpoint(monkeypatch):
+    """The endpoint streams text/event-stream and validates its input"""
+    import main
+
+    with tempfile.TemporaryDirectory() as directory:
+        encoder, store, artworks = make_catalog(directory)
+        registry = ModelRegistry()
+        registry.register("query_encoder", loader=lambda: encoder)
+        registry.register("artwork_index", loader=lambda: store, kind="index")
+        monkeypatch.setattr(main, "registry", registry)
+        monkeypatch.setattr(main, "fetch_artworks", lambda session_factory, ids: [artworks[i] for i in ids])
+        monkeypatch.setattr(main, "session_log", RecordingLog())
+
+        client = TestClient(main.app)
+        response = client.post("/recommendations/stream", json={"query_text": QUERY, "k": 3})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.content)
+        assert events[0][0] == "candidates" and events[-1] == ("done", events[-1][1])
+        assert events[-1][1]["count"] == 3
+
+        response = client.post("/recommendations/stream", json={"query_text": QUERY, "user_id": "nope"})
+        assert response.status_code == 400
+    print("✅ Streaming endpoint working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing recommendation streaming...")
+    test_sse_event_format()
+    test_rationale_mentions_matching_style()
+    test_stream_stages_in_order()
+    test_stream_ends_with_error_event_on_failure()
+    print("🎉 All recommendation streaming tests passed!")
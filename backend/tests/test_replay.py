@@ -0,0 +1,144 @@
+"""
+Test session replay scheduling and reporting
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from scripts.replay_sessions import (
+    DETAIL_ENDPOINT,
+    build_schedule,
+    busiest_window,
+    load_photos,
+    replay,
+    summarize,
+)
+
+START = datetime(2024, 3, 1, 18, 0, tzinfo=timezone.utc)
+
+
+def make_session(seconds, query_type="text", chosen_id=None):
+    return {
+        "user_id": uuid.uuid4(),
+        "query_text": "calm blue art",
+        "query_type": query_type,
+        "chosen_id": chosen_id,
+        "created_at": START + timedelta(seconds=seconds),
+    }
+
+
+def test_schedule_keeps_arrival_pattern():
+    """Offsets follow created_at divided by speed; choices add a detail request"""
+    chosen = uuid.uuid4()
+    sessions = [make_session(10, "photo"), make_session(0, chosen_id=chosen), make_session(4, "voice")]
+    schedule = build_schedule(sessions, speed=2.0, detail_delay=2.0, photos=[b"jpeg"])
+    assert [(r.offset, r.endpoint) for r in schedule] == [
+        (0.0, "POST /recommendations/stream"),
+        (1.0, DETAIL_ENDPOINT),
+        (2.0, "POST /recommendations/stream"),
+        (5.0, "POST /rooms/analyze"),
+    ]
+    assert schedule[1].path == f"/artworks/{chosen}"
+    assert schedule[0].body["query_text"] == "calm blue art" and schedule[0].body["k"] == 10
+    assert schedule[3].photo == b"jpeg" and schedule[3].body is None
+    print("✅ Replay schedule working")
+
+
+def test_photo_sessions_cycle_through_photos():
+    """Photo sessions take the given photos in turn and cannot be scheduled without any"""
+    sessions = [make_session(i, "photo") for i in range(5)]
+    schedule = build_schedule(sessions, photos=[b"a", b"b"])
+    assert [r.photo for r in schedule] == [b"a", b"b", b"a", b"b", b"a"]
+    with pytest.raises(ValueError):
+        build_schedule(sessions)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, data in (("2.jpg", b"two"), ("1.png", b"one"), ("notes.txt", b"skip")):
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(data)
+        assert load_photos(directory) == [b"one", b"two"]
+        assert load_photos(os.path.join(directory, "2.jpg")) == [b"two"]
+    print("✅ Replay photos working")
+
+
+def test_synthetic_photos_are_distinct_rooms():
+    """Generated photos decode as images and do not collide in the room analysis cache"""
+    pytest.importorskip("PIL.Image")
+    from scripts.replay_sessions import synthetic_photo
+    from services.room_analysis import RoomAnalysisCache, decode_image, hamming, image_dhash
+
+    hashes = [image_dhash(decode_image(synthetic_photo(seed))) for seed in range(8)]
+    max_distance = RoomAnalysisCache().max_distance
+    assert all(hamming(a, b) > max_distance for i, a in enumerate(hashes) for b in hashes[i + 1:])
+    assert synthetic_photo(3) == synthetic_photo(3)
+    print("✅ Synthetic room photos working")
+
+
+def test_busiest_window():
+    """The densest window of the requested length is selected"""
+    sessions = [make_session(s) for s in (0, 100, 3600, 3610, 3620, 3700, 9000)]
+    start, end = busiest_window(sessions, 300)
+    assert start == START + timedelta(seconds=3600)
+    assert end - start == timedelta(seconds=300)
+    print("✅ Busiest window working")
+
+
+def test_replay_reports_per_endpoint():
+    """Open-loop replay against an app reports latency and error rates per endpoint"""
+    app = FastAPI()
+
+    @app.post("/recommendations/stream")
+    async def stream():
+        async def events():
+            for i in range(3):
+                await asyncio.sleep(0.01)
+                yield f"event: step\ndata: {i}\n\n".encode()
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    uploads = []
+
+    @app.post("/rooms/analyze")
+    async def analyze(file: UploadFile = File(...)):
+        uploads.append(await file.read())
+        return JSONResponse(status_code=503, content={"detail": "busy"})
+
+    @app.get("/artworks/{artwork_id}")
+    async def detail(artwork_id: str):
+        return {"id": artwork_id}
+
+    sessions = [make_session(i, chosen_id=uuid.uuid4()) for i in range(5)] + [make_session(2.5, "photo")]
+    schedule = build_schedule(sessions, speed=50.0, photos=[b"room photo"])
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await replay(schedule, client)
+
+    results, wall = asyncio.run(scenario())
+    report = summarize(results, wall)
+    stream_stats = report["endpoints"]["POST /recommendations/stream"]
+    assert stream_stats["requests"] == 5 and stream_stats["errors"] == 0
+    assert stream_stats["p50_ms"] >= 30  # the whole stream is read
+    assert report["endpoints"][DETAIL_ENDPOINT]["statuses"] == {"200": 5}
+    assert report["endpoints"]["POST /rooms/analyze"]["statuses"] == {"503": 1}
+    assert uploads == [b"room photo"]
+    assert report["overall"]["requests"] == 11
+    # Open loop: all five streams overlap instead of running back to back
+    assert wall < 5 * 0.03 + 0.1 + 0.1
+    print("✅ Replay report working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing session replay...")
+    test_schedule_keeps_arrival_pattern()
+    test_photo_sessions_cycle_through_photos()
+    test_busiest_window()
+    test_replay_reports_per_endpoint()
+    print("🎉 All replay tests passed!")
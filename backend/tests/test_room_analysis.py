@@ -0,0 +1,141 @@
+"""
+Test the perceptual-hash room analysis cache
+"""
+import io
+import json
+
+import numpy as np
+import pytest
+
+from services.room_analysis import (
+    ENTRY_OVERHEAD_BYTES,
+    RoomAnalysisCache,
+    dhash_pixels,
+    dominant_colors,
+    hamming,
+)
+
+ANALYSIS = {"palette_json": {"colors": ["#FFFFFF"]}, "lighting_json": {"brightness": 0.8}}
+
+
+def gradient_image(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size=(8, 9))
+
+
+def flip_bits(phash, *bits):
+    for bit in bits:
+        phash ^= 1 << bit
+    return phash
+
+
+def test_dhash_ignores_brightness_and_contrast():
+    """Gradient signs survive a global brightness/contrast filter but not a different shot"""
+    gray = gradient_image()
+    phash = dhash_pixels(gray)
+    assert dhash_pixels(gray * 0.6 + 40) == phash
+    assert 0 <= phash < 2 ** 64
+    assert hamming(phash, dhash_pixels(gradient_image(1))) > 16
+    print("✅ dHash working")
+
+
+def test_exact_near_and_missed_lookups():
+    """Near-identical hashes reuse the stored analysis; distant ones miss"""
+    cache = RoomAnalysisCache(max_distance=6)
+    phash = dhash_pixels(gradient_image())
+    stored = cache.put(phash, ANALYSIS)
+    assert json.loads(stored) == ANALYSIS
+
+    assert cache.get(phash) == (stored, 0)
+    assert cache.get(flip_bits(phash, 0, 13, 40)) == (stored, 3)
+    # Spread over every band, so no single band matches exactly
+    assert cache.get(flip_bits(phash, 2, 10, 18, 26, 34, 42, 50)) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 1, 1)
+    print("✅ Hamming lookups working")
+
+
+def test_multi_index_matches_brute_force():
+    """Band lookups find exactly what a linear scan within max_distance finds"""
+    rng = np.random.default_rng(3)
+    cache = RoomAnalysisCache(max_distance=4)
+    stored = [int(value) for value in rng.integers(0, 2 ** 63, size=300, dtype=np.int64)]
+    for i, phash in enumerate(stored):
+        cache.put(phash, {"i": i})
+    for phash in stored[:50]:
+        query = flip_bits(phash, *rng.choice(64, size=int(rng.integers(0, 7)), replace=False))
+        expected = min((hamming(query, s), s) for s in stored)
+        found = cache.get(query)
+        if expected[0] <= 4:
+            assert found is not None and found[1] == expected[0]
+        else:
+            assert found is None
+    print("✅ Multi-index lookup working")
+
+
+def test_eviction_on_byte_budget():
+    """Least recently used analyses are evicted once the byte budget is exceeded"""
+    entry = len(json.dumps(ANALYSIS, separators=(",", ":"))) + ENTRY_OVERHEAD_BYTES
+    cache = RoomAnalysisCache(max_bytes=entry * 2, max_distance=0)
+    cache.put(1, ANALYSIS)
+    cache.put(2, ANALYSIS)
+    cache.get(1)
+    cache.put(3, ANALYSIS)
+    assert cache.get(2) is None and cache.get(1) is not None and cache.get(3) is not None
+    assert cache.stats()["evictions"] == 1 and cache.bytes <= cache.max_bytes
+    cache.put(4, {"blob": "x" * entry * 3})  # larger than the whole budget: not cached
+    assert len(cache) == 2
+    print("✅ Byte-budget eviction working")
+
+
+def test_dominant_colors():
+    """The most common colours come first"""
+    pixels = np.array([[250, 250, 250]] * 6 + [[20, 40, 200]] * 3 + [[200, 30, 30]], dtype=np.uint8)
+    assert dominant_colors(pixels, count=2) == ["#FAFAFA", "#1428C8"]
+    print("✅ Dominant colours working")
+
+
+def test_analyze_endpoint_reuses_near_identical_upload(monkeypatch):
+    """A re-upload with a brightness filter is served from the cache"""
+    Image = pytest.importorskip("PIL.Image")
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setattr(main, "room_analysis_cache", RoomAnalysisCache())
+    pixels = np.random.default_rng(0).integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+
+    def upload(array, quality):
+        buffer = io.BytesIO()
+        Image.fromarray(array).save(buffer, format="JPEG", quality=quality)
+        return client.post("/rooms/analyze", files={"file": ("room.jpg", buffer.getvalue(), "image/jpeg")})
+
+    client = TestClient(main.app)
+    first = upload(pixels, 90).json()
+    second = upload(np.clip(pixels * 0.9 + 10, 0, 255).astype(np.uint8), 70).json()
+    assert not first["cached"] and second["cached"]
+    assert second["analysis"] == first["analysis"]
+    assert client.post("/rooms/analyze", files={"file": ("x.jpg", b"not an image", "image/jpeg")}).status_code == 400
+    print("✅ Room analysis cache endpoint working")
+
+
+def test_analyze_endpoint_rejects_oversized_upload(monkeypatch):
+    """Uploads over the size limit are refused before decoding"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setattr(main, "ROOM_UPLOAD_MAX_BYTES", 1024)
+    monkeypatch.setattr(main, "analyze_with_cache", lambda data, cache: pytest.fail("oversized upload was decoded"))
+    response = TestClient(main.app).post("/rooms/analyze", files={"file": ("room.jpg", b"\xff" * 1025, "image/jpeg")})
+    assert response.status_code == 413
+    print("✅ Oversized uploads rejected")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing room analysis cache...")
+    test_dhash_ignores_brightness_and_contrast()
+    test_exact_near_and_missed_lookups()
+    test_multi_index_matches_brute_force()
+    test_eviction_on_byte_budget()
+    test_dominant_colors()
+    print("🎉 All room analysis tests passed!")
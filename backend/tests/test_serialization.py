@@ -0,0 +1,122 @@
+"""
+Test cached artwork serialization
+"""
+import json
+import uuid
+from datetime import datetime, timezone
+
+from models.artwork import Artwork
+from services.serialization import (
+    ARTWORK_DETAIL_FIELDS,
+    ARTWORK_LIST_FIELDS,
+    ARTWORK_SUMMARY_FIELDS,
+    ArtworkSerializer,
+    PreEncodedJSONResponse,
+    artwork_to_dict,
+    assemble_json,
+    parse_fields,
+)
+
+
+def make_artwork(**overrides):
+    data = {
+        "id": uuid.uuid4(),
+        "title": "Minimalist Study #1",
+        "brand": "Clean Lines",
+        "price": 120.0,
+        "style_tags": ["minimalist", "clean"],
+        "dominant_palette": {"colors": ["#FFFFFF", "#E0E0E0"]},
+        "image_url": "https://example.com/1.jpg",
+        "dimensions": {"width": 24, "height": 36, "unit": "inches"},
+        "description": "A calm piece — with unicode",
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "updated_at": datetime(2024, 1, 2, tzinfo=timezone.utc),
+    }
+    data.update(overrides)
+    return Artwork(**data)
+
+
+def test_fragment_matches_dict_encoding():
+    """Cached fragments decode to the same payload as the dict path"""
+    artwork = make_artwork()
+    serializer = ArtworkSerializer()
+    fragment = serializer.encode(artwork, ARTWORK_DETAIL_FIELDS)
+    assert json.loads(fragment) == artwork_to_dict(artwork, ARTWORK_DETAIL_FIELDS)
+    assert json.loads(fragment)["id"] == str(artwork.id)
+    print("✅ Artwork fragment encoding working")
+
+
+def test_cache_keyed_on_updated_at():
+    """A new updated_at invalidates the cached fragment"""
+    artwork = make_artwork()
+    serializer = ArtworkSerializer()
+    first = serializer.encode(artwork)
+    assert serializer.encode(artwork) is first
+    assert serializer.stats()["hits"] == 1
+
+    artwork.title = "Renamed"
+    assert serializer.encode(artwork) is first  # same version stamp, still cached
+    artwork.updated_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    assert json.loads(serializer.encode(artwork))["title"] == "Renamed"
+    print("✅ Serializer cache versioning working")
+
+
+def test_cache_eviction():
+    """The cache never grows past max_entries"""
+    serializer = ArtworkSerializer(max_entries=2)
+    for _ in range(5):
+        serializer.encode(make_artwork())
+    assert serializer.stats()["entries"] == 2
+    print("✅ Serializer cache eviction working")
+
+
+def test_assembled_list_payload():
+    """List responses are assembled from fragments into valid JSON"""
+    artworks = [make_artwork(), make_artwork()]
+    serializer = ArtworkSerializer()
+    body = assemble_json({
+        "artworks": serializer.encode_many(artworks),
+        "total": 2,
+        "skip": 0,
+        "limit": 20,
+    })
+    data = json.loads(body)
+    assert [item["id"] for item in data["artworks"]] == [str(a.id) for a in artworks]
+    assert data["total"] == 2
+
+    response = PreEncodedJSONResponse(body)
+    assert response.body == body
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(serializer.encode_many([])) == []
+    print("✅ Pre-encoded list payload working")
+
+
+def test_parse_fields():
+    """fields= values map to canonical tuples sharing one cache entry per field set"""
+    assert parse_fields(None) == ARTWORK_LIST_FIELDS
+    assert parse_fields("summary") == ARTWORK_SUMMARY_FIELDS
+    assert parse_fields("price, title") == ("id", "title", "price")
+    assert parse_fields("title,price,id") == parse_fields("price,title")
+    try:
+        parse_fields("title,secret")
+        assert False, "unknown field accepted"
+    except ValueError as e:
+        assert "secret" in str(e)
+
+    serializer = ArtworkSerializer()
+    artwork = make_artwork()
+    summary = json.loads(serializer.encode(artwork, parse_fields("summary")))
+    assert list(summary) == list(ARTWORK_SUMMARY_FIELDS)
+    serializer.encode(artwork, parse_fields("image_url,price,title"))
+    assert serializer.stats()["hits"] == 1
+    print("✅ Sparse fieldsets working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing artwork serialization...")
+    test_fragment_matches_dict_encoding()
+    test_cache_keyed_on_updated_at()
+    test_cache_eviction()
+    test_assembled_list_payload()
+    test_parse_fields()
+    print("🎉 All serialization tests passed!")
@@ -0,0 +1,121 @@
+"""
+Test write-behind session logging
+"""
+import time
+import uuid
+
+import pytest
+
+from services.session_logger import SessionLogWriter
+
+
+class RecordingSession:
+    """Stands in for a SQLAlchemy session and records bulk inserts"""
+
+    def __init__(self, sink, fail=False):
+        self.sink = sink
+        self.fail = fail
+
+    def execute(self, statement, rows):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.sink.append(list(rows))
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_writer(batches, **options):
+    return SessionLogWriter(session_factory=lambda: RecordingSession(batches), **options)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_flush_on_batch_size():
+    """A full batch is written as one bulk insert"""
+    batches = []
+    writer = make_writer(batches, batch_size=5, flush_interval=60)
+    writer.start()
+    for i in range(5):
+        assert writer.log(user_id=uuid.uuid4(), query_text=f"query {i}", query_type="text")
+    assert wait_for(lambda: len(batches) == 1)
+    assert len(batches[0]) == 5
+    assert all("id" in row and "created_at" in row for row in batches[0])
+    writer.stop()
+    print("✅ Batch size flush working")
+
+
+def test_flush_on_interval():
+    """A partial batch is written once the flush interval passes"""
+    batches = []
+    writer = make_writer(batches, batch_size=100, flush_interval=0.05)
+    writer.start()
+    writer.log(user_id=uuid.uuid4(), query_type="voice")
+    assert wait_for(lambda: len(batches) == 1)
+    assert writer.stats()["written"] == 1
+    writer.stop()
+    print("✅ Interval flush working")
+
+
+def test_stop_flushes_queue():
+    """Shutdown writes everything that was queued"""
+    batches = []
+    writer = make_writer(batches, batch_size=4, flush_interval=60)
+    for _ in range(10):
+        writer.log(user_id=uuid.uuid4(), query_type="text")
+    writer.stop()
+    assert sum(len(batch) for batch in batches) == 10
+    assert max(len(batch) for batch in batches) <= 4
+    assert writer.stats()["queue_depth"] == 0
+    print("✅ Shutdown flush working")
+
+
+def test_drop_when_full():
+    """A full queue drops records instead of blocking the request"""
+    writer = make_writer([], max_queue=2)
+    assert writer.log(user_id=uuid.uuid4())
+    assert writer.log(user_id=uuid.uuid4())
+    assert writer.log(user_id=uuid.uuid4()) is False
+    stats = writer.stats()
+    assert stats["dropped"] == 1
+    assert stats["queue_depth"] == 2
+    print("✅ Queue drop counter working")
+
+
+def test_failed_flush_counted():
+    """Rows from a failed insert are counted and the writer keeps going"""
+    writer = SessionLogWriter(session_factory=lambda: RecordingSession([], fail=True))
+    writer.log(user_id=uuid.uuid4())
+    writer.stop()
+    assert writer.stats()["failed"] == 1
+    assert writer.stats()["written"] == 0
+    print("✅ Failed flush counting working")
+
+
+def test_unknown_fields_rejected():
+    """Typos in field names fail fast at the call site"""
+    with pytest.raises(ValueError):
+        make_writer([]).log(user_id=uuid.uuid4(), query="oops")
+    print("✅ Field validation working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing session logger...")
+    test_flush_on_batch_size()
+    test_flush_on_interval()
+    test_stop_flushes_queue()
+    test_drop_when_full()
+    test_failed_flush_counted()
+    test_unknown_fields_rejected()
+    print("🎉 All session logger tests passed!")
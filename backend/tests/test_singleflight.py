@@ -0,0 +1,181 @@
+"""
+Test single-flight request coalescing
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from services.singleflight import SingleFlight, flight_key
+
+
+def test_flight_key_normalises_params():
+    """Argument order, whitespace and excluded names do not split flights"""
+    a = flight_key("trends", {"region": " EU ", "styles": ["a", "b"], "db": object()}, exclude=("db",))
+    b = flight_key("trends", {"styles": ["a", "b"], "region": "EU", "db": object()}, exclude=("db",))
+    assert a == b
+    assert a != flight_key("trends", {"region": "US", "styles": ["a", "b"]})
+    print("✅ Flight key normalisation working")
+
+
+def test_concurrent_calls_share_one_flight():
+    """Identical concurrent calls run once and all receive the result"""
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"value": 42}
+
+    async def scenario():
+        return await asyncio.gather(*[flights.do(("styles",), compute) for _ in range(10)])
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == {"value": 42} for result in results)
+    stats = flights.stats()["styles"]
+    assert stats == {"flights": 1, "requests": 10, "coalesced": 9, "in_flight": 0,
+                     "max_absorbed": 9, "absorbed_per_flight": {"9": 1}}
+    print("✅ Coalescing working")
+
+
+def test_errors_reach_every_waiter():
+    """A failing flight raises in the leader and every follower"""
+    flights = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def scenario():
+        return await asyncio.gather(*[flights.do(("trends",), boom) for _ in range(3)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    # The failed flight is not remembered
+    async def ok():
+        return "ok"
+    assert asyncio.run(flights.do(("trends",), ok)) == "ok"
+    print("✅ Error propagation working")
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    """The caller that started a flight disconnecting leaves the others their result"""
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.do(("styles",), compute))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flights.do(("styles",), compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader.cancelled(), results
+
+    leader_cancelled, results = asyncio.run(scenario())
+    assert leader_cancelled
+    assert results == ["done"] * 3 and calls == [1]
+    assert flights.stats()["styles"]["in_flight"] == 0
+    print("✅ Leader cancellation isolated")
+
+
+def test_bypass_runs_on_its_own():
+    """Calls matching bypass neither join nor start a shared flight"""
+    flights = SingleFlight()
+    calls = []
+
+    @flights.coalesce(exclude=("db",), bypass=lambda kwargs: kwargs["db"] == "primary")
+    async def styles(db):
+        calls.append(db)
+        await asyncio.sleep(0.02)
+        return db
+
+    async def scenario():
+        return await asyncio.gather(*[styles(db=db) for db in ("replica", "replica", "primary", "primary")])
+
+    assert asyncio.run(scenario()) == ["replica", "replica", "primary", "primary"]
+    assert sorted(calls) == ["primary", "primary", "replica"]
+    assert flights.stats()["styles"]["coalesced"] == 1
+    print("✅ Coalescing bypass working")
+
+
+def test_flight_uses_its_own_session():
+    """Flights run on a session from session_factory, never on a caller's request session"""
+    flights = SingleFlight()
+    opened = []
+
+    class FlightSession:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def session_factory():
+        opened.append(FlightSession())
+        return opened[-1]
+
+    @flights.coalesce(session_factory=session_factory)
+    def styles(region: str, db):
+        time.sleep(0.02)
+        assert isinstance(db, FlightSession) and not db.closed
+        return region
+
+    async def scenario():
+        return await asyncio.gather(*[styles(region="EU", db=f"request-{i}") for i in range(4)])
+
+    assert asyncio.run(scenario()) == ["EU"] * 4
+    assert len(opened) == 1 and opened[0].closed
+    print("✅ Flight sessions working")
+
+
+def test_decorated_sync_handler_keeps_dependencies():
+    """Decorated sync handlers keep their FastAPI signature and run in the threadpool"""
+    flights = SingleFlight()
+    app = FastAPI()
+    calls = []
+    lock = threading.Lock()
+
+    def get_db():
+        yield "session"
+
+    @app.get("/styles")
+    @flights.coalesce()
+    def styles(region: str = "all", db=Depends(get_db)):
+        with lock:
+            calls.append(region)
+        time.sleep(0.05)
+        return {"region": region, "db": db}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[client.get("/styles", params={"region": "EU"}) for _ in range(5)])
+
+    responses = asyncio.run(scenario())
+    assert all(r.json() == {"region": "EU", "db": "session"} for r in responses)
+    assert calls == ["EU"]
+    assert flights.stats()["styles"]["coalesced"] == 4
+    print("✅ Handler decorator working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing single flight...")
+    test_flight_key_normalises_params()
+    test_concurrent_calls_share_one_flight()
+    test_errors_reach_every_waiter()
+    test_cancelled_leader_does_not_cancel_followers()
+    test_bypass_runs_on_its_own()
+    test_flight_uses_its_own_session()
+    test_decorated_sync_handler_keeps_dependencies()
+    print("🎉 All single flight tests passed!")
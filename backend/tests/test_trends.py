@@ -0,0 +1,71 @@
+"""
+Test trend rollups and time-bucketed history queries
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from models.trend import TrendAnalysis, sync_season_column
+from services.trends import latest_trends, trend_history
+
+
+class CompileOnly:
+    """Stand-in session that builds queries without a database"""
+
+    def query(self, *entities):
+        return Query(list(entities))
+
+
+def compile_sql(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+def test_season_column_from_analysis_data():
+    """New rows get their season from analysis_data unless set explicitly"""
+    trend = TrendAnalysis(style="nature", analysis_data={"season": "spring"})
+    sync_season_column(None, None, trend)
+    assert trend.season == "spring"
+    trend = TrendAnalysis(style="nature", season="winter", analysis_data={"season": "spring"})
+    sync_season_column(None, None, trend)
+    assert trend.season == "winter"
+    print("✅ Season column sync working")
+
+
+def test_latest_trends_reads_the_rollup():
+    """Filters apply to trend_latest, not the history table"""
+    sql = compile_sql(latest_trends(CompileOnly(), region="eu", style="minimalist", season="spring"))
+    assert "FROM trend_latest" in sql and "trend_analysis" not in sql
+    assert "trend_latest.region =" in sql and "trend_latest.style =" in sql
+    assert "trend_latest.season IN" in sql
+    assert "ORDER BY trend_latest.trend_score DESC" in sql
+    print("✅ Latest trend query working")
+
+
+def test_history_is_bucketed_and_bounded():
+    """History aggregates per time bucket over a bounded created_at range"""
+    sql = compile_sql(trend_history(CompileOnly(), style="nature", region="global", bucket="day"))
+    assert "date_trunc" in sql and "GROUP BY" in sql
+    assert "trend_analysis.created_at >=" in sql
+    assert "avg(trend_analysis.trend_score)" in sql
+    with pytest.raises(ValueError):
+        trend_history(CompileOnly(), bucket="fortnight")
+    print("✅ Trend history query working")
+
+
+def test_history_endpoint_rejects_unknown_bucket():
+    """Invalid buckets fail fast with 400"""
+    from main import app
+
+    response = TestClient(app).get("/trends/history", params={"bucket": "fortnight"})
+    assert response.status_code == 400
+    print("✅ Trend history validation working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing trends...")
+    test_season_column_from_analysis_data()
+    test_latest_trends_reads_the_rollup()
+    test_history_is_bucketed_and_bounded()
+    test_history_endpoint_rejects_unknown_bucket()
+    print("🎉 All trend tests passed!")
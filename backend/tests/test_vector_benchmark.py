@@ -0,0 +1,53 @@
+"""
+Test the vector search benchmark on a tiny corpus
+"""
+import numpy as np
+
+import scripts.benchmark_vector_search as bench
+from services.quantization import recall_at_k
+
+
+def test_recall_at_k():
+    """Recall counts the true top-k found in each result row"""
+    truth = np.array([[1, 2, 3], [4, 5, 6]])
+    assert recall_at_k([[1, 2, 3], [4, 5, 6]], truth, 3) == 1.0
+    assert recall_at_k([[3, 2, 9], [7, 8, 9]], truth, 3) == 2 / 6
+    # Only the first k results count
+    assert recall_at_k([[9, 9, 9, 1, 2, 3], [4, 5, 6]], truth, 3) == 0.5
+    print("✅ Recall@k working")
+
+
+def test_queries_span_every_chunk(monkeypatch):
+    """Query counts above CHUNK_ROWS are generated in full"""
+    monkeypatch.setattr(bench, "CHUNK_ROWS", 7)
+    centroids = bench.style_centroids(8, seed=1)
+    queries = bench.generate_queries(20, centroids, noise=0.5, seed=2)
+    assert queries.shape == (20, 8)
+    print("✅ Query generation working")
+
+
+def test_benchmark_report_on_tiny_corpus():
+    """Exact search has perfect recall and every mode/thread pair gets a table row"""
+    report = bench.benchmark(count=500, dim=16, query_count=25, k=5, modes=["exact", "int8"],
+                             thread_counts=[1, 2], shortlist=50, noise=0.6, seed=3)
+    assert report["config"]["queries"] == 25
+    rows = {(row["mode"], row["threads"]): row for row in report["results"]}
+    assert sorted(rows) == [("exact", 1), ("exact", 2), ("int8", 1), ("int8", 2)]
+    assert rows[("exact", 1)]["recall_at_5"] == 1.0
+    assert rows[("int8", 1)]["recall_at_5"] >= 0.8
+    assert rows[("int8", 1)]["bytes_per_vector"] < rows[("exact", 1)]["bytes_per_vector"]
+
+    table = bench.to_markdown(report).splitlines()
+    header = next(line for line in table if line.startswith("| Mode"))
+    body = [line for line in table if line.startswith("| exact") or line.startswith("| int8")]
+    assert "Recall@5" in header and "Peak RSS so far" in header
+    assert len(body) == 4
+    assert all(line.count("|") == header.count("|") for line in body)
+    print("✅ Benchmark report working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing vector benchmark...")
+    test_recall_at_k()
+    test_benchmark_report_on_tiny_corpus()
+    print("🎉 All vector benchmark tests passed!")
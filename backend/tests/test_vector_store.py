@@ -0,0 +1,119 @@
+"""
+Test the shared memory-mapped embedding store
+"""
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from services.vector_store import EMBEDDING_DIM, EmbeddingStore, GenerationWriter, publish
+
+
+def random_vectors(count, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+def test_publish_and_search(tmp_path):
+    """Published vectors are mapped read-only and searchable"""
+    vectors = random_vectors(100)
+    ids = [f"art-{i}" for i in range(100)]
+    publish(str(tmp_path), ids, vectors)
+
+    store = EmbeddingStore(str(tmp_path)).attach()
+    snapshot = store.snapshot
+    assert isinstance(snapshot.vectors, np.memmap)
+    assert not snapshot.vectors.flags.writeable
+    assert len(snapshot) == 100
+
+    results = store.search(vectors[42], k=5)
+    assert results[0][0] == "art-42"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert len(results) == 5
+    print("✅ Embedding store search working")
+
+
+def test_generation_swap(tmp_path):
+    """Readers pick up a new generation while old snapshots stay valid"""
+    root = str(tmp_path)
+    first = publish(root, ["a", "b"], random_vectors(2, seed=1))
+    store = EmbeddingStore(root, check_interval=0).attach()
+    old_snapshot = store.snapshot
+    assert old_snapshot.generation == first
+
+    second = publish(root, ["c", "d", "e"], random_vectors(3, seed=2))
+    assert second != first
+    assert store.snapshot.generation == second
+    assert len(store.snapshot) == 3
+    # The old mapping keeps working for in-flight searches
+    assert len(old_snapshot.search(random_vectors(1)[0], k=2)) == 2
+    print("✅ Atomic generation swap working")
+
+
+def test_old_generations_pruned(tmp_path):
+    """Only the newest generations are kept on disk"""
+    root = str(tmp_path)
+    for seed in range(4):
+        publish(root, ["a"], random_vectors(1, seed=seed), keep=2)
+    generations = sorted(name for name in os.listdir(root) if name.startswith("gen-"))
+    assert generations == ["gen-000003", "gen-000004"]
+    print("✅ Generation pruning working")
+
+
+def test_partial_generation(tmp_path):
+    """A generation committed short only exposes the written rows"""
+    writer = GenerationWriter(str(tmp_path), count=10, dim=16)
+    writer.write(["a", "b", "c"], random_vectors(3))
+    writer.commit()
+    store = EmbeddingStore(str(tmp_path)).attach()
+    assert len(store.snapshot) == 3
+    assert list(store.snapshot.ids) == ["a", "b", "c"]
+    print("✅ Partial generation working")
+
+
+class FakeEmbeddingQuery:
+    """Filters (artwork_id, vector, model_version) rows on model_version criteria"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, criterion):
+        version = criterion.right.value
+        return FakeEmbeddingQuery([row for row in self.rows if row[2] == version])
+
+    def order_by(self, *args):
+        return FakeEmbeddingQuery(sorted(self.rows))
+
+    def yield_per(self, size):
+        return [(artwork_id, vector) for artwork_id, vector, _ in self.rows]
+
+    def count(self):
+        return len(self.rows)
+
+
+def test_build_exports_one_model_version(tmp_path, monkeypatch):
+    """Only the requested encoder's vectors are exported, and the version is recorded"""
+    import scripts.build_embedding_store as build
+
+    vectors = random_vectors(4, dim=EMBEDDING_DIM)
+    rows = [("a", vectors[0], "clip-ViT-B/32"), ("b", vectors[1], "stub-v1"),
+            ("c", vectors[2], "clip-ViT-B/32"), ("d", vectors[3], None)]
+    session = SimpleNamespace(query=lambda *entities: FakeEmbeddingQuery(rows), close=lambda: None)
+    monkeypatch.setattr(build, "SessionLocal", lambda: session)
+
+    build.build_embedding_store(str(tmp_path), "clip-ViT-B/32")
+    store = EmbeddingStore(str(tmp_path)).attach()
+    assert list(store.snapshot.ids) == ["a", "c"]
+    assert store.describe()["model_version"] == "clip-ViT-B/32"
+    print("✅ Store builds export one model version")
+
+
+def test_missing_store(tmp_path):
+    """Attaching before anything is published fails loudly"""
+    with pytest.raises(FileNotFoundError):
+        EmbeddingStore(str(tmp_path / "missing")).attach()
+    print("✅ Missing store detection working")
+
+
+if __name__ == "__main__":
+    print("Run with pytest: these tests use the tmp_path fixture")
@@ -0,0 +1,175 @@
+"""
+Test incremental transcription of streamed voice queries
+"""
+import json
+import tempfile
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from services.model_registry import ModelRegistry
+from services.voice import (
+    SAMPLE_RATE,
+    IncrementalTranscriber,
+    StubTranscriber,
+    pcm16_to_float,
+    resample,
+)
+
+
+def speak(words, word_seconds=0.4, gap_seconds=0.15):
+    """PCM16 audio the stub transcriber reads back as the given words"""
+    vocabulary = StubTranscriber.VOCABULARY
+    parts = []
+    for word in words:
+        amplitude = (vocabulary.index(word) + len(vocabulary)) / 100
+        parts.append(np.full(int(word_seconds * SAMPLE_RATE), amplitude, dtype=np.float32))
+        parts.append(np.zeros(int(gap_seconds * SAMPLE_RATE), dtype=np.float32))
+    audio = np.concatenate(parts)
+    return (audio * 32767).astype("<i2").tobytes()
+
+
+def chunks(data, size=3200):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+WORDS = ["calm", "blue", "minimalist", "art", "for", "bedroom", "wall", "warm", "abstract",
+         "vintage", "calm", "blue", "art", "for", "wall", "minimalist", "bedroom", "warm"]
+
+
+def test_pcm_helpers():
+    """PCM16 decoding and resampling keep scale and duration"""
+    audio = pcm16_to_float(np.array([0, 16384, -32768], dtype="<i2").tobytes() + b"\x01")
+    assert np.allclose(audio, [0, 0.5, -1])
+    assert resample(np.ones(8000, dtype=np.float32), 8000).size == 16000
+    print("✅ PCM helpers working")
+
+
+def test_stub_transcriber_reads_words():
+    """The stub maps voiced runs back to words"""
+    audio = pcm16_to_float(speak(["calm", "blue", "wall"]))
+    assert StubTranscriber().transcribe(audio) == "calm blue wall"
+    print("✅ Stub transcriber working")
+
+
+def test_sliding_windows_commit_at_silences():
+    """A long utterance streams partials and the final text matches, with bounded work"""
+    session = IncrementalTranscriber(StubTranscriber(), step_seconds=0.5, window_seconds=2.0,
+                                     cut_search_seconds=0.5)
+    partials = [text for chunk in chunks(speak(WORDS)) if (text := session.feed(chunk)) is not None]
+    transcript = session.finish()
+
+    assert transcript == " ".join(WORDS)
+    assert len(partials) >= 15
+    assert all(len(a.split()) <= len(b.split()) + 1 for a, b in zip(partials, partials[1:]))
+    assert WORDS[:4] == partials[-1].split()[:4]
+    # Committed windows are never re-transcribed at the end
+    stats = session.stats()
+    assert session.committed and len(session.committed) > 2
+    assert stats["transcribed_seconds"] < stats["audio_seconds"] * 5
+    print("✅ Sliding-window transcription working")
+
+
+def test_voice_websocket(monkeypatch):
+    """The socket streams partials, the final transcript and then recommendations"""
+    import main
+    from services.encoders import StubEncoder
+    from services.vector_store import EmbeddingStore, publish
+
+    with tempfile.TemporaryDirectory() as directory:
+        publish(directory, ["a"], StubEncoder().encode_texts(["x"]))
+        registry = ModelRegistry()
+        registry.register("transcriber", loader=StubTranscriber)
+        registry.register("query_encoder", loader=StubEncoder)
+        registry.register("artwork_index", loader=lambda: EmbeddingStore(directory).attach(), kind="index")
+        monkeypatch.setattr(main, "registry", registry)
+        monkeypatch.setattr(main, "fetch_artworks", lambda session_factory, ids: [])
+
+        client = TestClient(main.app)
+        with client.websocket_connect("/ws/voice?k=3") as websocket:
+            for chunk in chunks(speak(["calm", "blue", "art"]), 8000):
+                websocket.send_bytes(chunk)
+            websocket.send_text("end")
+            messages = []
+            while True:
+                message = json.loads(websocket.receive_text())
+                messages.append(message)
+                if message["type"] == "done" or message.get("data", {}).get("count") is not None:
+                    break
+
+    types = [m["type"] for m in messages]
+    assert "partial" in types
+    final = next(m for m in messages if m["type"] == "final")
+    assert final["text"] == "calm blue art"
+    assert types[types.index("final") + 1] == "candidates"
+    assert messages[-1]["data"]["count"] == 0
+    assert main.recommendation_limit.in_flight == 0
+    print("✅ Voice WebSocket working")
+
+
+def test_voice_websocket_rejects_bad_input_and_sheds(monkeypatch):
+    """Bad sample rates are refused, and the search shares the recommendation slots"""
+    import main
+    from services.admission import RouteLimit
+
+    registry = ModelRegistry()
+    registry.register("transcriber", loader=StubTranscriber)
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(main, "recommendation_limit", RouteLimit(max_concurrent=0, max_queue=0, retry_after=7))
+
+    client = TestClient(main.app)
+    with client.websocket_connect("/ws/voice?sample_rate=0") as websocket:
+        assert websocket.receive_json() == {"type": "error", "detail": "sample_rate must be positive"}
+
+    with client.websocket_connect("/ws/voice") as websocket:
+        for chunk in chunks(speak(["calm", "art"]), 8000):
+            websocket.send_bytes(chunk)
+        websocket.send_text("end")
+        message = websocket.receive_json()
+        while message["type"] != "final":
+            message = websocket.receive_json()
+        assert websocket.receive_json() == {"type": "error", "detail": "Server busy, retry later", "retry_after": 7}
+    assert main.recommendation_limit.shed == 1
+    print("✅ Voice WebSocket validation and admission working")
+
+
+def test_voice_websocket_reports_pipeline_failures(monkeypatch):
+    """A failing search stage reaches the client as an error message"""
+    import main
+    from services.encoders import StubEncoder
+    from services.vector_store import EmbeddingStore, publish
+
+    def fail(session_factory, ids):
+        raise RuntimeError("database went away")
+
+    with tempfile.TemporaryDirectory() as directory:
+        publish(directory, ["a"], StubEncoder().encode_texts(["x"]))
+        registry = ModelRegistry()
+        registry.register("transcriber", loader=StubTranscriber)
+        registry.register("query_encoder", loader=StubEncoder)
+        registry.register("artwork_index", loader=lambda: EmbeddingStore(directory).attach(), kind="index")
+        monkeypatch.setattr(main, "registry", registry)
+        monkeypatch.setattr(main, "fetch_artworks", fail)
+
+        client = TestClient(main.app)
+        with client.websocket_connect("/ws/voice") as websocket:
+            for chunk in chunks(speak(["calm", "art"]), 8000):
+                websocket.send_bytes(chunk)
+            websocket.send_text("end")
+            types = []
+            message = websocket.receive_json()
+            while message["type"] != "error":
+                types.append(message["type"])
+                message = websocket.receive_json()
+    assert types[-2:] == ["final", "candidates"]
+    assert message["detail"]
+    assert main.recommendation_limit.in_flight == 0
+    print("✅ Voice WebSocket failure reporting working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing voice streaming...")
+    test_pcm_helpers()
+    test_stub_transcriber_reads_words()
+    test_sliding_windows_commit_at_silences()
+    print("🎉 All voice tests passed!")
@@ -0,0 +1,64 @@
+"""
+Test wall-fit dimension normalisation and queries
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from models.artwork import Artwork, normalize_dimensions, sync_dimension_columns, to_cm
+from services.wall_fit import filter_fitting, fit_width_range, wall_size_from_detection
+
+
+def test_normalize_dimensions():
+    """Dimension blobs convert to centimetres whatever the unit"""
+    assert normalize_dimensions({"width": 24, "height": 36, "unit": "inches"}) == (60.96, 91.44)
+    assert normalize_dimensions({"width": 50, "height": 70, "unit": "cm"}) == (50.0, 70.0)
+    assert normalize_dimensions({"width": 24, "height": 24}) == (60.96, 60.96)
+    assert normalize_dimensions({"width": "wide", "unit": "cm"}) == (None, None)
+    assert normalize_dimensions({}) == (None, None)
+    assert to_cm(1, "parsecs") is None
+    print("✅ Dimension normalisation working")
+
+
+def test_model_keeps_columns_in_sync():
+    """The insert/update hook derives the typed columns from the JSON blob"""
+    artwork = Artwork(title="Study", image_url="x.jpg", dimensions={"width": 1, "height": 2, "unit": "m"})
+    sync_dimension_columns(None, None, artwork)
+    assert (artwork.width_cm, artwork.height_cm) == (100.0, 200.0)
+    print("✅ Dimension column sync working")
+
+
+def test_wall_size_from_detection():
+    """The largest detected wall is used"""
+    detection = {"walls": [
+        {"width": 3, "height": 2.5, "unit": "m"},
+        {"width": 4.2, "height": 2.5, "unit": "m"},
+    ]}
+    assert wall_size_from_detection(detection) == (420.0, 250.0)
+    assert wall_size_from_detection({"width": 120, "height": 96, "unit": "inches"}) == (304.8, 243.84)
+    assert wall_size_from_detection({}) == (None, None)
+    assert wall_size_from_detection(None) == (None, None)
+    print("✅ Wall detection parsing working")
+
+
+def test_fit_query_is_a_range_scan():
+    """Fit filters compile to plain comparisons on the indexed columns"""
+    assert fit_width_range(400, 0.5, 0.75) == (200, 300)
+    with pytest.raises(ValueError):
+        fit_width_range(400, 0.8, 0.5)
+
+    query = filter_fitting(Query(Artwork), 400, 250)
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    assert "artwork.width_cm >=" in sql and "artwork.width_cm <=" in sql
+    assert "artwork.height_cm <=" in sql
+    assert "dimensions" not in sql.split("WHERE")[1]
+    print("✅ Wall-fit range query working")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing wall fit...")
+    test_normalize_dimensions()
+    test_model_keeps_columns_in_sync()
+    test_wall_size_from_detection()
+    test_fit_query_is_a_range_scan()
+    print("🎉 All wall fit tests passed!")
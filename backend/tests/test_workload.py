@@ -0,0 +1,129 @@
+"""
+Test the synthetic workload generator
+"""
+import json
+import os
+import tempfile
+from collections import Counter
+
+from models.database import Base
+from scripts.generate_workload import CITIES, TOP_K, Workload, write_database, write_files
+from services.trends import REBUILD_LATEST_SQL
+
+
+class RecordingConnection:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, *args):
+        self.statements.append(statement)
+
+    def commit(self):
+        self.statements.append("COMMIT")
+
+
+class RecordingEngine:
+    def __init__(self):
+        self.statements = []
+
+    def begin(self):
+        return RecordingConnection(self.statements)
+
+    connect = begin
+
+
+def small_workload(**overrides):
+    options = {"users": 200, "artworks": 1000, "stores": 12, "embeddings": False, "seed": 7}
+    options.update(overrides)
+    return Workload(**options)
+
+
+def test_generation_is_deterministic():
+    """Same arguments give identical rows; another seed gives different ones"""
+    first = list(small_workload().session_rows())
+    second = list(small_workload().session_rows())
+    assert first == second
+    assert list(small_workload(seed=8).session_rows())[:5] != first[:5]
+    print("✅ Deterministic generation working")
+
+
+def test_sessions_follow_zipfian_popularity():
+    """Sessions reference real artworks, choices come from topk and popularity is skewed"""
+    workload = small_workload()
+    artwork_ids = set(workload.catalog["ids"])
+    user_ids = {user_id for user_id, _ in workload.people}
+    sessions = list(workload.session_rows())
+
+    shown = Counter()
+    for session in sessions:
+        assert session["user_id"] in user_ids
+        assert len(session["topk_ids"]) == TOP_K == len(set(session["topk_ids"]))
+        assert set(session["topk_ids"]) <= artwork_ids
+        if session["chosen_id"] is not None:
+            assert session["chosen_id"] in session["topk_ids"]
+            assert 1 <= session["satisfaction_score"] <= 5
+        shown.update(session["topk_ids"])
+
+    # The most popular 5% of artworks account for far more than 5% of impressions
+    top = sum(count for _, count in shown.most_common(len(artwork_ids) // 20))
+    assert top / sum(shown.values()) > 0.3
+    print("✅ Zipfian sessions working")
+
+
+def test_stores_cluster_and_stock_catalog():
+    """Stores sit near a city centre and inventory only references generated rows"""
+    workload = small_workload()
+    stores = list(workload.store_rows())
+    for store in stores:
+        assert min(
+            abs(store["latitude"] - lat) + abs(store["longitude"] - lon) for lat, lon, _ in CITIES.values()
+        ) < 1.0
+    store_ids = {store["id"] for store in stores}
+    inventory = list(workload.inventory_rows())
+    assert {row["store_id"] for row in inventory} == store_ids
+    assert {row["artwork_id"] for row in inventory} <= set(workload.catalog["ids"])
+    print("✅ Store clustering working")
+
+
+def test_write_files():
+    """Every table is written as NDJSON with JSON-safe values"""
+    with tempfile.TemporaryDirectory() as directory:
+        counts = write_files(small_workload(users=20, artworks=50, stores=3, embeddings=True), directory)
+        assert counts["artwork"] == counts["artwork_embedding"] == 50
+        assert counts["user_profiles"] == 20
+        assert sorted(os.listdir(directory)) == sorted(f"{table}.ndjson" for table in counts)
+        with open(os.path.join(directory, "artwork.ndjson"), encoding="utf-8") as f:
+            artwork = json.loads(f.readline())
+        assert artwork["width_cm"] is not None
+        assert artwork["created_at"].startswith("2024-")
+    print("✅ NDJSON export working")
+
+
+def test_write_database_resets_and_rebuilds_rollup(monkeypatch):
+    """Reset clears the rollup and tombstones, and trend_latest is rebuilt after the inserts"""
+    monkeypatch.setattr(Base.metadata, "create_all", lambda bind: None)
+    engine = RecordingEngine()
+    write_database(small_workload(users=5, artworks=20, stores=2), engine, reset=True)
+
+    deleted = [s.table.name for s in engine.statements if getattr(s, "is_delete", False)]
+    assert deleted.index("artwork") < deleted.index("artwork_tombstone")
+    assert "trend_latest" in deleted
+    inserted = [s.table.name for s in engine.statements if getattr(s, "is_insert", False)]
+    assert "trend_analysis" in inserted
+    assert engine.statements[-2:] == [REBUILD_LATEST_SQL, "COMMIT"]
+    print("✅ Database writes reset and rebuild the trend rollup")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing workload generator...")
+    test_generation_is_deterministic()
+    test_sessions_follow_zipfian_popularity()
+    test_stores_cluster_and_stock_catalog()
+    test_write_files()
+    print("🎉 All workload tests passed!")